@@ -6,8 +6,9 @@ Initializes and configures the Flask backend application:
   2. Connects to MongoDB
   3. Registers all route blueprints
   4. Seeds demo users on first run
-  5. Enables CORS for frontend communication
-  6. Starts the development server
+  5. Warms up the shared AI/ML models (in a background thread)
+  6. Enables CORS for frontend communication
+  7. Starts the development server
 
 Run with:
     python app.py
@@ -22,6 +23,8 @@ from pymongo import MongoClient
 
 from config import Config
 from seed_demo_users import seed_demo_users
+from ml import model_registry
+from services.migration_service import MigrationService
 
 # ── Route blueprint imports ──────────────────────────────────────────────
 from routes.auth_routes import init_auth_routes
@@ -80,11 +83,32 @@ def create_app():
     print("[INFO] Checking demo users...")
     seed_demo_users(db)
 
+    # ── Warm Up Shared Models ────────────────────────────────────────────
+    # Load spaCy, the transformer and trained ML artifacts once per process
+    # so the first matching request does not pay the load cost. By default
+    # this runs in a background thread: health checks and auth are served
+    # immediately while the models load.
+    if Config.MODEL_WARM_UP == "blocking":
+        print("[INFO] Warming up AI/ML models...")
+        model_registry.warm_up()
+    elif Config.MODEL_WARM_UP == "background":
+        print("[INFO] Warming up AI/ML models in the background...")
+        model_registry.start_warm_up()
+
+    # ── Migrate Stale Documents ──────────────────────────────────────────
+    # After a parser, taxonomy or embedding model change, stored features
+    # are stale until re-computed: start the background migration so the
+    # embedding indexes are rebuilt without a manual admin call.
+    if Config.REPARSE_ON_STARTUP:
+        MigrationService(db).start_if_stale()
+
     # ── Health Check Endpoint ────────────────────────────────────────────
     @app.route("/api/health", methods=["GET"])
     def health_check():
         """
         Simple health check endpoint for monitoring.
+        Kept for compatibility; load balancers should use the
+        /api/health/live and /api/health/ready probes below.
 
         Response (200):
             {
@@ -98,6 +122,48 @@ def create_app():
             "version": "1.0.0",
         }), 200
 
+    # ── Liveness Probe ───────────────────────────────────────────────────
+    @app.route("/api/health/live", methods=["GET"])
+    def liveness_check():
+        """
+        Liveness probe: the process is up and serving requests.
+        Never depends on model loading, so it is answered immediately.
+
+        Response (200):
+            {
+                "status": "alive"
+            }
+        """
+        return jsonify({"status": "alive"}), 200
+
+    # ── Readiness Probe ──────────────────────────────────────────────────
+    @app.route("/api/health/ready", methods=["GET"])
+    def readiness_check():
+        """
+        Readiness probe: the heavy AI/ML components are loaded and a
+        synthetic warm-up match has completed.
+
+        Response (200 when ready, 503 while loading or after a failure):
+            {
+                "ready": true,
+                "status": "ready" | "degraded" | "loading" | "failed",
+                "components": {
+                    "spacy":         {"state": "ready", "load_seconds": 1.2, "detail": null},
+                    "transformer":   {...},
+                    "predictor":     {...},
+                    "classifier":    {...},
+                    "corpus_tfidf":  {...},
+                    "warm_up_match": {...}
+                }
+            }
+        """
+        report = model_registry.readiness()
+        if Config.MODEL_WARM_UP == "off" and report["status"] == "loading":
+            # Models load on first use; there is nothing to wait for
+            report["ready"] = True
+            report["status"] = "lazy"
+        return jsonify(report), 200 if report["ready"] else 503
+
     # ── Global Error Handlers ────────────────────────────────────────────
     @app.errorhandler(404)
     def not_found(error):
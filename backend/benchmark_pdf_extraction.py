@@ -0,0 +1,142 @@
+"""
+benchmark_pdf_extraction.py - Compare PDF Text Extraction Backends
+---------------------------------------------------------------------
+Run this script on a folder of real resumes / job descriptions to compare
+the installed PDF backends (PyPDF2, PyMuPDF) before switching PDF_BACKEND:
+
+  - extraction time per file (mean / p95) and pages per second
+  - characters extracted, and token overlap with the PyPDF2 text
+    (how much the downstream parser input would change)
+  - page-parallel extraction of the largest PDFs (PDF_PARALLEL_MIN_PAGES)
+
+Usage:
+    python benchmark_pdf_extraction.py path/to/resumes
+    python benchmark_pdf_extraction.py path/to/resumes --repeat 3
+
+PDFs are read into memory first, so disk speed does not skew the timings.
+The per-document page / character budget from Config applies as in
+production.
+"""
+
+import sys
+import os
+import io
+import time
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from utils.file_handler import (
+    PDF_BACKENDS,
+    PYMUPDF_AVAILABLE,
+    extract_text_from_pdf,
+    get_pdf_backend,
+)
+
+
+def load_corpus(folder):
+    """Read every PDF under a folder: list of (name, bytes, page count)."""
+    corpus = []
+    engine = get_pdf_backend("pypdf2")
+    for root, _, files in os.walk(folder):
+        for fname in sorted(files):
+            if not fname.lower().endswith(".pdf"):
+                continue
+            with open(os.path.join(root, fname), "rb") as f:
+                data = f.read()
+            try:
+                doc = engine.open(data)
+                pages = engine.page_count(doc)
+            except Exception:
+                pages = 0
+            corpus.append((fname, data, pages))
+    return corpus
+
+
+def time_backend(backend, corpus, repeat, parallel=False):
+    """Best-of-`repeat` extraction time per file; returns (timings, texts)."""
+    timings, texts = [], []
+    for _, data, _ in corpus:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            text = extract_text_from_pdf(io.BytesIO(data), backend=backend, parallel=parallel)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+        texts.append(text)
+    return timings, texts
+
+
+def token_overlap(a, b):
+    """Jaccard overlap of the lower-cased word sets of two texts."""
+    ta, tb = set(a.lower().split()), set(b.lower().split())
+    if not ta and not tb:
+        return 1.0
+    return len(ta & tb) / len(ta | tb)
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0].startswith("--"):
+        print(__doc__)
+        sys.exit(1)
+    folder = args[0]
+    repeat = int(args[args.index("--repeat") + 1]) if "--repeat" in args else 1
+
+    print("=" * 60)
+    print("  JDMatcher - PDF Extraction Benchmark")
+    print("=" * 60)
+
+    corpus = load_corpus(folder)
+    if not corpus:
+        print(f"\n[ERROR] No PDF files found under '{folder}'.")
+        sys.exit(1)
+    total_pages = sum(pages for _, _, pages in corpus)
+    print(f"\n[INFO] {len(corpus)} PDFs, {total_pages} pages, "
+          f"{sum(len(d) for _, d, _ in corpus) / 1e6:.1f} MB")
+
+    backends = [name for name in PDF_BACKENDS if name != "pymupdf" or PYMUPDF_AVAILABLE]
+    if not PYMUPDF_AVAILABLE:
+        print("[INFO] PyMuPDF is not installed (pip install -r requirements-optional.txt); skipping it.")
+
+    reference = None
+    for name in backends:
+        timings, texts = time_backend(name, corpus, repeat)
+        if reference is None:
+            reference = texts
+        total = sum(timings)
+        print(f"\n[{name}]")
+        print(f"  Total time       : {total:.2f}s")
+        print(f"  Per file         : mean {1000 * total / len(timings):.1f} ms, "
+              f"p95 {1000 * percentile(timings, 0.95):.1f} ms")
+        print(f"  Throughput       : {total_pages / max(total, 1e-9):.1f} pages/s")
+        print(f"  Characters       : {sum(len(t) for t in texts)}")
+        print(f"  Empty extractions: {sum(1 for t in texts if not t)}")
+        overlaps = [token_overlap(r, t) for r, t in zip(reference, texts)]
+        print(f"  Token overlap vs {backends[0]}: mean {sum(overlaps) / len(overlaps):.3f}, "
+              f"min {min(overlaps):.3f}")
+
+    # Page-parallel extraction only kicks in for long PDFs
+    long_docs = sorted(corpus, key=lambda item: item[2], reverse=True)[:5]
+    if long_docs and long_docs[0][2] >= 2:
+        print(f"\n[Page-parallel] {len(long_docs)} longest PDFs "
+              f"({', '.join(str(pages) for _, _, pages in long_docs)} pages)")
+        for name in backends:
+            serial, _ = time_backend(name, long_docs, repeat)
+            parallel, _ = time_backend(name, long_docs, repeat, parallel=True)
+            print(f"  {name:<8}: serial {sum(serial):.2f}s, parallel {sum(parallel):.2f}s "
+                  f"(only PDFs with >= PDF_PARALLEL_MIN_PAGES pages are split)")
+
+    print("\n" + "=" * 60)
+    print("  Done. Set PDF_BACKEND in .env to switch engines.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+build_corpus.py - Fit the Corpus-level TF-IDF Vectorizer
+-----------------------------------------------------------
+Run this script to (re)build the TF-IDF vocabulary and IDF statistics
+over every resume and job description stored in MongoDB.
+
+Usage:
+    python build_corpus.py
+
+The fitted vectorizer is saved to ml/saved_models/corpus_tfidf.joblib and
+loaded by the matching engine on next startup. New uploads keep it fresh
+incrementally, so a full rebuild is only needed occasionally (e.g. after
+bulk imports or preprocessing changes).
+"""
+
+import sys
+import os
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from pymongo import MongoClient
+
+from config import Config
+from ml.corpus_vectorizer import CorpusVectorizer
+from ml.document_features import get_tokens_many
+
+
+# Documents preprocessed per batched spaCy pass
+BATCH_SIZE = 256
+
+
+def iter_corpus_documents(db):
+    """
+    Yield preprocessed text of every stored resume and job description.
+
+    Token strings precomputed at ingest are reused; only documents without
+    valid stored tokens go through the spaCy pipeline, in nlp.pipe batches.
+    """
+    batch = []   # (features, text)
+    for collection, text_field in (("resumes", "raw_text"), ("jobs", "description")):
+        projection = {text_field: 1, "features.tokens": 1, "features.preprocess_version": 1}
+        for doc in db[collection].find({}, projection):
+            text = doc.get(text_field, "")
+            if text.strip():
+                batch.append((doc.get("features"), text))
+            if len(batch) >= BATCH_SIZE:
+                yield from get_tokens_many(*zip(*batch))
+                batch = []
+    if batch:
+        yield from get_tokens_many(*zip(*batch))
+
+
+def main():
+    print("=" * 60)
+    print("  JDMatcher - Corpus TF-IDF Builder")
+    print("=" * 60)
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[Config.MONGO_DB_NAME]
+
+    print("\n[1/2] Preprocessing stored resumes and job descriptions...")
+    vectorizer = CorpusVectorizer()
+    vectorizer.fit(iter_corpus_documents(db))
+
+    print("\n[2/2] Corpus statistics:")
+    print(f"    Documents:        {vectorizer.n_docs}")
+    print(f"    Vocabulary size:  {vectorizer.vocabulary_size}")
+    print(f"    Version:          {vectorizer.version}")
+    print(f"\n  Vectorizer saved to: {vectorizer.path}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
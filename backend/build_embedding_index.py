@@ -0,0 +1,63 @@
+"""
+build_embedding_index.py - Rebuild the Resume / Job Embedding Indexes
+------------------------------------------------------------------------
+Run this script to (re)build the nearest-neighbour indexes behind
+GET /api/match/job/<job_id>/top and GET /api/match/resume/<id>/jobs
+from the embeddings stored on every resume and job in MongoDB.
+
+Usage:
+    python build_embedding_index.py
+
+The indexes are saved to ml/saved_models/{resumes,jobs}_index.npz and
+loaded on next startup. Uploads and deletions keep them up to date
+incrementally, so a rebuild is only needed after bulk imports, an
+embedding model change, or to retrain the IVF clusters
+(EMBEDDING_INDEX_MODE=ivf) once the corpus has grown.
+
+Documents without a stored embedding are skipped.
+"""
+
+import sys
+import os
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from pymongo import MongoClient
+
+from config import Config
+from ml import model_registry
+from ml.document_features import get_embedding
+
+
+def iter_embeddings(collection, model_id):
+    """Yield (doc_id, embedding) for every document with a valid stored embedding."""
+    for doc in collection.find({}, {"features.model_id": 1, "features.embedding": 1}):
+        embedding = get_embedding(doc.get("features"), model_id)
+        if embedding is not None:
+            yield str(doc["_id"]), embedding
+
+
+def main():
+    print("=" * 60)
+    print("  JDMatcher - Embedding Index Builder")
+    print("=" * 60)
+
+    client = MongoClient(Config.MONGO_URI)
+    db = client[Config.MONGO_DB_NAME]
+
+    for step, (name, collection) in enumerate(
+        (("resumes", db["resumes"]), ("jobs", db["jobs"])), start=1
+    ):
+        print(f"\n[{step}/2] Indexing stored {name}...")
+        index = model_registry.get_embedding_index(name)
+        index.rebuild(iter_embeddings(collection, index.model_id))
+        print(f"    Vectors:  {len(index)}")
+        print(f"    Mode:     {index.mode}")
+        print(f"    Saved to: {index.path}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -36,5 +36,125 @@ class Config:
     MAX_CONTENT_LENGTH = int(os.getenv("MAX_CONTENT_LENGTH", 50 * 1024 * 1024))  # 50 MB for bulk/zip uploads
     ALLOWED_EXTENSIONS = {"pdf", "docx", "zip"}
 
+    # ── Extraction Cache Settings ────────────────────────────────────────
+    # Extracted text + parse results of uploaded files, keyed by file SHA-256
+    EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", 1024))
+    # On-disk tier shared across worker processes ("" = memory only); it
+    # holds resume text, so it lives next to the uploads themselves
+    EXTRACTION_CACHE_DIR = os.getenv(
+        "EXTRACTION_CACHE_DIR", os.path.join(UPLOAD_FOLDER, ".extraction_cache")
+    )
+    # Disk tier limits: total size in MB and days an unused entry is kept
+    # (0 = unbounded). Entries of deleted resumes / jobs are removed at once.
+    EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", 512))
+    EXTRACTION_CACHE_MAX_AGE_DAYS = float(os.getenv("EXTRACTION_CACHE_MAX_AGE_DAYS", 30))
+
+    # ── Bulk Extraction Settings ─────────────────────────────────────────
+    # Worker processes for parallel PDF/DOCX text extraction (0 = CPU count)
+    EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", 0))
+    # Maximum seconds to wait for a single file's text extraction
+    EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", 60))
+    # ZIP archive limits (resume members read straight into memory)
+    ZIP_MAX_MEMBERS = int(os.getenv("ZIP_MAX_MEMBERS", 500))
+    ZIP_MAX_UNCOMPRESSED_SIZE = int(
+        os.getenv("ZIP_MAX_UNCOMPRESSED_SIZE", 200 * 1024 * 1024)
+    )  # 200 MB total
+
+    # ── PDF Extraction Settings ──────────────────────────────────────────
+    # "pypdf2" (default), "pymupdf" (much faster; optional, AGPL-licensed
+    # dependency from requirements-optional.txt) or "auto" (PyMuPDF when
+    # installed, else PyPDF2)
+    PDF_BACKEND = os.getenv("PDF_BACKEND", "pypdf2").lower()
+    # Per-document budget: pages read and characters kept (0 = unlimited)
+    PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", 50))
+    PDF_MAX_CHARS = int(os.getenv("PDF_MAX_CHARS", 200000))
+    # Single PDFs with at least this many pages are extracted in page
+    # ranges across the extraction pool (0 = never)
+    PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", 24))
+
+    # ── Bulk Matching Job Settings ───────────────────────────────────────
+    # Background threads running asynchronous bulk matching jobs
+    BULK_JOB_WORKERS = int(os.getenv("BULK_JOB_WORKERS", 2))
+    # Seconds before a bulk job and its candidates are deleted (0 = keep)
+    BULK_JOB_TTL = int(os.getenv("BULK_JOB_TTL", 7 * 24 * 3600))
+    # Seconds without a lease renewal after which an unfinished job is
+    # presumed orphaned (its process stopped) and marked failed at startup
+    BULK_JOB_LEASE_SECONDS = int(os.getenv("BULK_JOB_LEASE_SECONDS", 300))
+
+    # ── Skill Taxonomy Settings ──────────────────────────────────────────
+    SKILL_TAXONOMY_PATH = os.getenv(
+        "SKILL_TAXONOMY_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml", "skill_taxonomy.json"),
+    )
+    # Seconds between checks for an updated taxonomy file (0 = never reload)
+    SKILL_TAXONOMY_RELOAD_INTERVAL = float(os.getenv("SKILL_TAXONOMY_RELOAD_INTERVAL", 5))
+
+    # ── Embedding Index Settings ─────────────────────────────────────────
+    # "flat" = exact top-K search, "ivf" = approximate (clustered) search
+    EMBEDDING_INDEX_MODE = os.getenv("EMBEDDING_INDEX_MODE", "flat")
+    # IVF clusters (0 = sqrt of the index size) and clusters scanned per query
+    EMBEDDING_INDEX_LISTS = int(os.getenv("EMBEDDING_INDEX_LISTS", 0))
+    EMBEDDING_INDEX_NPROBE = int(os.getenv("EMBEDDING_INDEX_NPROBE", 8))
+
+    # ── Embedding Inference Settings ─────────────────────────────────────
+    # "torch" = sentence-transformers on PyTorch, "onnx" = ONNX Runtime,
+    # "onnx-int8" = ONNX Runtime with dynamic int8 quantization (switching
+    # to or from int8 re-embeds stored documents via the re-parse migration)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+    # Token limit per encoded text (all-MiniLM-L6-v2 was trained with 256)
+    EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", 256))
+    # Long documents are embedded in chunks that fit the token limit and
+    # pooled back per document: "mean" (token-weighted) or "max"
+    EMBEDDING_POOLING = os.getenv("EMBEDDING_POOLING", "mean").lower()
+    # Where exported ONNX artifacts are cached
+    ONNX_MODEL_DIR = os.getenv(
+        "ONNX_MODEL_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml", "saved_models", "onnx"),
+    )
+    # ONNX Runtime intra-op threads (0 = runtime default)
+    ONNX_THREADS = int(os.getenv("ONNX_THREADS", 0))
+
+    # ── Embedding Cache Settings ─────────────────────────────────────────
+    # In-memory LRU size for transformer embeddings (keyed by text hash)
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 8192))
+    # float16 on-disk store shared across worker processes ("" = off)
+    EMBEDDING_CACHE_DIR = os.getenv(
+        "EMBEDDING_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml", "saved_models", "embedding_cache"),
+    )
+    # Vectors kept in the disk store before the oldest are recycled
+    # (0 = unbounded; 200000 x 384-d float16 is about 150 MB)
+    EMBEDDING_CACHE_MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", 200000))
+
+    # ── Re-parse Migration Settings ──────────────────────────────────────
+    # Documents re-parsed / re-embedded per batch (progress is checkpointed per batch)
+    REPARSE_BATCH_SIZE = int(os.getenv("REPARSE_BATCH_SIZE", 32))
+    # Throughput cap, leaving CPU for the online API (0 = unthrottled)
+    REPARSE_MAX_DOCS_PER_SECOND = float(os.getenv("REPARSE_MAX_DOCS_PER_SECOND", 5))
+    # Start the migration automatically at startup when stored documents are
+    # stale (e.g. after a parser or embedding model change)
+    REPARSE_ON_STARTUP = os.getenv("REPARSE_ON_STARTUP", "true").lower() in ("true", "1", "yes")
+
     # ── CORS Settings ────────────────────────────────────────────────────
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
+
+    # ── Model Loading ────────────────────────────────────────────────────
+    # "background" = load AI/ML models in a warm-up thread after startup,
+    # "blocking"   = load them before serving, "off" = load on first use
+    MODEL_WARM_UP = os.getenv("MODEL_WARM_UP", "background").lower()
+
+    # ── NLP Pipeline Settings ────────────────────────────────────────────
+    SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+    # Pipeline components not loaded at all (only tokens + lemmas are used)
+    SPACY_EXCLUDE = [
+        c.strip() for c in os.getenv("SPACY_EXCLUDE", "parser,ner").split(",") if c.strip()
+    ]
+    # nlp.pipe() batching for bulk preprocessing
+    NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", 64))
+    NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", 1))
+
+    # ── NLP Cache Settings ───────────────────────────────────────────────
+    # In-memory LRU size for preprocessed token strings (keyed by text hash)
+    PREPROCESS_CACHE_SIZE = int(os.getenv("PREPROCESS_CACHE_SIZE", 2048))
+    # Optional on-disk cache tier shared across worker processes ("" = off)
+    NLP_CACHE_DIR = os.getenv("NLP_CACHE_DIR", "")
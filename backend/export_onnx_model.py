@@ -0,0 +1,100 @@
+"""
+export_onnx_model.py - Export the Embedding Model to ONNX and Check Parity
+-----------------------------------------------------------------------------
+Run this script to build the ONNX Runtime artifacts used by
+EMBEDDING_BACKEND=onnx / onnx-int8, then verify that their embeddings
+match the PyTorch sentence-transformer and compare encode latency.
+
+Usage:
+    python export_onnx_model.py            # export (if missing) + parity check
+    python export_onnx_model.py --force    # re-export even if cached
+
+The artifacts are saved under ONNX_MODEL_DIR (ml/saved_models/onnx/ by
+default) and reused on every startup. The script exits with status 1 if
+a backend drifts from the PyTorch embeddings beyond its tolerance.
+"""
+
+import sys
+import os
+import time
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import numpy as np
+
+from ml.ai_engine import AIEngine
+from ml.inference_backend import OnnxBackend, TorchBackend, export_onnx
+
+# Minimum cosine similarity between a backend's embedding and PyTorch's
+PARITY_TOLERANCE = {"onnx": 0.9999, "onnx-int8": 0.99}
+
+SAMPLE_TEXTS = [
+    "Senior Python developer with 6 years of experience building REST APIs in Flask and Django.",
+    "We are looking for a data engineer skilled in Spark, Airflow and AWS.",
+    "Frontend engineer: React, TypeScript, CSS; strong communication and teamwork.",
+    "Professional experience with kubernetes",
+    "Machine learning engineer with PyTorch, scikit-learn and MLOps experience. " * 20,
+    "Kurze deutsche Zeile mit Sonderzeichen: äöü ß — and some emoji 🚀.",
+]
+
+
+def time_encode(backend, texts, repeats=5):
+    """Median wall time (ms) of one batched encode."""
+    backend.encode(texts)   # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.encode(texts)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def main():
+    force = "--force" in sys.argv[1:]
+    model_name = AIEngine.MODEL_NAME
+
+    print("=" * 60)
+    print("  JDMatcher - ONNX Embedding Export")
+    print("=" * 60)
+
+    print(f"\n[1/3] Exporting {model_name}...")
+    paths = export_onnx(model_name, quantize=True, force=force)
+    print(f"    Saved to: {os.path.dirname(paths['model'])}")
+
+    print("\n[2/3] Loading backends...")
+    reference = TorchBackend(model_name)
+    backends = {
+        "onnx": OnnxBackend(model_name),
+        "onnx-int8": OnnxBackend(model_name, quantize=True),
+    }
+    expected = reference.encode(SAMPLE_TEXTS)
+
+    print("\n[3/3] Parity and latency (batch of %d texts)..." % len(SAMPLE_TEXTS))
+    baseline_ms = time_encode(reference, SAMPLE_TEXTS)
+    print(f"    {'torch':<10} {baseline_ms:8.1f} ms")
+
+    failed = False
+    for name, backend in backends.items():
+        actual = backend.encode(SAMPLE_TEXTS)
+        cosines = np.sum(actual * expected, axis=1) / (
+            np.linalg.norm(actual, axis=1) * np.linalg.norm(expected, axis=1)
+        )
+        ms = time_encode(backend, SAMPLE_TEXTS)
+        ok = float(cosines.min()) >= PARITY_TOLERANCE[name]
+        failed = failed or not ok
+        print(
+            f"    {name:<10} {ms:8.1f} ms  ({baseline_ms / ms:.1f}x)  "
+            f"min cosine {cosines.min():.5f}  {'OK' if ok else 'FAIL'}"
+        )
+
+    print("=" * 60)
+    if failed:
+        print("  Parity check FAILED - do not enable the failing backend.")
+        sys.exit(1)
+    print("  Done! Set EMBEDDING_BACKEND=onnx or onnx-int8 to use them.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
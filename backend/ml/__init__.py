@@ -1,8 +1,26 @@
 # ml package - NLP, Machine Learning & AI logic
+#
+# The public classes are resolved lazily (PEP 562): importing a light
+# submodule such as ml.model_registry must not pull in spaCy,
+# sentence-transformers / torch or scikit-learn.
 
-from ml.ai_engine import AIEngine
-from ml.ml_model import MatchPredictor, generate_synthetic_training_data
-from ml.matching_engine import MatchingEngine
-from ml.skill_gap_analyzer import SkillGapAnalyzer
-from ml.resume_parser import ResumeParser
-from ml.jd_parser import JDParser
+import importlib
+
+_EXPORTS = {
+    "AIEngine": "ml.ai_engine",
+    "MatchPredictor": "ml.ml_model",
+    "generate_synthetic_training_data": "ml.ml_model",
+    "MatchingEngine": "ml.matching_engine",
+    "SkillGapAnalyzer": "ml.skill_gap_analyzer",
+    "ResumeParser": "ml.resume_parser",
+    "JDParser": "ml.jd_parser",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module), name)
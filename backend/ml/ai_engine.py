@@ -6,28 +6,47 @@ of resumes and job descriptions — going beyond keyword matching.
 
 Capabilities:
   - Semantic similarity via sentence-transformer embeddings
-  - Context-aware skill relevance scoring
+  - Context-aware skill relevance scoring (batched N skills × M contexts)
   - Batch candidate ranking against a JD
   - Dense vector embeddings for downstream tasks
 
+Every encode goes through an embedding cache keyed by (model, text hash),
+so a given text is only run through the transformer once (see
+ml/embedding_cache.py). The transformer itself runs on a pluggable
+inference backend: PyTorch, or ONNX Runtime with optional int8
+quantization (Config.EMBEDDING_BACKEND, see ml/inference_backend.py).
+
+Documents longer than the model's 256-token window are embedded in
+section/sentence chunks that fit it, pooled back into one vector per
+document (see ml/chunk_embedder.py), so nothing past the window is lost.
+
 Falls back gracefully to TF-IDF if sentence-transformers is not installed.
 
 Libraries:
   - sentence-transformers (HuggingFace): all-MiniLM-L6-v2 model
+  - onnxruntime (optional): CPU inference backend
   - scikit-learn: cosine similarity computation
 """
 
-import numpy as np
-
-# Try to import sentence-transformers (deep learning AI)
-try:
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity as sk_cosine_similarity
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+import importlib.util
+import threading
 
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity as sk_cosine_similarity
+
+# sentence-transformers (and torch) / onnxruntime are only imported when the
+# model is actually loaded; here we just check that the packages are installed.
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+ONNXRUNTIME_AVAILABLE = importlib.util.find_spec("onnxruntime") is not None
+
+from config import Config
+from ml.cache import LRUCache, content_hash
+from ml.chunk_embedder import embed_documents
+from ml.embedding_cache import EmbeddingCache
+from ml.inference_backend import load_backend
 from ml.nlp_utils import get_preprocessed_string
+from ml.skill_taxonomy import get_taxonomy
+from ml import model_registry
 
 
 class AIEngine:
@@ -45,25 +64,135 @@ class AIEngine:
     """
 
     MODEL_NAME = "all-MiniLM-L6-v2"
+    EMBEDDING_DIM = 384
+    # Identity of document vectors (model + backend precision + chunk
+    # pooling); stored embeddings and indexes built with a different id are
+    # treated as stale. Overridden per instance once the backend is loaded.
+    EMBEDDING_ID = f"{MODEL_NAME}+chunks-{Config.EMBEDDING_POOLING}"
+    # Phrase a skill is embedded as for skill-relevance scoring
+    SKILL_PHRASE = "Professional experience with {}"
+    # Pooled document vectors kept in memory (e.g. JDs scored repeatedly)
+    DOCUMENT_CACHE_SIZE = 512
 
     def __init__(self):
         """Load the transformer model (or set up fallback)."""
         self.model = None
+        self.backend = None
         self.ai_available = False
+        self._documents = LRUCache(self.DOCUMENT_CACHE_SIZE)
+        # (taxonomy snapshot, {skill: row}, skill-phrase matrix)
+        self._skill_table = None
+        self._skill_lock = threading.Lock()
         self._load_model()
+        if self.model is not None:
+            # int8 vectors differ slightly from fp32 ones: switching backend
+            # (or falling back to PyTorch) must mark stored vectors stale
+            self.EMBEDDING_ID = f"{self.model.model_id}+chunks-{Config.EMBEDDING_POOLING}"
+        # Cached vectors are namespaced by backend (int8 output differs slightly)
+        self.cache = EmbeddingCache(
+            self.model.model_id if self.model else self.MODEL_NAME,
+            self.EMBEDDING_DIM,
+            max_entries=Config.EMBEDDING_CACHE_SIZE,
+            disk_dir=Config.EMBEDDING_CACHE_DIR or None,
+            max_disk_rows=Config.EMBEDDING_CACHE_MAX_ROWS,
+        )
 
     def _load_model(self):
-        """Attempt to load the sentence-transformer model."""
-        if TRANSFORMERS_AVAILABLE:
+        """
+        Attempt to load the sentence-transformer on the configured backend.
+
+        An ONNX backend that cannot be loaded falls back to PyTorch.
+        """
+        backends = [Config.EMBEDDING_BACKEND]
+        if Config.EMBEDDING_BACKEND != "torch":
+            backends.append("torch")
+
+        for backend in backends:
+            if backend == "torch" and not TRANSFORMERS_AVAILABLE:
+                print("[AI Engine] sentence-transformers not installed. Using TF-IDF fallback.")
+                continue
+            if backend != "torch" and not ONNXRUNTIME_AVAILABLE:
+                print(f"[AI Engine] onnxruntime not installed; cannot use '{backend}' backend.")
+                continue
             try:
-                self.model = SentenceTransformer(self.MODEL_NAME)
+                self.model = load_backend(self.MODEL_NAME, backend)
+                self.backend = backend
                 self.ai_available = True
-                print(f"[AI Engine] Loaded transformer model: {self.MODEL_NAME}")
+                print(f"[AI Engine] Loaded transformer model: {self.MODEL_NAME} ({backend})")
+                return
             except Exception as e:
-                print(f"[AI Engine] Failed to load transformer model: {e}")
-                self.ai_available = False
-        else:
-            print("[AI Engine] sentence-transformers not installed. Using TF-IDF fallback.")
+                print(f"[AI Engine] Failed to load transformer model ({backend}): {e}")
+        self.ai_available = False
+
+    def _encode(self, texts):
+        """
+        Encode texts through the embedding cache.
+
+        Cached vectors are reused; only the misses (deduplicated) go through
+        the transformer, in a single batch, and are then cached.
+
+        Args:
+            texts (list[str]): Input texts.
+
+        Returns:
+            numpy.ndarray: float32 array of shape (len(texts), EMBEDDING_DIM).
+        """
+        texts = list(texts)
+        vectors = self.cache.get_many(texts)
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            encoded = np.asarray(self.model.encode(missing), dtype=np.float32)
+            self.cache.set_many(missing, encoded)
+            fresh = dict(zip(missing, encoded))
+            vectors = [fresh[t] if v is None else v for t, v in zip(texts, vectors)]
+        if not vectors:
+            return np.zeros((0, self.EMBEDDING_DIM), dtype=np.float32)
+        return np.vstack(vectors)
+
+    def embed_documents(self, texts, pooling=None):
+        """
+        Embed whole documents through token-budget-sized chunks.
+
+        The chunks of all documents are encoded in one cached batch and
+        pooled per document. Chunk vectors are returned too, so
+        section-level comparisons can reuse them without re-encoding.
+
+        Args:
+            texts (list[str]): Document texts.
+            pooling (str): "mean" or "max" (default: Config.EMBEDDING_POOLING).
+
+        Returns:
+            list[DocumentEmbedding | None]: (vector, spans, chunk_vectors) per
+                                            text, None for blank text.
+        """
+        return embed_documents(
+            list(texts),
+            encode=self._encode,
+            count_tokens=self.model.count_tokens,
+            budget=self.model.max_seq_length - 2,   # room for [CLS] / [SEP]
+            pooling=pooling or Config.EMBEDDING_POOLING,
+        )
+
+    def _document_vectors(self, texts):
+        """
+        Pooled vector per document (zeros for blank text), as an (n, dim) array.
+        Vectors are cached in memory by text hash.
+        """
+        texts = list(texts)
+        keys = [content_hash(t) for t in texts]
+        vectors = [self._documents.get(key) for key in keys]
+        missing = [i for i, vec in enumerate(vectors) if vec is None]
+        if missing:
+            documents = self.embed_documents([texts[i] for i in missing])
+            for i, doc in zip(missing, documents):
+                vectors[i] = (
+                    doc.vector if doc is not None
+                    else np.zeros(self.EMBEDDING_DIM, dtype=np.float32)
+                )
+                self._documents.set(keys[i], vectors[i])
+        if not vectors:
+            return np.zeros((0, self.EMBEDDING_DIM), dtype=np.float32)
+        return np.vstack(vectors)
 
     # ── Primary Methods ──────────────────────────────────────────────────
 
@@ -92,7 +221,7 @@ class AIEngine:
             return self._tfidf_fallback(text_a, text_b)
 
         try:
-            embeddings = self.model.encode([text_a, text_b])
+            embeddings = self._document_vectors([text_a, text_b])
             similarity = sk_cosine_similarity([embeddings[0]], [embeddings[1]])
             return float(similarity[0][0])
         except Exception as e:
@@ -117,10 +246,47 @@ class AIEngine:
         if not self.ai_available or not text:
             return None
         try:
-            return self.model.encode(text)
+            document = self.embed_documents([text])[0]
+            return document.vector if document is not None else None
         except Exception:
             return None
 
+    def get_embeddings(self, texts):
+        """
+        Embed many documents in one batched transformer call.
+
+        Args:
+            texts (list[str]): Input texts.
+
+        Returns:
+            numpy.ndarray: Array of shape (len(texts), 384), or None when the
+                           model is unavailable or encoding fails.
+        """
+        if not self.ai_available:
+            return None
+        try:
+            return self._document_vectors(texts)
+        except Exception as e:
+            print(f"[AI Engine] Batch embedding error: {e}")
+            return None
+
+    @staticmethod
+    def compute_embedding_similarity(embedding_a, embedding_b):
+        """
+        Cosine similarity between two precomputed embeddings.
+
+        Args:
+            embedding_a (numpy.ndarray): First embedding.
+            embedding_b (numpy.ndarray): Second embedding.
+
+        Returns:
+            float: Similarity score, or 0.0 if either vector is empty.
+        """
+        norm = float(np.linalg.norm(embedding_a) * np.linalg.norm(embedding_b))
+        if norm == 0:
+            return 0.0
+        return float(np.dot(embedding_a, embedding_b) / norm)
+
     def rank_candidates(self, job_text, resume_texts):
         """
         Rank multiple resumes against a single JD using AI embeddings.
@@ -139,9 +305,8 @@ class AIEngine:
             return [0.0] * len(resume_texts)
 
         try:
-            job_embedding = self.model.encode([job_text])
-            resume_embeddings = self.model.encode(resume_texts)
-            similarities = sk_cosine_similarity(job_embedding, resume_embeddings)
+            embeddings = self._document_vectors([job_text] + list(resume_texts))
+            similarities = sk_cosine_similarity(embeddings[:1], embeddings[1:])
             return similarities[0].tolist()
         except Exception as e:
             print(f"[AI Engine] Batch ranking error: {e}")
@@ -162,16 +327,71 @@ class AIEngine:
         Returns:
             float: Relevance score between 0 and 1.
         """
-        if not self.ai_available or not skill or not job_context:
-            return 0.5  # Neutral default
+        return float(self.compute_skill_relevance_matrix([skill], [job_context])[0, 0])
+
+    def compute_skill_relevance_matrix(self, skills, job_contexts):
+        """
+        Batched compute_contextual_skill_relevance(): every skill against
+        every job context in one matrix product.
+
+        Skill-phrase embeddings come from a matrix precomputed once for the
+        whole taxonomy (skills outside it are encoded through the cache), and
+        job-context embeddings are cached by text hash.
+
+        Args:
+            skills (list[str]): N skill names.
+            job_contexts (list[str]): M job description texts.
+
+        Returns:
+            numpy.ndarray: (N, M) relevance scores between 0 and 1; 0.5
+                           (neutral) where a skill or context is blank or
+                           the transformer is unavailable.
+        """
+        skills, job_contexts = list(skills), list(job_contexts)
+        relevance = np.full((len(skills), len(job_contexts)), 0.5)
+        if not self.ai_available:
+            return relevance
+
+        rows = [i for i, s in enumerate(skills) if s and s.strip()]
+        cols = [j for j, c in enumerate(job_contexts) if c and c.strip()]
+        if not rows or not cols:
+            return relevance
 
         try:
-            skill_text = f"Professional experience with {skill}"
-            embeddings = self.model.encode([skill_text, job_context])
-            similarity = sk_cosine_similarity([embeddings[0]], [embeddings[1]])
-            return float(similarity[0][0])
-        except Exception:
-            return 0.5
+            skill_vectors = self._skill_embeddings([skills[i] for i in rows])
+            context_vectors = self._document_vectors([job_contexts[j] for j in cols])
+            # Both sides are L2-normalised, so the dot product is the cosine
+            relevance[np.ix_(rows, cols)] = np.clip(skill_vectors @ context_vectors.T, 0.0, 1.0)
+        except Exception as e:
+            print(f"[AI Engine] Skill relevance error: {e}")
+        return relevance
+
+    def _skill_embeddings(self, skills):
+        """
+        Skill-phrase embeddings (n, dim) for a list of skills.
+
+        The phrases of every taxonomy skill are encoded in one batch the
+        first time (and again after a taxonomy reload).
+        """
+        taxonomy = get_taxonomy()
+        table = self._skill_table
+        if table is None or table[0] is not taxonomy:
+            with self._skill_lock:
+                table = self._skill_table
+                if table is None or table[0] is not taxonomy:
+                    names = sorted(taxonomy.skills)
+                    vectors = self._encode([self.SKILL_PHRASE.format(n) for n in names])
+                    table = (taxonomy, {n: i for i, n in enumerate(names)}, vectors)
+                    self._skill_table = table
+
+        taxonomy, index, vectors = table
+        names = [taxonomy.canonical(s) for s in skills]
+        unknown = [n for n in dict.fromkeys(names) if n not in index]
+        extra = (
+            dict(zip(unknown, self._encode([self.SKILL_PHRASE.format(n) for n in unknown])))
+            if unknown else {}
+        )
+        return np.vstack([vectors[index[n]] if n in index else extra[n] for n in names])
 
     # ── Fallback ─────────────────────────────────────────────────────────
 
@@ -179,17 +399,14 @@ class AIEngine:
         """
         Fallback to TF-IDF cosine similarity when transformer model
         is not available. Less accurate but still useful.
-        """
-        from sklearn.feature_extraction.text import TfidfVectorizer
-        from sklearn.metrics.pairwise import cosine_similarity
 
+        Uses the shared corpus-level vectorizer, so no model is fitted here.
+        """
         processed_a = get_preprocessed_string(text_a)
         processed_b = get_preprocessed_string(text_b)
 
         if not processed_a.strip() or not processed_b.strip():
             return 0.0
 
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform([processed_a, processed_b])
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
-        return float(similarity[0][0])
+        vectorizer = model_registry.get_corpus_vectorizer()
+        return vectorizer.similarity(processed_a, processed_b)
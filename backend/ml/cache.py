@@ -0,0 +1,238 @@
+"""
+ml/cache.py - Content-addressed Caches
+-----------------------------------------
+Small, dependency-free caches shared by the NLP/ML pipeline:
+
+  - LRUCache     : thread-safe in-memory least-recently-used cache.
+  - ContentCache : LRU front + optional on-disk tier, keyed by the SHA-256
+                   of the content that produced the value.
+
+The on-disk tier stores one JSON file per key, sharded by the first two
+hex digits of the hash. Writes go to a temp file and are renamed into
+place, so several worker processes can safely share the same directory.
+It can be bounded by size and age: every PRUNE_EVERY writes, files older
+than the age limit are deleted, then the least recently used ones (by
+modification time, refreshed on disk hits) until the tier fits its size.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_hash(text):
+    """
+    Return the hex SHA-256 digest of a text (or bytes) value.
+
+    Args:
+        text (str | bytes): Content to hash.
+
+    Returns:
+        str: 64-character hex digest.
+    """
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU cache with a fixed number of entries."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Return the cached value (marking it most recently used) or default."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Insert a value, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Drop one entry (no-op if absent)."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ContentCache:
+    """
+    Two-tier cache keyed by content hash.
+
+    Lookups hit the in-memory LRU first, then the optional disk tier
+    (promoting disk hits into memory). Values must be JSON-serializable.
+    """
+
+    # Disk writes between two pruning passes (per process)
+    PRUNE_EVERY = 100
+
+    def __init__(self, namespace, max_entries=1024, disk_dir=None,
+                 max_disk_bytes=0, max_disk_age=0):
+        """
+        Args:
+            namespace (str): Sub-directory name for the disk tier; bump it
+                             whenever the cached computation changes.
+            max_entries (int): In-memory LRU capacity.
+            disk_dir (str): Root directory of the disk tier, or None to
+                            keep the cache memory-only.
+            max_disk_bytes (int): Size limit of the disk tier (0 = unbounded).
+            max_disk_age (float): Seconds an unused disk entry is kept
+                                  (0 = forever).
+        """
+        self.namespace = namespace
+        self.memory = LRUCache(max_entries)
+        self.disk_dir = os.path.join(disk_dir, namespace) if disk_dir else None
+        self.max_disk_bytes = max_disk_bytes
+        self.max_disk_age = max_disk_age
+        self._writes = 0
+        self._prune_lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value cached under key, or default."""
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        value = self._disk_get(key)
+        if value is not None:
+            self.memory.set(key, value)
+            return value
+        return default
+
+    def set(self, key, value):
+        """Store a value in memory and (if enabled) on disk."""
+        self.memory.set(key, value)
+        self._disk_set(key, value)
+
+    def delete(self, key):
+        """Remove the value cached under key from memory and disk."""
+        self.memory.delete(key)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def get_or_compute(self, content, compute):
+        """
+        Return the cached value for content, computing and storing it on a miss.
+
+        Args:
+            content (str | bytes): Content whose hash is the cache key.
+            compute (callable): Zero-argument function producing the value.
+        """
+        key = content_hash(content)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    # ── Disk Tier ────────────────────────────────────────────────────────
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_get(self, key):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.max_disk_bytes or self.max_disk_age:
+            try:
+                os.utime(path)   # recently used: evicted last
+            except OSError:
+                pass
+        return value
+
+    def _disk_set(self, key, value):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Cache] Could not write '{self.namespace}' entry to disk: {e}")
+            return
+
+        if self.max_disk_bytes or self.max_disk_age:
+            with self._prune_lock:
+                self._writes += 1
+                due = self._writes % self.PRUNE_EVERY == 1
+            if due:
+                self.prune_disk()
+
+    def prune_disk(self):
+        """
+        Enforce the disk tier's age and size limits.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return 0
+        entries = []   # (mtime, size, path)
+        for shard in os.scandir(self.disk_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()   # oldest first
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.max_disk_age if self.max_disk_age else None
+        removed = 0
+        for mtime, size, path in entries:
+            expired = cutoff is not None and mtime < cutoff
+            oversized = self.max_disk_bytes and total > self.max_disk_bytes
+            if not expired and not oversized:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
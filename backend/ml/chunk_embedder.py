@@ -0,0 +1,164 @@
+"""
+ml/chunk_embedder.py - Token-budget-aware Chunked Document Embedding
+-----------------------------------------------------------------------
+all-MiniLM-L6-v2 only sees the first 256 word-pieces of its input, so a
+long resume encoded in one piece loses everything after its first third.
+Instead, each document is split into chunks that fit the token budget:
+
+    paragraphs  →  (too long?) sentences / lines  →  (too long?) word windows
+
+and adjacent pieces are packed greedily back together up to the budget, so
+chunks follow the document's own sections where possible. The chunks of
+many documents are encoded together in one batch, then pooled back per
+document (token-weighted mean, or element-wise max) and L2-normalised.
+
+Chunks are character spans of the original text, and their vectors are
+returned alongside the pooled vector, so section-level similarity can use
+them without encoding anything again.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+
+POOLING_MODES = ("mean", "max")
+
+# Pooled document vector, chunk (start, end) spans, and (n_chunks, dim) chunk vectors
+DocumentEmbedding = namedtuple("DocumentEmbedding", ["vector", "spans", "chunk_vectors"])
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+|\n")
+_WORD = re.compile(r"\S+")
+
+
+# ── Chunking ─────────────────────────────────────────────────────────────
+
+def _split(text, start, end, pattern):
+    """Split text[start:end] at pattern matches into whitespace-trimmed spans."""
+    spans = []
+    pos = start
+    for match in pattern.finditer(text, start, end):
+        spans.append((pos, match.start()))
+        pos = match.end()
+    spans.append((pos, end))
+
+    trimmed = []
+    for s, e in spans:
+        while s < e and text[s].isspace():
+            s += 1
+        while e > s and text[e - 1].isspace():
+            e -= 1
+        if s < e:
+            trimmed.append((s, e))
+    return trimmed
+
+
+def _units(text, spans, count_tokens, budget, level=0):
+    """
+    Break spans down (paragraph → sentence → word) until each fits the
+    budget. Returns [(start, end, n_tokens)] in document order.
+    """
+    counts = count_tokens([text[s:e] for s, e in spans])
+    units = []
+    for (s, e), n in zip(spans, counts):
+        if n <= budget or level == 2:
+            units.append((s, e, n))     # a single over-long word is left to truncation
+            continue
+        if level == 0:
+            pieces = _split(text, s, e, _SENTENCE_BREAK)
+        else:
+            pieces = [(m.start(), m.end()) for m in _WORD.finditer(text, s, e)]
+        units.extend(_units(text, pieces, count_tokens, budget, level + 1))
+    return units
+
+
+def chunk_spans(text, count_tokens, budget):
+    """
+    Split a document into chunks of at most `budget` tokens.
+
+    Args:
+        text (str): Document text.
+        count_tokens (callable): list[str] -> list[int] word-piece counts.
+        budget (int): Maximum tokens per chunk (excluding special tokens).
+
+    Returns:
+        list[tuple[int, int, int]]: (start, end, n_tokens) per chunk; text[start:end]
+                                    is the chunk text.
+    """
+    paragraphs = _split(text, 0, len(text), _PARAGRAPH_BREAK)
+    if not paragraphs:
+        return []
+
+    chunks = []
+    cur_start, cur_end, cur_tokens = None, None, 0
+    for s, e, n in _units(text, paragraphs, count_tokens, budget):
+        if cur_start is not None and cur_tokens + n <= budget:
+            cur_end, cur_tokens = e, cur_tokens + n
+        else:
+            if cur_start is not None:
+                chunks.append((cur_start, cur_end, cur_tokens))
+            cur_start, cur_end, cur_tokens = s, e, n
+    chunks.append((cur_start, cur_end, cur_tokens))
+    return chunks
+
+
+# ── Pooling ──────────────────────────────────────────────────────────────
+
+def pool(chunk_vectors, weights, mode="mean"):
+    """
+    Pool chunk vectors into one L2-normalised document vector.
+
+    Args:
+        chunk_vectors (numpy.ndarray): (n_chunks, dim) chunk embeddings.
+        weights (list[int]): Token count per chunk (used by "mean").
+        mode (str): "mean" (token-weighted) or "max" (element-wise).
+
+    Returns:
+        numpy.ndarray: (dim,) float32 vector.
+    """
+    if mode == "max":
+        vector = chunk_vectors.max(axis=0)
+    else:
+        weights = np.maximum(np.asarray(weights, dtype=np.float32), 1.0)
+        vector = weights @ chunk_vectors / weights.sum()
+    norm = float(np.linalg.norm(vector))
+    return (vector / norm if norm else vector).astype(np.float32)
+
+
+# ── Batched Embedding ────────────────────────────────────────────────────
+
+def embed_documents(texts, encode, count_tokens, budget, pooling="mean"):
+    """
+    Embed many documents through their chunks, in one encode batch.
+
+    Args:
+        texts (list[str]): Document texts.
+        encode (callable): list[str] -> (n, dim) embeddings.
+        count_tokens (callable): list[str] -> list[int] word-piece counts.
+        budget (int): Maximum tokens per chunk.
+        pooling (str): "mean" or "max".
+
+    Returns:
+        list[DocumentEmbedding | None]: One entry per text (None for blank text).
+    """
+    doc_chunks = [chunk_spans(text or "", count_tokens, budget) for text in texts]
+    chunk_texts = [text[s:e] for text, chunks in zip(texts, doc_chunks) for s, e, _ in chunks]
+    if not chunk_texts:
+        return [None] * len(texts)
+    vectors = encode(chunk_texts)
+
+    results = []
+    offset = 0
+    for chunks in doc_chunks:
+        if not chunks:
+            results.append(None)
+            continue
+        chunk_vectors = vectors[offset:offset + len(chunks)]
+        offset += len(chunks)
+        results.append(DocumentEmbedding(
+            vector=pool(chunk_vectors, [n for _, _, n in chunks], pooling),
+            spans=[(s, e) for s, e, _ in chunks],
+            chunk_vectors=chunk_vectors,
+        ))
+    return results
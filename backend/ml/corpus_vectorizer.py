@@ -0,0 +1,361 @@
+"""
+ml/corpus_vectorizer.py - Corpus-level TF-IDF Vectorizer
+-----------------------------------------------------------
+A TF-IDF vectorizer whose vocabulary and document frequencies are learned
+over the whole corpus of stored resumes and job descriptions, instead of
+being re-fitted on the two documents of every match.
+
+  - fit()         : (re)build vocabulary + IDF from all stored documents
+                    (see build_corpus.py).
+  - partial_fit() : incremental refresh as new documents are ingested;
+                    updates document frequencies without a full refit.
+  - transform()   : L2-normalised sparse TF-IDF rows, O(document length).
+  - similarity()  : cosine similarity = sparse dot product of two rows.
+  - weights()     : {term: weight} form of a row, for storing on documents.
+
+IDF uses the same smoothed formula as scikit-learn's TfidfVectorizer:
+    idf(t) = ln((1 + n_docs) / (1 + df(t))) + 1
+Terms never seen in the corpus get the maximum IDF (df = 0), so matching
+still works on a cold, empty corpus.
+
+The vocabulary and document frequencies are persisted next to the trained
+ML models in ml/saved_models/. Several worker processes share that file:
+each one tracks the documents it added since its last save and merges
+them into the file's current content (under a file lock), instead of
+overwriting what the other workers saved. The version is derived from
+the statistics themselves, so two processes report the same version only
+if their IDF weights are identical.
+
+Libraries:
+  - numpy / scipy.sparse: vector maths
+  - joblib: persistence
+"""
+
+import hashlib
+import os
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:   # Windows: saves are not serialised across processes
+    fcntl = None
+
+import joblib
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class CorpusVectorizer:
+    """
+    TF-IDF vectorizer fitted once over the stored document corpus.
+
+    Expects already-preprocessed input (the space-joined output of
+    nlp_utils.get_preprocessed_string).
+
+    Reads never block: the fitted state is an immutable snapshot that
+    partial_fit() replaces atomically (copy-on-write).
+    """
+
+    MODELS_DIR = os.path.join(os.path.dirname(__file__), "saved_models")
+    VECTORIZER_PATH = os.path.join(MODELS_DIR, "corpus_tfidf.joblib")
+
+    # Persist incremental updates every N newly added documents
+    SAVE_EVERY = 25
+
+    def __init__(self, path=None):
+        """Load a previously persisted corpus state, if any."""
+        self.path = path or self.VECTORIZER_PATH
+        self._lock = threading.Lock()
+        self._pending = 0
+        # Documents added since the last save: {term: df increment}, count
+        self._delta = Counter()
+        self._delta_docs = 0
+        self._set_state({}, [], 0)
+        self._load()
+
+    # ── Properties ───────────────────────────────────────────────────────
+
+    @property
+    def n_docs(self):
+        """Number of documents the IDF statistics are based on."""
+        return self._state["n_docs"]
+
+    @property
+    def version(self):
+        """
+        Fingerprint of the corpus statistics (n_docs + document frequencies):
+        equal versions mean identical IDF weights, in any process.
+        """
+        state = self._state
+        if state["version"] is None:
+            digest = hashlib.sha1(str(state["n_docs"]).encode("utf-8"))
+            for term, idx in sorted(state["vocabulary"].items()):
+                digest.update(f"\0{term}\0{state['doc_freq'][idx]}".encode("utf-8"))
+            state["version"] = digest.hexdigest()[:16]
+        return state["version"]
+
+    @property
+    def vocabulary_size(self):
+        """Number of distinct terms in the corpus vocabulary."""
+        return len(self._state["vocabulary"])
+
+    # ── Fitting ──────────────────────────────────────────────────────────
+
+    def fit(self, documents):
+        """
+        Rebuild vocabulary and IDF from scratch over a full corpus.
+
+        Args:
+            documents (iterable[str]): Preprocessed documents.
+        """
+        vocabulary = {}
+        doc_freq = []
+        n_docs = 0
+        for doc in documents:
+            n_docs += 1
+            for term in set(doc.split()):
+                idx = vocabulary.get(term)
+                if idx is None:
+                    vocabulary[term] = len(doc_freq)
+                    doc_freq.append(1)
+                else:
+                    doc_freq[idx] += 1
+
+        with self._lock:
+            self._set_state(vocabulary, doc_freq, n_docs)
+            # A full refit replaces the shared state instead of merging into it
+            self._delta = Counter()
+            self._delta_docs = 0
+            self._pending = 0
+            with self._file_lock():
+                self._write(self._state)
+
+    def partial_fit(self, documents):
+        """
+        Incrementally add new documents to the corpus statistics.
+
+        Only the document frequencies of the new documents' terms change;
+        no refit of the existing corpus is needed.
+
+        Args:
+            documents (iterable[str]): Newly ingested preprocessed documents.
+        """
+        documents = [d for d in documents if d and d.strip()]
+        if not documents:
+            return
+
+        with self._lock:
+            state = self._state
+            vocabulary = dict(state["vocabulary"])
+            doc_freq = list(state["doc_freq"])
+            for doc in documents:
+                terms = set(doc.split())
+                self._delta.update(terms)
+                for term in terms:
+                    idx = vocabulary.get(term)
+                    if idx is None:
+                        vocabulary[term] = len(doc_freq)
+                        doc_freq.append(1)
+                    else:
+                        doc_freq[idx] += 1
+
+            self._set_state(vocabulary, doc_freq, state["n_docs"] + len(documents))
+            self._delta_docs += len(documents)
+            self._pending += len(documents)
+            if self._pending >= self.SAVE_EVERY:
+                self._save_locked()
+                self._pending = 0
+
+    # ── Transformation ───────────────────────────────────────────────────
+
+    def transform(self, documents):
+        """
+        Convert preprocessed documents into L2-normalised TF-IDF rows.
+
+        Columns are the corpus vocabulary followed by any out-of-vocabulary
+        terms seen in this call, so rows of the same call are comparable.
+
+        Args:
+            documents (list[str]): Preprocessed documents.
+
+        Returns:
+            scipy.sparse.csr_matrix: Shape (len(documents), n_columns).
+        """
+        state = self._state
+        vocabulary = state["vocabulary"]
+        idf = state["idf"]
+        oov_idf = state["oov_idf"]
+        n_vocab = len(vocabulary)
+        local_oov = {}
+
+        indptr = [0]
+        indices = []
+        data = []
+        for doc in documents:
+            counts = Counter(doc.split())
+            row_idx = []
+            row_val = []
+            for term, tf in counts.items():
+                idx = vocabulary.get(term)
+                if idx is None:
+                    idx = local_oov.setdefault(term, n_vocab + len(local_oov))
+                    weight = tf * oov_idf
+                else:
+                    weight = tf * idf[idx]
+                row_idx.append(idx)
+                row_val.append(weight)
+
+            norm = np.sqrt(np.dot(row_val, row_val)) if row_val else 0.0
+            if norm > 0:
+                row_val = [v / norm for v in row_val]
+            indices.extend(row_idx)
+            data.extend(row_val)
+            indptr.append(len(indices))
+
+        return csr_matrix(
+            (np.asarray(data, dtype=np.float64), indices, indptr),
+            shape=(len(documents), n_vocab + len(local_oov)),
+        )
+
+    def similarity(self, doc_a, doc_b):
+        """
+        Cosine similarity between two preprocessed documents.
+
+        Returns:
+            float: Similarity between 0 and 1.
+        """
+        if not doc_a.strip() or not doc_b.strip():
+            return 0.0
+        matrix = self.transform([doc_a, doc_b])
+        return float(matrix[0].multiply(matrix[1]).sum())
+
+    def weights(self, document):
+        """
+        Sparse TF-IDF vector of one document as a {term: weight} dict.
+
+        Keyed by term rather than column index so stored vectors survive
+        vocabulary growth; compare them with weights_similarity().
+
+        Args:
+            document (str): Preprocessed document.
+
+        Returns:
+            dict: L2-normalised term weights.
+        """
+        state = self._state
+        vocabulary = state["vocabulary"]
+        idf = state["idf"]
+        oov_idf = state["oov_idf"]
+
+        weights = {}
+        for term, tf in Counter(document.split()).items():
+            idx = vocabulary.get(term)
+            weights[term] = tf * (oov_idf if idx is None else float(idf[idx]))
+
+        norm = float(np.sqrt(sum(w * w for w in weights.values())))
+        if norm > 0:
+            weights = {term: w / norm for term, w in weights.items()}
+        return weights
+
+    @staticmethod
+    def weights_similarity(weights_a, weights_b):
+        """Cosine similarity (sparse dot product) of two weights() dicts."""
+        if len(weights_a) > len(weights_b):
+            weights_a, weights_b = weights_b, weights_a
+        return float(sum(
+            w * weights_b[term] for term, w in weights_a.items() if term in weights_b
+        ))
+
+    # ── Persistence ──────────────────────────────────────────────────────
+
+    def save(self):
+        """
+        Merge the documents added by this process into the persisted corpus
+        statistics, and adopt the merged result (which includes the
+        documents saved meanwhile by other worker processes).
+        """
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        """save() body; caller holds self._lock."""
+        with self._file_lock():
+            saved = self._read()
+            if saved is not None and self._delta_docs:
+                vocabulary = dict(saved["vocabulary"])
+                doc_freq = list(saved["doc_freq"])
+                for term, count in self._delta.items():
+                    idx = vocabulary.get(term)
+                    if idx is None:
+                        vocabulary[term] = len(doc_freq)
+                        doc_freq.append(count)
+                    else:
+                        doc_freq[idx] += count
+                self._set_state(vocabulary, doc_freq, saved["n_docs"] + self._delta_docs)
+            elif saved is not None:
+                self._set_state(saved["vocabulary"], saved["doc_freq"], saved["n_docs"])
+            self._write(self._state)
+            self._delta = Counter()
+            self._delta_docs = 0
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialise read-merge-write cycles across worker processes."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self):
+        """Return the persisted statistics, or None if there are none."""
+        if not os.path.exists(self.path):
+            return None
+        return joblib.load(self.path)
+
+    def _write(self, state):
+        """Atomically persist vocabulary and document frequencies."""
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        joblib.dump(
+            {
+                "vocabulary": state["vocabulary"],
+                "doc_freq": state["doc_freq"],
+                "n_docs": state["n_docs"],
+            },
+            tmp_path,
+        )
+        os.replace(tmp_path, self.path)
+
+    def _load(self):
+        """Load a previously persisted corpus state from disk."""
+        try:
+            saved = self._read()
+            if saved is not None:
+                self._set_state(saved["vocabulary"], saved["doc_freq"], saved["n_docs"])
+                print(
+                    f"[Corpus TF-IDF] Loaded vocabulary of {self.vocabulary_size} "
+                    f"terms over {self.n_docs} documents."
+                )
+        except Exception as e:
+            print(f"[Corpus TF-IDF] Could not load corpus vectorizer: {e}")
+
+    # ── Internal Helpers ─────────────────────────────────────────────────
+
+    def _set_state(self, vocabulary, doc_freq, n_docs):
+        """Compute IDF weights and publish a new immutable state snapshot."""
+        df = np.asarray(doc_freq, dtype=np.float64)
+        idf = np.log((1.0 + n_docs) / (1.0 + df)) + 1.0
+        self._state = {
+            "vocabulary": vocabulary,
+            "doc_freq": doc_freq,
+            "n_docs": n_docs,
+            "version": None,   # computed on first access (see version)
+            "idf": idf,
+            "oov_idf": float(np.log(1.0 + n_docs) + 1.0),
+        }
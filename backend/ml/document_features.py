@@ -0,0 +1,190 @@
+"""
+ml/document_features.py - Precomputed Matching Features
+----------------------------------------------------------
+Computes the NLP/AI features of a resume or job description once, at
+ingest time, so that matching reads stored features instead of re-running
+spaCy, TF-IDF and the transformer on every request.
+
+Stored feature document (field "features" on resumes / jobs):
+{
+    preprocess_version : int    (nlp_utils.PREPROCESS_VERSION),
+    tokens             : str    (lemmatized, stop-word-free token string),
+    model_id           : str    (AIEngine.EMBEDDING_ID: model + precision + pooling),
+    embedding          : bytes  (float32 384-d pooled document vector, or None),
+    chunk_spans        : [[start, end]]  (character spans of the embedded chunks),
+    chunk_embeddings   : bytes  (float32 (n_chunks, 384) chunk vectors, or None)
+}
+
+Each feature is only trusted when its version / model id matches the
+running pipeline; stale features are recomputed from the cheapest valid
+source. TF-IDF weights are not stored: the corpus statistics change with
+every ingested document, so they are computed from the stored tokens at
+match time (no spaCy pass).
+"""
+
+import numpy as np
+
+from ml.nlp_utils import (
+    get_preprocessed_string,
+    get_preprocessed_strings,
+    PREPROCESS_VERSION,
+)
+from ml import model_registry
+
+
+def compute_document_features(text, add_to_corpus=False):
+    """
+    Compute all matching features for a document.
+
+    Args:
+        text (str): Raw resume or JD text.
+        add_to_corpus (bool): Also add the document to the corpus TF-IDF
+                              statistics (use for newly ingested documents).
+
+    Returns:
+        dict: Feature document ready to be stored in MongoDB.
+    """
+    return compute_document_features_many([text], add_to_corpus=add_to_corpus)[0]
+
+
+def compute_document_features_many(texts, add_to_corpus=False):
+    """
+    Batched compute_document_features(): one spaCy nlp.pipe() pass and one
+    transformer batch for all documents.
+
+    Args:
+        texts (list[str]): Raw resume or JD texts.
+        add_to_corpus (bool): Also add the documents to the corpus TF-IDF
+                              statistics (use for newly ingested documents).
+
+    Returns:
+        list[dict]: Feature document per text, in input order.
+    """
+    texts = list(texts)
+    tokens_list = get_preprocessed_strings(texts)
+
+    vectorizer = model_registry.get_corpus_vectorizer()
+    if add_to_corpus:
+        vectorizer.partial_fit(tokens_list)
+
+    ai_engine = model_registry.get_ai_engine()
+    documents = [None] * len(texts)
+    if ai_engine.ai_available and any(texts):
+        try:
+            documents = ai_engine.embed_documents(texts)
+        except Exception as e:
+            print(f"[Features] Embedding failed: {e}")
+
+    return [
+        {
+            "preprocess_version": PREPROCESS_VERSION,
+            "tokens": tokens,
+            "model_id": ai_engine.EMBEDDING_ID if document is not None else None,
+            "embedding": (
+                np.asarray(document.vector, dtype=np.float32).tobytes()
+                if document is not None else None
+            ),
+            "chunk_spans": [list(span) for span in document.spans] if document else None,
+            "chunk_embeddings": (
+                np.asarray(document.chunk_vectors, dtype=np.float32).tobytes()
+                if document is not None else None
+            ),
+        }
+        for tokens, document in zip(tokens_list, documents)
+    ]
+
+
+def features_are_current(features):
+    """
+    True if stored features match the running pipeline: same preprocessing
+    and, while the transformer is available, the same embedding model.
+    (TF-IDF weights are not stored; they are computed from the tokens.)
+    """
+    if not features or features.get("preprocess_version") != PREPROCESS_VERSION:
+        return False
+    ai_engine = model_registry.get_ai_engine()
+    return not ai_engine.ai_available or features.get("model_id") == ai_engine.EMBEDDING_ID
+
+
+# ── Readers ──────────────────────────────────────────────────────────────
+
+def get_tokens(features, text):
+    """Return the preprocessed token string, from features when still valid."""
+    if features and features.get("preprocess_version") == PREPROCESS_VERSION:
+        return features.get("tokens", "")
+    return get_preprocessed_string(text)
+
+
+def get_tokens_many(features_list, texts):
+    """
+    Batched get_tokens(): documents without valid stored tokens are
+    preprocessed together in one spaCy nlp.pipe() pass.
+
+    Args:
+        features_list (list[dict|None]): Stored features per document.
+        texts (list[str]): Raw text per document.
+
+    Returns:
+        list[str]: Preprocessed token string per document, in order.
+    """
+    tokens = [None] * len(texts)
+    missing = []
+    for i, (features, text) in enumerate(zip(features_list, texts)):
+        if features and features.get("preprocess_version") == PREPROCESS_VERSION:
+            tokens[i] = features.get("tokens", "")
+        else:
+            missing.append(i)
+
+    for i, value in zip(missing, get_preprocessed_strings([texts[i] for i in missing])):
+        tokens[i] = value
+    return tokens
+
+
+def get_tfidf_weights(features, text, vectorizer):
+    """Return the {term: weight} TF-IDF vector under the current corpus statistics."""
+    return vectorizer.weights(get_tokens(features, text))
+
+
+def get_embedding(features, model_id):
+    """
+    Return the stored embedding as a float32 array, or None if it is
+    missing or was produced by a different model.
+    """
+    if not features or features.get("model_id") != model_id:
+        return None
+    raw = features.get("embedding")
+    if not raw:
+        return None
+    return np.frombuffer(raw, dtype=np.float32)
+
+
+def get_chunk_embeddings(features, model_id):
+    """
+    Return the stored chunk spans and chunk vectors of a document, or None
+    if they are missing or were produced by a different model.
+
+    Returns:
+        tuple[list[tuple[int, int]], numpy.ndarray] | None:
+            (character spans, (n_chunks, dim) float32 vectors).
+    """
+    if not features or features.get("model_id") != model_id:
+        return None
+    spans, raw = features.get("chunk_spans"), features.get("chunk_embeddings")
+    if not spans or not raw:
+        return None
+    vectors = np.frombuffer(raw, dtype=np.float32).reshape(len(spans), -1)
+    return [tuple(span) for span in spans], vectors
+
+
+def index_document(index, doc_id, features):
+    """
+    Add a document's stored embedding to a nearest-neighbour index.
+
+    Args:
+        index (EmbeddingIndex): Target index (see model_registry).
+        doc_id (str): Document ID.
+        features (dict): Stored feature document.
+    """
+    embedding = get_embedding(features, index.model_id)
+    if embedding is not None:
+        index.add(doc_id, embedding)
@@ -0,0 +1,236 @@
+"""
+ml/embedding_cache.py - Transformer Embedding Cache
+------------------------------------------------------
+Caches sentence-transformer embeddings keyed by (model name, SHA-256 of
+the text), so identical texts (the same JD scored against every candidate,
+repeated requests, re-uploads) are never re-encoded.
+
+Two tiers:
+  - In-memory LRU of float32 vectors (per process).
+  - Optional on-disk store shared by every worker process and surviving
+    restarts:
+        <disk_dir>/<model>/vectors.f16   : float16 rows, memory-mapped for reads
+        <disk_dir>/<model>/index.sqlite  : text hash -> row number
+
+Writers allocate a row inside a SQLite write transaction, write the vector
+bytes, and only then commit the index entry, so readers never see a row
+whose data is not on disk yet. float16 halves the footprint; the rounding
+error (~1e-3 relative) is far below what changes a cosine similarity score.
+
+The store holds at most `max_disk_rows` vectors: rows are allocated in a
+ring, and once it is full the oldest rows are recycled (first in, first
+out). A recycled row's index entries are deleted and committed before its
+bytes are overwritten, and readers re-check their index entries after
+reading the vectors, so a lookup never returns another text's vector.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from ml.cache import LRUCache, content_hash
+
+# Keys bound per SQLite IN (...) query (below SQLite's variable limit)
+SQL_BATCH = 500
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + memory-mapped float16 store) embedding cache."""
+
+    def __init__(self, model_id, dim, max_entries=4096, disk_dir=None,
+                 max_disk_rows=0):
+        """
+        Args:
+            model_id (str): Embedding model name; each model gets its own store.
+            dim (int): Embedding dimensionality.
+            max_entries (int): In-memory LRU capacity.
+            disk_dir (str): Root directory of the disk store, or None to keep
+                            the cache memory-only.
+            max_disk_rows (int): Vectors kept on disk before the oldest are
+                                 recycled (0 = unbounded).
+        """
+        self.model_id = model_id
+        self.dim = dim
+        self.max_disk_rows = max_disk_rows
+        self.memory = LRUCache(max_entries)
+        self.disk_dir = (
+            os.path.join(disk_dir, model_id.replace("/", "_")) if disk_dir else None
+        )
+        self._local = threading.local()
+        self._map = None
+        self._map_lock = threading.Lock()
+        if self.disk_dir:
+            try:
+                os.makedirs(self.disk_dir, exist_ok=True)
+                with self._connect() as conn:
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embeddings "
+                        "(key TEXT PRIMARY KEY, row INTEGER NOT NULL)"
+                    )
+                    conn.execute(
+                        "CREATE INDEX IF NOT EXISTS embeddings_row ON embeddings (row)"
+                    )
+                    # Ring cursor: next row to allocate
+                    conn.execute(
+                        "CREATE TABLE IF NOT EXISTS meta "
+                        "(name TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+                    )
+                    conn.execute(
+                        "INSERT OR IGNORE INTO meta (name, value) "
+                        "SELECT 'next_row', COALESCE(MAX(row), -1) + 1 FROM embeddings"
+                    )
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Embedding Cache] Disk store disabled: {e}")
+                self.disk_dir = None
+
+    # ── Lookup ───────────────────────────────────────────────────────────
+
+    def get_many(self, texts):
+        """
+        Look up the cached embeddings of several texts.
+
+        Returns:
+            list[numpy.ndarray | None]: float32 vector per text, None on a miss.
+        """
+        keys = [content_hash(t) for t in texts]
+        results = [self.memory.get(key) for key in keys]
+
+        missing = [i for i, vec in enumerate(results) if vec is None]
+        if missing and self.disk_dir:
+            for i, vec in zip(missing, self._disk_get([keys[i] for i in missing])):
+                if vec is not None:
+                    results[i] = vec
+                    self.memory.set(keys[i], vec)
+        return results
+
+    def set_many(self, texts, vectors):
+        """Store freshly computed embeddings in memory and on disk."""
+        keys = [content_hash(t) for t in texts]
+        vectors = [np.asarray(v, dtype=np.float32) for v in vectors]
+        for key, vec in zip(keys, vectors):
+            self.memory.set(key, vec)
+        if self.disk_dir:
+            self._disk_set(keys, vectors)
+
+    # ── Disk Store ───────────────────────────────────────────────────────
+
+    @property
+    def _vectors_path(self):
+        return os.path.join(self.disk_dir, "vectors.f16")
+
+    def _connect(self):
+        """Per-thread SQLite connection to the index database."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                os.path.join(self.disk_dir, "index.sqlite"),
+                timeout=30,
+                isolation_level=None,   # explicit transactions below
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _rows(self, needed_rows):
+        """Return a read-only memory map covering at least `needed_rows` rows."""
+        with self._map_lock:
+            if self._map is None or len(self._map) < needed_rows:
+                n_rows = os.path.getsize(self._vectors_path) // (self.dim * 2)
+                self._map = (
+                    np.memmap(self._vectors_path, dtype=np.float16, mode="r",
+                              shape=(n_rows, self.dim))
+                    if n_rows else np.zeros((0, self.dim), dtype=np.float16)
+                )
+            return self._map
+
+    def _lookup_rows(self, conn, keys):
+        """{key: row} for the keys present in the index, batched under SQLite's limit."""
+        rows = {}
+        for start in range(0, len(keys), SQL_BATCH):
+            batch = keys[start:start + SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.update(conn.execute(
+                f"SELECT key, row FROM embeddings WHERE key IN ({placeholders})",
+                batch,
+            ).fetchall())
+        return rows
+
+    def _disk_get(self, keys):
+        try:
+            conn = self._connect()
+            rows = self._lookup_rows(conn, keys)
+            if not rows:
+                return [None] * len(keys)
+
+            vectors = self._rows(max(rows.values()) + 1)
+            found = {key: np.array(vectors[row], dtype=np.float32) for key, row in rows.items()}
+
+            # A row recycled while we read it has lost its index entry
+            # (deleted before the overwrite): drop such results
+            if self.max_disk_rows:
+                current = self._lookup_rows(conn, list(found))
+                found = {key: vec for key, vec in found.items() if current.get(key) == rows[key]}
+            return [found.get(key) for key in keys]
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"[Embedding Cache] Disk lookup failed: {e}")
+            return [None] * len(keys)
+
+    def _disk_set(self, keys, vectors):
+        try:
+            conn = self._connect()
+            new = dict(zip(keys, vectors))
+            if self.max_disk_rows:
+                # Keep the most recent vectors if a batch exceeds the store
+                new = dict(list(new.items())[-self.max_disk_rows:])
+
+            # 1. Allocate rows; free recycled ones before overwriting them
+            conn.execute("BEGIN IMMEDIATE")   # serialises writers across processes
+            try:
+                known = self._lookup_rows(conn, list(new))
+                new = [(k, v) for k, v in new.items() if k not in known]
+                if new:
+                    (next_row,) = conn.execute(
+                        "SELECT value FROM meta WHERE name = 'next_row'"
+                    ).fetchone()
+                    if self.max_disk_rows and next_row + len(new) > self.max_disk_rows:
+                        next_row = 0   # wrap around: recycle the oldest rows
+                    conn.execute(
+                        "DELETE FROM embeddings WHERE row >= ? AND row < ?",
+                        (next_row, next_row + len(new)),
+                    )
+                    conn.execute(
+                        "UPDATE meta SET value = ? WHERE name = 'next_row'",
+                        (next_row + len(new),),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if not new:
+                return
+
+            # 2. Write the vectors into the allocated rows
+            data = np.vstack([v for _, v in new]).astype(np.float16)
+            mode = "r+b" if os.path.exists(self._vectors_path) else "w+b"
+            with open(self._vectors_path, mode) as f:
+                f.seek(next_row * self.dim * 2)
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+            # 3. Publish the index entries (another process may have cached
+            #    the same text meanwhile: its entry wins, our row stays unused)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO embeddings (key, row) VALUES (?, ?)",
+                    [(k, next_row + i) for i, (k, _) in enumerate(new)],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except (OSError, ValueError, sqlite3.Error) as e:
+            print(f"[Embedding Cache] Could not write to disk store: {e}")
@@ -0,0 +1,516 @@
+"""
+ml/embedding_index.py - Nearest-neighbour Embedding Index
+-----------------------------------------------------------
+In-memory vector index over the stored document embeddings, used to answer
+"top-K resumes for a job" and "top-K jobs for a resume" without scoring
+every stored document pair through the full matching pipeline.
+
+  - add() / remove() : kept in sync with uploads and deletions.
+  - search()         : top-K by cosine similarity.
+  - train_ivf()      : optional approximate mode (inverted file index).
+  - ensure_trained() : train the IVF lists on a background thread.
+
+Search modes:
+  - flat : exact search; one matrix-vector product over all rows.
+  - ivf  : vectors are clustered with k-means; a query only scores the rows
+           of its `nprobe` nearest clusters. Falls back to flat search
+           until the index holds at least IVF_MIN_SIZE vectors and its
+           clusters are trained. Training runs in build_embedding_index.py,
+           or on a background thread started at warm-up (or by the first
+           search that finds the index untrained); the centroids are fitted
+           outside the lock and swapped in when ready, so searches never
+           wait for k-means.
+
+Vectors are L2-normalised on insert, so cosine similarity is a plain dot
+product. The index is persisted to ml/saved_models/<name>_index.npz and
+rebuilt from MongoDB by build_embedding_index.py.
+
+Each worker process holds its own in-memory copy of the index. Several
+workers share the file: each one tracks the documents it added or removed
+since its last save and replays them onto the file's current content
+(under a file lock), instead of overwriting what the other workers saved.
+Searches pick up the file again when another worker has saved it (checked
+at most every RELOAD_SECONDS), so e.g. vectors re-embedded by the
+migration after a model change reach every worker. Updates are saved
+every SAVE_EVERY operations, so a crash loses up to SAVE_EVERY - 1
+updates; build_embedding_index.py restores them from the embeddings
+stored in MongoDB.
+
+Libraries:
+  - numpy: vector maths and persistence
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:   # Windows: saves are not serialised across processes
+    fcntl = None
+
+import numpy as np
+
+
+class EmbeddingIndex:
+    """
+    Flat / IVF cosine-similarity index keyed by document ID.
+
+    Rows live in one contiguous float32 matrix that grows geometrically;
+    removal swaps the last row into the freed slot, so add() and remove()
+    are O(dim) and search() never has to skip holes.
+    """
+
+    MODELS_DIR = os.path.join(os.path.dirname(__file__), "saved_models")
+
+    # Persist incremental updates every N add/remove operations
+    SAVE_EVERY = 25
+
+    # Minimum seconds between checks for a file saved by another worker
+    RELOAD_SECONDS = 5
+
+    # IVF clustering only pays off once the index is reasonably large
+    IVF_MIN_SIZE = 5000
+
+    def __init__(self, name, model_id, dim, mode="flat", n_lists=0, nprobe=8,
+                 path=None):
+        """
+        Args:
+            name (str): Index name ("resumes" / "jobs"), used for the file name.
+            model_id (str): Embedding model the vectors come from; a saved
+                            index built with another model is discarded.
+            dim (int): Embedding dimensionality.
+            mode (str): "flat" (exact) or "ivf" (approximate).
+            n_lists (int): IVF clusters (0 = sqrt of the index size).
+            nprobe (int): IVF clusters scanned per query.
+            path (str): Override for the persistence file.
+        """
+        self.name = name
+        self.model_id = model_id
+        self.dim = dim
+        self.mode = mode
+        self.n_lists = n_lists
+        self.nprobe = nprobe
+        self.path = path or os.path.join(self.MODELS_DIR, f"{name}_index.npz")
+
+        self._lock = threading.RLock()
+        self._pending = 0
+        # Updates since the last save: {doc_id: normalised vector, or None
+        # if removed}, replayed onto the file content saved by other workers
+        self._changes = {}
+        # (mtime, size) of the file when last read or written
+        self._file_stamp = None
+        self._checked_at = time.monotonic()
+        self._trainer = None
+        # Documents added while the IVF lists are being trained
+        self._touched = None
+        self._reset()
+        self._load()
+
+    def __len__(self):
+        return self._size
+
+    # ── Updates ──────────────────────────────────────────────────────────
+
+    def add(self, doc_id, vector):
+        """
+        Insert or replace the vector of a document.
+
+        Args:
+            doc_id (str): Document ID.
+            vector (array-like): Embedding of length `dim`.
+        """
+        vector = self._normalise(vector)
+        if vector is None:
+            return
+
+        with self._lock:
+            self._put(doc_id, vector)
+            self._changes[doc_id] = vector
+            self._mark_dirty()
+
+    def remove(self, doc_id):
+        """Remove a document from the index (no-op if it is not indexed)."""
+        with self._lock:
+            # Recorded even if not indexed here: another worker may have added it
+            self._changes[doc_id] = None
+            if self._delete(doc_id):
+                self._mark_dirty()
+
+    def _put(self, doc_id, vector):
+        """Insert or replace a normalised vector; caller holds the lock."""
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = self._size
+            self._grow(row + 1)
+            self._ids.append(doc_id)
+            self._rows[doc_id] = row
+            self._size += 1
+        self._vectors[row] = vector
+        if self._touched is not None:
+            self._touched.add(doc_id)
+        if self._centroids is not None:
+            self._lists[row] = int(np.argmax(self._centroids @ vector))
+
+    def _delete(self, doc_id):
+        """Remove a row; caller holds the lock. Returns False if absent."""
+        row = self._rows.pop(doc_id, None)
+        if row is None:
+            return False
+        last = self._size - 1
+        if row != last:
+            # Move the last row into the freed slot
+            moved_id = self._ids[last]
+            self._vectors[row] = self._vectors[last]
+            self._lists[row] = self._lists[last]
+            self._ids[row] = moved_id
+            self._rows[moved_id] = row
+        self._ids.pop()
+        self._size = last
+        return True
+
+    def rebuild(self, items):
+        """
+        Replace the whole index content, in memory and on disk (a rebuild
+        replaces the shared file instead of merging into it).
+
+        Args:
+            items (iterable[tuple]): (doc_id, vector) pairs.
+        """
+        ids, vectors = [], []
+        for doc_id, vector in items:
+            vector = self._normalise(vector)
+            if vector is not None:
+                ids.append(doc_id)
+                vectors.append(vector)
+
+        with self._lock:
+            self._reset()
+            self._grow(len(ids))
+            if ids:
+                self._vectors[:len(ids)] = np.vstack(vectors)
+            self._ids = ids
+            self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+            self._size = len(ids)
+            self._changes = {}
+        if self.mode == "ivf" and len(ids) >= self.IVF_MIN_SIZE:
+            self.train_ivf()
+        with self._lock:
+            with self._file_lock():
+                self._write()
+            self._changes = {}
+            self._pending = 0
+
+    # ── Search ───────────────────────────────────────────────────────────
+
+    def search(self, vector, k=10, exclude=None):
+        """
+        Return the k most similar documents.
+
+        Args:
+            vector (array-like): Query embedding.
+            k (int): Number of results.
+            exclude (str): Document ID to leave out (e.g. the query itself).
+
+        Returns:
+            list[tuple]: (doc_id, cosine_similarity) pairs, best first.
+        """
+        query = self._normalise(vector)
+        if query is None or k <= 0:
+            return []
+
+        self.ensure_trained()
+        with self._lock:
+            self._reload_if_changed()
+            if self._size == 0:
+                return []
+
+            if self._centroids is not None:
+                probe = np.argsort(self._centroids @ query)[::-1][:self.nprobe]
+                rows = np.flatnonzero(np.isin(self._lists[:self._size], probe))
+                scores = self._vectors[rows] @ query
+            else:
+                rows = None
+                scores = self._vectors[:self._size] @ query
+
+            wanted = min(k + (1 if exclude else 0), len(scores))
+            if wanted == 0:
+                return []
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+            top = top[np.argsort(-scores[top])]
+
+            results = []
+            for i in top:
+                doc_id = self._ids[rows[i] if rows is not None else i]
+                if doc_id == exclude:
+                    continue
+                results.append((doc_id, float(scores[i])))
+            return results[:k]
+
+    # ── Approximate Mode ─────────────────────────────────────────────────
+
+    def ensure_trained(self):
+        """
+        Start IVF training on a background thread if the index needs it
+        (IVF mode, large enough, not trained, not already training).
+        Searches stay exact until the trained clusters are swapped in.
+        """
+        with self._lock:
+            if (
+                self.mode != "ivf"
+                or self._centroids is not None
+                or self._size < self.IVF_MIN_SIZE
+                or (self._trainer is not None and self._trainer.is_alive())
+            ):
+                return
+            self._trainer = threading.Thread(
+                target=self._train_in_background,
+                name=f"ivf-train-{self.name}",
+                daemon=True,
+            )
+            self._trainer.start()
+
+    def _train_in_background(self):
+        try:
+            self.train_ivf()
+        except Exception as e:
+            print(f"[Embedding Index] IVF training failed for '{self.name}': {e}")
+
+    def train_ivf(self, n_iter=10, sample_size=50000, seed=42):
+        """
+        Cluster the indexed vectors (spherical k-means) for IVF search.
+
+        k-means runs on a snapshot of the vectors without holding the lock;
+        the centroids and list assignments are swapped in at the end, and
+        documents added meanwhile are assigned to their nearest list then.
+
+        Args:
+            n_iter (int): k-means iterations.
+            sample_size (int): Maximum vectors used to fit the centroids.
+            seed (int): Random seed for sampling and initialisation.
+        """
+        with self._lock:
+            n = self._size
+            if n == 0:
+                return
+            snapshot_ids = list(self._ids)
+            vectors = self._vectors[:n].copy()
+            self._touched = set()
+
+        try:
+            n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+            n_lists = min(n_lists, n)
+
+            rng = np.random.default_rng(seed)
+            sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+            for _ in range(n_iter):
+                assign = np.argmax(sample @ centroids.T, axis=1)
+                for c in range(n_lists):
+                    members = sample[assign == c]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[c] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+            snapshot_lists = np.argmax(vectors @ centroids.T, axis=1).astype(np.int32)
+            snapshot_rows = {doc_id: row for row, doc_id in enumerate(snapshot_ids)}
+
+            with self._lock:
+                # Rows moved (removals) or vectors changed (adds) during
+                # training: reuse snapshot assignments, recompute the rest
+                lists = np.empty(self._size, dtype=np.int32)
+                stale = []
+                for row, doc_id in enumerate(self._ids):
+                    old_row = snapshot_rows.get(doc_id)
+                    if old_row is None or doc_id in self._touched:
+                        stale.append(row)
+                    else:
+                        lists[row] = snapshot_lists[old_row]
+                if stale:
+                    lists[stale] = np.argmax(self._vectors[stale] @ centroids.T, axis=1)
+                self._lists[:self._size] = lists
+                self._centroids = centroids
+                print(f"[Embedding Index] Trained {n_lists} IVF lists over {n} '{self.name}' vectors.")
+                self._mark_dirty()
+        finally:
+            with self._lock:
+                self._touched = None
+
+    # ── Persistence ──────────────────────────────────────────────────────
+
+    def save(self):
+        """
+        Replay the updates made by this process onto the persisted index
+        (which includes what other workers saved meanwhile), adopt the
+        merged result and write it back (atomic rename).
+        """
+        with self._lock:
+            with self._file_lock():
+                self._merge_saved()
+                self._write()
+            self._changes = {}
+            self._pending = 0
+
+    def _reload_if_changed(self):
+        """Merge a file saved by another worker; throttled to RELOAD_SECONDS."""
+        now = time.monotonic()
+        if now - self._checked_at < self.RELOAD_SECONDS:
+            return
+        self._checked_at = now
+        try:
+            self._merge_saved()
+        except Exception as e:
+            print(f"[Embedding Index] Could not reload '{self.name}' index: {e}")
+
+    def _merge_saved(self):
+        """
+        If the file changed since this process last read or wrote it, adopt
+        its content and replay this process's unsaved updates on top.
+        Caller holds the lock.
+        """
+        stamp = self._stamp()
+        if stamp is None or stamp == self._file_stamp:
+            return
+        saved = self._read()
+        self._file_stamp = stamp
+        if saved is None:
+            return
+        # Keep locally trained clusters if the file has none yet
+        centroids = self._centroids if saved["centroids"] is None else None
+        self._apply(saved)
+        if centroids is not None:
+            self._centroids = centroids
+            if self._size:
+                self._lists[:self._size] = np.argmax(
+                    self._vectors[:self._size] @ centroids.T, axis=1
+                )
+        if self._touched is not None:
+            # IVF training in progress: reassign every reloaded row afterwards
+            self._touched.update(self._ids)
+        for doc_id, vector in self._changes.items():
+            if vector is None:
+                self._delete(doc_id)
+            else:
+                self._put(doc_id, vector)
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialise read-merge-write cycles across worker processes."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _stamp(self):
+        """(mtime, size) of the persisted file, or None if there is none."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        """Return the persisted index, or None if absent or built with another model."""
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path) as saved:
+            if str(saved["model_id"]) != self.model_id:
+                return None
+            centroids = saved["centroids"]
+            return {
+                "ids": [str(i) for i in saved["ids"]],
+                "vectors": saved["vectors"].astype(np.float32),
+                "lists": saved["lists"].astype(np.int32),
+                "centroids": centroids.astype(np.float32) if len(centroids) else None,
+            }
+
+    def _write(self):
+        """Atomically persist IDs, vectors and IVF state; caller holds the lock."""
+        n = self._size
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        # Written through a file object: np.savez would append ".npz" to the name
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                model_id=np.array(self.model_id),
+                ids=np.array(self._ids, dtype=str),
+                vectors=self._vectors[:n],
+                lists=self._lists[:n],
+                centroids=(
+                    self._centroids if self._centroids is not None
+                    else np.zeros((0, self.dim), dtype=np.float32)
+                ),
+            )
+        os.replace(tmp_path, self.path)
+        self._file_stamp = self._stamp()
+
+    def _apply(self, saved):
+        """Replace the in-memory content with a persisted index."""
+        ids = saved["ids"]
+        self._reset()
+        self._grow(len(ids))
+        self._vectors[:len(ids)] = saved["vectors"]
+        self._lists[:len(ids)] = saved["lists"]
+        self._ids = ids
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._size = len(ids)
+        self._centroids = saved["centroids"]
+
+    def _load(self):
+        """Load a previously persisted index from disk."""
+        try:
+            self._file_stamp = self._stamp()
+            saved = self._read()
+            if saved is None:
+                if self._file_stamp is not None:
+                    print(f"[Embedding Index] Ignoring '{self.name}' index built with another model.")
+                return
+            self._apply(saved)
+            print(f"[Embedding Index] Loaded {self._size} '{self.name}' vectors.")
+        except Exception as e:
+            print(f"[Embedding Index] Could not load '{self.name}' index: {e}")
+            self._reset()
+
+    # ── Internal Helpers ─────────────────────────────────────────────────
+
+    def _reset(self):
+        self._ids = []
+        self._rows = {}
+        self._size = 0
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._lists = np.zeros(0, dtype=np.int32)
+        self._centroids = None
+
+    def _grow(self, needed):
+        """Ensure capacity for `needed` rows, doubling the buffers."""
+        capacity = len(self._vectors)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 64)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[:capacity] = self._vectors
+        lists = np.zeros(new_capacity, dtype=np.int32)
+        lists[:capacity] = self._lists
+        self._vectors, self._lists = vectors, lists
+
+    def _normalise(self, vector):
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else None
+
+    def _mark_dirty(self):
+        self._pending += 1
+        if self._pending >= self.SAVE_EVERY:
+            try:
+                self.save()
+            except OSError as e:
+                print(f"[Embedding Index] Could not save '{self.name}' index: {e}")
@@ -0,0 +1,237 @@
+"""
+ml/inference_backend.py - Pluggable Sentence-Embedding Inference Backends
+----------------------------------------------------------------------------
+AIEngine encodes text through one of these interchangeable backends, picked
+by Config.EMBEDDING_BACKEND:
+
+  - "torch"     : sentence-transformers on PyTorch (reference implementation).
+  - "onnx"      : the same model exported to ONNX, run with ONNX Runtime on CPU.
+  - "onnx-int8" : the ONNX export with dynamic int8 weight quantization
+                  (smallest and fastest, ~1e-2 cosine drift).
+
+Every backend exposes:
+    backend.model_id            -> str   (cache namespace, e.g. "all-MiniLM-L6-v2-int8")
+    backend.max_seq_length      -> int   (tokens per input, incl. special tokens)
+    backend.encode(texts)       -> numpy.ndarray (len(texts), dim), L2-normalised
+    backend.count_tokens(texts) -> list[int] word-pieces per text (no truncation)
+
+ONNX artifacts are exported once and cached under ONNX_MODEL_DIR:
+    <ONNX_MODEL_DIR>/<model>/model.onnx        : fp32 export
+    <ONNX_MODEL_DIR>/<model>/model.int8.onnx   : quantized export
+    <ONNX_MODEL_DIR>/<model>/tokenizer.json    : fast tokenizer
+Once they exist, loading needs only onnxruntime + tokenizers (no PyTorch).
+Build them ahead of time with `python export_onnx_model.py`, which also
+checks parity against the PyTorch embeddings.
+
+Libraries:
+  - sentence-transformers / torch : reference model and ONNX export
+  - onnxruntime                   : CPU inference and int8 quantization
+  - tokenizers                    : fast tokenizer for the ONNX path
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from config import Config
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class TorchBackend:
+    """sentence-transformers model on PyTorch."""
+
+    def __init__(self, model_name, max_seq_length=256):
+        from sentence_transformers import SentenceTransformer
+        self.model_id = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.model.max_seq_length = max_seq_length
+        self.max_seq_length = max_seq_length
+        # Separate untruncated copy for measuring texts against the token
+        # budget: the model's own tokenizer has truncation / padding turned
+        # on by encode(), which would cap the counts
+        from tokenizers import Tokenizer
+        self._counter = Tokenizer.from_str(self.model.tokenizer.backend_tokenizer.to_str())
+        self._counter.no_truncation()
+        self._counter.no_padding()
+
+    def encode(self, texts):
+        return np.asarray(self.model.encode(list(texts)), dtype=np.float32)
+
+    def count_tokens(self, texts):
+        encodings = self._counter.encode_batch(list(texts), add_special_tokens=False)
+        return [len(e.ids) for e in encodings]
+
+
+class OnnxBackend:
+    """
+    The sentence-transformer exported to ONNX and run with ONNX Runtime.
+
+    Reproduces the sentence-transformers pipeline of all-MiniLM-L6-v2:
+    tokenize (truncate to max_seq_length) → transformer → attention-masked
+    mean pooling → L2 normalisation.
+    """
+
+    def __init__(self, model_name, quantize=False, model_dir=None, max_seq_length=256):
+        """
+        Args:
+            model_name (str): sentence-transformers model name.
+            quantize (bool): Use the int8 dynamically-quantized export.
+            model_dir (str): Artifact cache root (default: Config.ONNX_MODEL_DIR).
+            max_seq_length (int): Token limit per text (the model's own limit).
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_id = f"{model_name}-int8" if quantize else model_name
+        self.max_seq_length = max_seq_length
+        paths = export_onnx(model_name, quantize=quantize, model_dir=model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if Config.ONNX_THREADS:
+            options.intra_op_num_threads = Config.ONNX_THREADS
+        self.session = ort.InferenceSession(
+            paths["model"], options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(paths["tokenizer"])
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+        # Untruncated copy, for measuring texts against the token budget
+        self._counter = Tokenizer.from_file(paths["tokenizer"])
+        self._counter.no_truncation()
+        self._counter.no_padding()
+
+    def encode(self, texts, batch_size=32):
+        texts = list(texts)
+        out = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array(
+                    [e.type_ids for e in encodings], dtype=np.int64
+                )
+            token_embeddings = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real (non-padding) tokens, then L2 normalise
+            mask = attention_mask[..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            out.append(pooled / np.clip(norms, 1e-12, None))
+        if not out:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(out).astype(np.float32)
+
+    def count_tokens(self, texts):
+        encodings = self._counter.encode_batch(list(texts), add_special_tokens=False)
+        return [len(e.ids) for e in encodings]
+
+
+# ── Export ───────────────────────────────────────────────────────────────
+
+def export_onnx(model_name, quantize=False, model_dir=None, force=False):
+    """
+    Export a sentence-transformer to ONNX (and optionally quantize it),
+    reusing cached artifacts when they already exist.
+
+    Args:
+        model_name (str): sentence-transformers model name.
+        quantize (bool): Also produce the int8 dynamically-quantized model.
+        model_dir (str): Artifact cache root (default: Config.ONNX_MODEL_DIR).
+        force (bool): Re-export even if the artifacts exist.
+
+    Returns:
+        dict: {"model": path of the model to load, "tokenizer": tokenizer.json path}.
+    """
+    out_dir = os.path.join(model_dir or Config.ONNX_MODEL_DIR, model_name.replace("/", "_"))
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    int8_path = os.path.join(out_dir, "model.int8.onnx")
+    tokenizer_path = os.path.join(out_dir, "tokenizer.json")
+    os.makedirs(out_dir, exist_ok=True)
+
+    if force or not (os.path.exists(fp32_path) and os.path.exists(tokenizer_path)):
+        _export_fp32(model_name, fp32_path, tokenizer_path)
+
+    if quantize and (force or not os.path.exists(int8_path)):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        print(f"[ONNX] Quantizing {model_name} to int8...")
+        tmp_path = _temp_path(out_dir)
+        quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+        os.replace(tmp_path, int8_path)
+
+    return {"model": int8_path if quantize else fp32_path, "tokenizer": tokenizer_path}
+
+
+def _export_fp32(model_name, model_path, tokenizer_path):
+    """Trace the transformer of a sentence-transformer into an ONNX graph."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    print(f"[ONNX] Exporting {model_name} to ONNX (one-off)...")
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [n for n in ("input_ids", "attention_mask", "token_type_ids") if n in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    out_dir = os.path.dirname(model_path)
+    tmp_model = _temp_path(out_dir)
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            tmp_model,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+        )
+    os.replace(tmp_model, model_path)
+
+    tmp_tokenizer = _temp_path(out_dir)
+    tokenizer.backend_tokenizer.save(tmp_tokenizer)
+    os.replace(tmp_tokenizer, tokenizer_path)
+
+
+def _temp_path(directory):
+    """Reserve a temp file next to the final artifact (for atomic renames)."""
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    return path
+
+
+# ── Factory ──────────────────────────────────────────────────────────────
+
+def load_backend(model_name, backend=None):
+    """
+    Create the configured inference backend.
+
+    Args:
+        model_name (str): sentence-transformers model name.
+        backend (str): One of BACKENDS (default: Config.EMBEDDING_BACKEND).
+
+    Returns:
+        TorchBackend | OnnxBackend
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    backend = (backend or Config.EMBEDDING_BACKEND).lower()
+    if backend == "torch":
+        return TorchBackend(model_name, max_seq_length=Config.EMBEDDING_MAX_SEQ_LENGTH)
+    if backend in ("onnx", "onnx-int8"):
+        return OnnxBackend(
+            model_name,
+            quantize=backend == "onnx-int8",
+            max_seq_length=Config.EMBEDDING_MAX_SEQ_LENGTH,
+        )
+    raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {BACKENDS})")
@@ -14,7 +14,22 @@ Uses:
 """
 
 import re
-from ml.nlp_utils import extract_skills_from_text, nlp
+
+from ml.nlp_utils import find_skill_mentions
+from ml.pattern_set import PatternSet
+from ml.skill_taxonomy import get_taxonomy
+
+
+def _lower_preserving_offsets(text):
+    """
+    Lower-case text without changing its length, so offsets into the
+    lower-cased view are offsets into the original text (the few characters
+    whose lower-case form is longer are left unchanged).
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
 
 
 class JDParser:
@@ -23,8 +38,68 @@ class JDParser:
 
     Splits JD text into logical sections and extracts:
     required skills, preferred skills, experience level, and education.
+
+    All context cues (preferred-section markers, experience and education
+    requirements) are found in one pass over a lower-cased view of the JD;
+    the extractors then only look up the first offset of each cue.
     """
 
+    # Bump whenever a change alters parse() output: documents stamped with an
+    # older version are re-parsed by the background migrator
+    # (services/migration_service.py).
+    PARSER_VERSION = 1
+
+    # Words signalling that the JD has "preferred" requirements at all
+    PREFERRED_CUES = ["preferred", "nice to have", "desirable", "bonus", "plus", "advantag", "optional"]
+    # Words that start the preferred section (the first one wins)
+    PREFERRED_SECTION_CUES = ["preferred", "nice to have", "desirable", "bonus", "additional"]
+
+    # Experience in years, in priority order: "X-Y years", "X+ years", "minimum X years"
+    YEAR_PATTERNS = [
+        ("years_range", r"(\d+)\s*-\s*(\d+)\s*years?\s*(?:of)?\s*(?:experience|exp)"),
+        ("years_plus", r"(\d+)\s*\+?\s*years?\s*(?:of)?\s*(?:experience|exp)"),
+        ("years_min", r"(?:minimum|at least|min)\s*(\d+)\s*years?"),
+    ]
+
+    # Level-based experience cues, in priority order
+    LEVEL_PATTERNS = {
+        "entry level": [r"entry.level", r"fresher", r"graduate", r"junior", r"0.1\s*year"],
+        "mid level": [r"mid.level", r"intermediate", r"2.5\s*years?"],
+        "senior level": [
+            r"senior", r"lead", r"principal", r"6\+?\s*years?", r"7\+?\s*years?", r"8\+?\s*years?",
+        ],
+    }
+
+    # Education requirement cues, highest level first
+    EDUCATION_LEVELS = [
+        ("PhD / Doctorate", [r"ph\.?\s*d", r"doctorate"]),
+        ("Master's Degree", [r"master", r"m\.?\s*s\.?", r"m\.?\s*tech", r"m\.?\s*e\.?", r"mba"]),
+        ("Bachelor's Degree", [
+            r"bachelor", r"b\.?\s*s\.?", r"b\.?\s*tech", r"b\.?\s*e\.?", r"b\.?\s*sc", r"undergraduate",
+        ]),
+        ("Diploma / Associate", [r"diploma", r"associate"]),
+        ("High School", [r"high school", r"secondary"]),
+    ]
+
+    def __init__(self):
+        self._year_regexes = {kind: re.compile(p) for kind, p in self.YEAR_PATTERNS}
+        entries = [(kind, pattern, False) for kind, pattern in self.YEAR_PATTERNS]
+        entries += [
+            (f"cue:{word}", word, False)
+            for word in dict.fromkeys(self.PREFERRED_CUES + self.PREFERRED_SECTION_CUES)
+        ]
+        entries += [
+            (f"level:{level}", pattern, False)
+            for level, patterns in self.LEVEL_PATTERNS.items()
+            for pattern in patterns
+        ]
+        entries += [
+            (f"education:{label}", pattern, False)
+            for label, patterns in self.EDUCATION_LEVELS
+            for pattern in patterns
+        ]
+        self._cues = PatternSet(entries)
+
     def parse(self, description_text):
         """
         Main parsing entry point.
@@ -40,19 +115,21 @@ class JDParser:
                 "education_level": str
             }
         """
-        # Extract all skills found in the JD
-        all_skills = extract_skills_from_text(description_text)
+        # One lower-cased view, scanned once for every context cue
+        text_lower = _lower_preserving_offsets(description_text)
+        cues = self._cues.first_hits(text_lower)
+
+        # Find every skill mention (with offsets) in one pass over the JD
+        skill_hits = find_skill_mentions(description_text)
 
         # Classify skills as required vs. preferred based on context
-        required_skills, preferred_skills = self._classify_skills(
-            description_text, all_skills
-        )
+        required_skills, preferred_skills = self._classify_skills(skill_hits, cues)
 
         # Extract experience level requirement
-        experience_level = self._extract_experience_level(description_text)
+        experience_level = self._extract_experience_level(text_lower, cues)
 
         # Extract education level requirement
-        education_level = self._extract_education_level(description_text)
+        education_level = self._extract_education_level(cues)
 
         return {
             "required_skills": required_skills,
@@ -61,60 +138,57 @@ class JDParser:
             "education_level": education_level,
         }
 
-    def _classify_skills(self, text, all_skills):
+    def version(self):
+        """
+        Version stamp stored next to parse() output. Skills come from the
+        live taxonomy, so its version is part of the stamp.
+
+        Returns:
+            dict: {"parser": int, "taxonomy": int}
+        """
+        return {"parser": self.PARSER_VERSION, "taxonomy": get_taxonomy().version}
+
+    def _classify_skills(self, skill_hits, cues):
         """
         Classify extracted skills as required or preferred.
 
         Strategy:
-        - If a skill appears near words like "required", "must have",
-          "mandatory" → required.
-        - If near "preferred", "nice to have", "bonus", "plus" → preferred.
+        - If the JD has preferred-requirement cues ("preferred", "nice to
+          have", "bonus", "plus", ...), everything after the first
+          preferred-section cue is the preferred section.
+        - A skill mentioned anywhere in that section is preferred.
         - Default to required if no context clues are found.
 
         Args:
-            text (str): Full JD text.
-            all_skills (list): Skills found in the text.
+            skill_hits (list[SkillHit]): Skill mentions found in the text.
+            cues (dict): {cue kind: first offset} from the cue scan.
 
         Returns:
             tuple: (required_skills, preferred_skills) as lists.
         """
-        text_lower = text.lower()
-        required = []
-        preferred = []
+        all_skills = list(dict.fromkeys(hit.skill for hit in skill_hits))
 
-        # Patterns indicating "preferred" context
-        preferred_patterns = [
-            r"(?i)(preferred|nice to have|desirable|bonus|plus|advantag|optional)"
-        ]
-
-        # Check if the text has a clear "preferred" section
-        has_preferred_section = any(
-            re.search(p, text_lower) for p in preferred_patterns
-        )
-
-        if has_preferred_section:
-            # Split text at "preferred" / "nice to have" boundary
-            split_pattern = r"(?i)(preferred|nice to have|desirable|bonus|additional)"
-            parts = re.split(split_pattern, text_lower, maxsplit=1)
-            required_section = parts[0] if parts else text_lower
-            preferred_section = parts[-1] if len(parts) > 1 else ""
-
-            for skill in all_skills:
-                if skill.lower() in preferred_section:
-                    preferred.append(skill)
-                else:
-                    required.append(skill)
-        else:
+        if not any(f"cue:{word}" in cues for word in self.PREFERRED_CUES):
             # No clear section — treat all as required
-            required = all_skills
-
-        # Ensure no duplicates
-        required = list(set(required))
-        preferred = list(set(preferred) - set(required))
+            return all_skills, []
 
+        # The preferred section starts right after the first section cue
+        section_cues = [
+            (cues[f"cue:{word}"], len(word))
+            for word in self.PREFERRED_SECTION_CUES
+            if f"cue:{word}" in cues
+        ]
+        if not section_cues:
+            return all_skills, []
+        start, length = min(section_cues)
+        preferred_start = start + length
+
+        in_preferred = {hit.skill for hit in skill_hits if hit.start >= preferred_start}
+        required = [skill for skill in all_skills if skill not in in_preferred]
+        preferred = [skill for skill in all_skills if skill in in_preferred]
         return required, preferred
 
-    def _extract_experience_level(self, text):
+    def _extract_experience_level(self, text_lower, cues):
         """
         Extract the experience level requirement from JD text.
 
@@ -123,58 +197,38 @@ class JDParser:
         - "5-7 years experience"
         - "entry level", "senior", "mid-level"
 
+        Args:
+            text_lower (str): Lower-cased JD text.
+            cues (dict): {cue kind: first offset} from the cue scan.
+
         Returns:
             str: Experience level description.
         """
-        text_lower = text.lower()
-
-        # Pattern: "X+ years" or "X-Y years"
-        year_patterns = [
-            r"(\d+)\s*\+?\s*years?\s*(?:of)?\s*(?:experience|exp)",
-            r"(\d+)\s*-\s*(\d+)\s*years?\s*(?:of)?\s*(?:experience|exp)",
-            r"(?:minimum|at least|min)\s*(\d+)\s*years?",
-        ]
-
-        for pattern in year_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                groups = match.groups()
-                if len(groups) == 2 and groups[1]:
+        for kind, _ in self.YEAR_PATTERNS:
+            if kind in cues:
+                groups = self._year_regexes[kind].match(text_lower, cues[kind]).groups()
+                if len(groups) == 2:
                     return f"{groups[0]}-{groups[1]} years"
                 return f"{groups[0]}+ years"
 
-        # Level-based patterns
-        level_patterns = {
-            "entry level": r"(?i)(entry.level|fresher|graduate|junior|0.1\s*year)",
-            "mid level": r"(?i)(mid.level|intermediate|2.5\s*years?)",
-            "senior level": r"(?i)(senior|lead|principal|6\+?\s*years?|7\+?\s*years?|8\+?\s*years?)",
-        }
-
-        for level, pattern in level_patterns.items():
-            if re.search(pattern, text_lower):
+        for level in self.LEVEL_PATTERNS:
+            if f"level:{level}" in cues:
                 return level
 
         return "Not specified"
 
-    def _extract_education_level(self, text):
+    def _extract_education_level(self, cues):
         """
         Extract education level requirements from JD text.
 
+        Args:
+            cues (dict): {cue kind: first offset} from the cue scan.
+
         Returns:
             str: Education requirement description.
         """
-        text_lower = text.lower()
-
-        education_levels = [
-            (r"(?i)(ph\.?\s*d|doctorate)", "PhD / Doctorate"),
-            (r"(?i)(master|m\.?\s*s\.?|m\.?\s*tech|m\.?\s*e\.?|mba)", "Master's Degree"),
-            (r"(?i)(bachelor|b\.?\s*s\.?|b\.?\s*tech|b\.?\s*e\.?|b\.?\s*sc|undergraduate)", "Bachelor's Degree"),
-            (r"(?i)(diploma|associate)", "Diploma / Associate"),
-            (r"(?i)(high school|secondary)", "High School"),
-        ]
-
-        for pattern, label in education_levels:
-            if re.search(pattern, text_lower):
+        for label, _ in self.EDUCATION_LEVELS:
+            if f"education:{label}" in cues:
                 return label
 
         return "Not specified"
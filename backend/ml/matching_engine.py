@@ -5,7 +5,8 @@ Core matching algorithm that computes how well a resume matches a job descriptio
 
 Approach:
   1. TF-IDF Vectorization: Convert resume and JD text into numerical vectors
-     using Term Frequency–Inverse Document Frequency.
+     using Term Frequency–Inverse Document Frequency, with IDF learned over
+     the whole stored corpus (see ml/corpus_vectorizer.py).
   2. Cosine Similarity: Measure the angle between the two TF-IDF vectors
      to determine overall textual similarity.
   3. Component Scoring: Independently score skills, experience, and education.
@@ -15,17 +16,18 @@ Approach:
      - Education:  20% weight
 
 Libraries:
-  - scikit-learn: TfidfVectorizer, cosine_similarity
+  - CorpusVectorizer: corpus-level TF-IDF + sparse cosine similarity
   - NLP utils: text preprocessing
 """
 
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+import numpy as np
 
 from ml.nlp_utils import get_preprocessed_string
-from ml.ai_engine import AIEngine
-from ml.ml_model import MatchPredictor
+from ml import model_registry
+from ml import document_features
+from ml.skill_bitset import get_interner, popcount, align
 
 
 class MatchingEngine:
@@ -48,10 +50,23 @@ class MatchingEngine:
     AI_WEIGHT = 0.20          # Transformer semantic scoring
     ML_WEIGHT = 0.20          # Trained ML model scoring
 
-    def __init__(self):
-        """Initialize AI and ML engines alongside NLP pipeline."""
-        self.ai_engine = AIEngine()
-        self.ml_predictor = MatchPredictor()
+    def __init__(self, ai_engine=None, ml_predictor=None, corpus_vectorizer=None):
+        """
+        Initialize AI and ML engines alongside NLP pipeline.
+
+        Args:
+            ai_engine (AIEngine): Transformer engine to use. Defaults to the
+                                  process-wide shared instance.
+            ml_predictor (MatchPredictor): Trained predictor to use. Defaults
+                                  to the process-wide shared instance.
+            corpus_vectorizer (CorpusVectorizer): Corpus TF-IDF to use.
+                                  Defaults to the process-wide shared instance.
+        """
+        self.ai_engine = ai_engine or model_registry.get_ai_engine()
+        self.ml_predictor = ml_predictor or model_registry.get_match_predictor()
+        self.corpus_vectorizer = (
+            corpus_vectorizer or model_registry.get_corpus_vectorizer()
+        )
 
     def compute_match(
         self,
@@ -64,6 +79,8 @@ class MatchingEngine:
         job_experience_level,
         resume_education,
         job_education_level,
+        resume_features=None,
+        job_features=None,
     ):
         """
         Full matching pipeline.
@@ -78,6 +95,9 @@ class MatchingEngine:
             job_experience_level (str):Required experience level.
             resume_education (list):   Education entries from resume.
             job_education_level (str): Required education level.
+            resume_features (dict):    Precomputed resume features (optional,
+                                       see ml/document_features.py).
+            job_features (dict):       Precomputed JD features (optional).
 
         Returns:
             dict: {
@@ -87,11 +107,13 @@ class MatchingEngine:
             }
         """
         # ── Step 1: TF-IDF Cosine Similarity (NLP) ────────────────────
-        tfidf_sim = self._compute_tfidf_similarity(resume_text, job_text)
+        tfidf_sim = self._compute_tfidf_similarity(
+            resume_text, job_text, resume_features, job_features
+        )
 
         # ── Step 2: AI Semantic Similarity (Deep Learning) ───────────
-        semantic_sim = self.ai_engine.compute_semantic_similarity(
-            resume_text, job_text
+        semantic_sim = self._compute_semantic_similarity(
+            resume_text, job_text, resume_features, job_features
         )
 
         # ── Step 3: Skill Score ──────────────────────────────────────────
@@ -125,6 +147,124 @@ class MatchingEngine:
         ml_quality = self.ml_predictor.predict_quality(ml_features)
 
         # ── Step 7: Blended Overall Score (NLP + AI + ML) ────────────
+        return self._blend_scores(
+            tfidf_sim, semantic_sim, skill_score, experience_score,
+            education_score, ml_predicted_score, ml_quality,
+            matched_skills, missing_skills,
+        )
+
+    def compute_matches_batch(self, job, resumes):
+        """
+        Score many resumes against one job description in a single pass.
+
+        Produces the same results as calling compute_match() per resume,
+        but batches every expensive step:
+          - the JD is preprocessed and embedded once;
+          - all resumes are embedded in one batched transformer call
+            (stored embeddings are reused when available);
+          - the TF-IDF matrix of JD + resumes is built in one transform;
+          - the 12-feature ML matrix is assembled as one ndarray and
+            scored with a single predict / predict_proba call.
+
+        Args:
+            job (dict): {"text": str, "parsed": dict, "features": dict|None}
+                        where "parsed" is JDParser output.
+            resumes (list[dict]): [{"text": str, "parsed": dict,
+                        "features": dict|None}, ...] with ResumeParser output.
+
+        Returns:
+            list[dict]: One compute_match()-style result per resume, in order.
+        """
+        if not resumes:
+            return []
+
+        job_text = job.get("text", "")
+        job_parsed = job.get("parsed") or {}
+        required_skills = job_parsed.get("required_skills", [])
+        preferred_skills = job_parsed.get("preferred_skills", [])
+        resume_texts = [r.get("text", "") for r in resumes]
+
+        # ── Steps 1 & 2: Batched TF-IDF and semantic similarity ───────
+        tfidf_sims = self._compute_tfidf_similarities(
+            job_text, job.get("features"),
+            resume_texts, [r.get("features") for r in resumes],
+        )
+        semantic_sims = self._compute_semantic_similarities(
+            job_text, job.get("features"),
+            resume_texts, [r.get("features") for r in resumes],
+            tfidf_sims,
+        )
+
+        # ── Step 3: Skill scores for all resumes as bitset operations ─
+        skill_results = self._compute_skill_scores(
+            [(r.get("parsed") or {}).get("skills", []) for r in resumes],
+            required_skills, preferred_skills,
+        )
+
+        # ── Steps 4–5: Rule-based component scores (cheap, per resume) ─
+        components = []
+        for resume, (skill_score, matched_skills, missing_skills) in zip(resumes, skill_results):
+            parsed = resume.get("parsed") or {}
+            experience_score = self._compute_experience_score(
+                parsed.get("experience", []), job_parsed.get("experience_level", "")
+            )
+            education_score = self._compute_education_score(
+                parsed.get("education", []), job_parsed.get("education_level", "")
+            )
+            components.append(
+                (skill_score, matched_skills, missing_skills,
+                 experience_score, education_score)
+            )
+
+        # ── Step 6: One feature matrix, one prediction call ───────────
+        ml_matrix = np.vstack([
+            self.ml_predictor.extract_features(
+                tfidf_sim=tfidf_sims[i],
+                semantic_sim=semantic_sims[i],
+                skill_score=skill_score,
+                experience_score=experience_score,
+                education_score=education_score,
+                matched_skills=matched_skills,
+                missing_skills=missing_skills,
+                required_skills=required_skills,
+                preferred_skills=preferred_skills,
+            )
+            for i, (skill_score, matched_skills, missing_skills,
+                    experience_score, education_score) in enumerate(components)
+        ])
+        ml_scores = self.ml_predictor.predict_scores(ml_matrix)
+        ml_qualities = self.ml_predictor.predict_qualities(ml_matrix)
+
+        # ── Step 7: Blend ─────────────────────────────────────────────
+        return [
+            self._blend_scores(
+                tfidf_sims[i], semantic_sims[i], skill_score,
+                experience_score, education_score, ml_scores[i],
+                ml_qualities[i], matched_skills, missing_skills,
+            )
+            for i, (skill_score, matched_skills, missing_skills,
+                    experience_score, education_score) in enumerate(components)
+        ]
+
+    # ── Score Blending ───────────────────────────────────────────────────
+    def _blend_scores(
+        self,
+        tfidf_sim,
+        semantic_sim,
+        skill_score,
+        experience_score,
+        education_score,
+        ml_predicted_score,
+        ml_quality,
+        matched_skills,
+        missing_skills,
+    ):
+        """
+        Combine NLP, AI and ML component scores into the final result dict.
+
+        Returns:
+            dict: Result in the compute_match() format.
+        """
         # Rule-based score from NLP heuristics
         blended_skill = (skill_score * 0.7) + (tfidf_sim * 100 * 0.3)
         rule_based_score = (
@@ -174,14 +314,18 @@ class MatchingEngine:
         }
 
     # ── TF-IDF + Cosine Similarity ───────────────────────────────────────
-    def _compute_tfidf_similarity(self, text_a, text_b):
+    def _compute_tfidf_similarity(self, text_a, text_b, features_a=None, features_b=None):
         """
         Compute cosine similarity between two documents using TF-IDF vectors.
 
         How it works:
         1. Preprocess both texts (clean, tokenize, lemmatize).
-        2. Fit a TF-IDF vectorizer on both documents.
-        3. Compute cosine similarity between the resulting vectors.
+        2. Transform both with the corpus-level TF-IDF vectorizer
+           (no per-match fitting; IDF comes from the stored corpus).
+        3. Compute cosine similarity as a sparse dot product.
+
+        When precomputed features are given, their stored tokens / TF-IDF
+        vectors are used instead of re-running the NLP pipeline.
 
         Cosine similarity measures the cosine of the angle between two vectors:
         - 1.0 = identical direction (perfect match)
@@ -190,6 +334,15 @@ class MatchingEngine:
         Returns:
             float: Cosine similarity score between 0 and 1.
         """
+        if features_a or features_b:
+            weights_a = document_features.get_tfidf_weights(
+                features_a, text_a, self.corpus_vectorizer
+            )
+            weights_b = document_features.get_tfidf_weights(
+                features_b, text_b, self.corpus_vectorizer
+            )
+            return self.corpus_vectorizer.weights_similarity(weights_a, weights_b)
+
         # Preprocess both texts
         processed_a = get_preprocessed_string(text_a)
         processed_b = get_preprocessed_string(text_b)
@@ -197,15 +350,103 @@ class MatchingEngine:
         if not processed_a.strip() or not processed_b.strip():
             return 0.0
 
-        # Create TF-IDF vectors
-        # TfidfVectorizer converts text into a matrix of TF-IDF features
-        vectorizer = TfidfVectorizer()
-        tfidf_matrix = vectorizer.fit_transform([processed_a, processed_b])
+        # Transform with the corpus vectorizer and take the sparse dot product
+        return self.corpus_vectorizer.similarity(processed_a, processed_b)
+
+    def _compute_tfidf_similarities(self, job_text, job_features, resume_texts, resume_features):
+        """
+        Batched TF-IDF similarity of one JD against many resumes.
+
+        Builds a single sparse matrix (JD row + one row per resume) with the
+        corpus vectorizer and takes all dot products in one multiplication.
+
+        Returns:
+            numpy.ndarray: Similarity per resume (0 to 1).
+        """
+        # JD + resumes without stored tokens share one batched spaCy pass
+        job_tokens, *resume_tokens = document_features.get_tokens_many(
+            [job_features] + list(resume_features), [job_text] + list(resume_texts)
+        )
+        if not job_tokens.strip():
+            return np.zeros(len(resume_texts))
+
+        matrix = self.corpus_vectorizer.transform([job_tokens] + resume_tokens)
+        sims = matrix[1:].dot(matrix[0].T).toarray().ravel()
+        return np.clip(sims, 0.0, 1.0)
+
+    # ── Semantic Similarity ──────────────────────────────────────────────
+    def _compute_semantic_similarity(self, text_a, text_b, features_a=None, features_b=None):
+        """
+        Transformer semantic similarity, reusing stored embeddings when the
+        precomputed features were produced by the currently loaded model.
+
+        Returns:
+            float: Semantic similarity score between 0 and 1.
+        """
+        if self.ai_engine.ai_available and (features_a or features_b):
+            model_id = self.ai_engine.EMBEDDING_ID
+            embedding_a = document_features.get_embedding(features_a, model_id)
+            embedding_b = document_features.get_embedding(features_b, model_id)
+            if embedding_a is not None or embedding_b is not None:
+                if embedding_a is None:
+                    embedding_a = self.ai_engine.get_embedding(text_a)
+                if embedding_b is None:
+                    embedding_b = self.ai_engine.get_embedding(text_b)
+                if embedding_a is not None and embedding_b is not None:
+                    return self.ai_engine.compute_embedding_similarity(
+                        embedding_a, embedding_b
+                    )
+
+        return self.ai_engine.compute_semantic_similarity(text_a, text_b)
+
+    def _compute_semantic_similarities(
+        self, job_text, job_features, resume_texts, resume_features, tfidf_sims
+    ):
+        """
+        Batched semantic similarity of one JD against many resumes.
+
+        The JD is embedded once and every resume without a valid stored
+        embedding is encoded in a single batched transformer call. Falls
+        back to the TF-IDF similarities (the AIEngine fallback metric)
+        when the transformer is unavailable.
 
-        # Compute cosine similarity between the two document vectors
-        similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
+        Returns:
+            numpy.ndarray: Similarity per resume (0 to 1).
+        """
+        if not self.ai_engine.ai_available or not job_text.strip():
+            return np.asarray(tfidf_sims, dtype=np.float64)
 
-        return float(similarity[0][0])
+        model_id = self.ai_engine.EMBEDDING_ID
+        job_embedding = document_features.get_embedding(job_features, model_id)
+
+        embeddings = [
+            document_features.get_embedding(features, model_id)
+            for features in resume_features
+        ]
+        to_encode = [
+            i for i, emb in enumerate(embeddings)
+            if emb is None and resume_texts[i].strip()
+        ]
+        texts = [resume_texts[i] for i in to_encode]
+        if job_embedding is None:
+            texts.append(job_text)
+
+        encoded = self.ai_engine.get_embeddings(texts) if texts else None
+        if texts and encoded is None:
+            return np.asarray(tfidf_sims, dtype=np.float64)
+        if job_embedding is None:
+            job_embedding = encoded[-1]
+        for row, i in enumerate(to_encode):
+            embeddings[i] = encoded[row]
+
+        sims = np.zeros(len(resume_texts))
+        job_norm = np.linalg.norm(job_embedding)
+        for i, emb in enumerate(embeddings):
+            if emb is not None and job_norm > 0:
+                norm = np.linalg.norm(emb)
+                if norm > 0:
+                    sims[i] = float(np.dot(emb, job_embedding) / (norm * job_norm))
+        return sims
 
     # ── Skill Scoring ────────────────────────────────────────────────────
     def _compute_skill_score(
@@ -221,36 +462,57 @@ class MatchingEngine:
         Returns:
             tuple: (score, matched_skills, missing_skills)
         """
-        # Normalize all skills to lowercase for comparison
-        resume_set = {s.lower() for s in resume_skills}
-        required_set = {s.lower() for s in required_skills}
-        preferred_set = {s.lower() for s in preferred_skills}
-
-        # Find overlaps
-        matched_required = resume_set & required_set
-        matched_preferred = resume_set & preferred_set
-        missing_required = required_set - resume_set
-        missing_preferred = preferred_set - resume_set
-
-        # Calculate required skill match percentage
-        if required_set:
-            required_pct = len(matched_required) / len(required_set) * 100
-        else:
-            required_pct = 100  # No requirements means full match
+        return self._compute_skill_scores(
+            [resume_skills], required_skills, preferred_skills
+        )[0]
 
-        # Calculate preferred skill match percentage
-        if preferred_set:
-            preferred_pct = len(matched_preferred) / len(preferred_set) * 100
-        else:
-            preferred_pct = 100
+    def _compute_skill_scores(
+        self, resume_skill_lists, required_skills, preferred_skills
+    ):
+        """
+        Vectorized _compute_skill_score() for many resumes against one job.
+
+        Skills are interned to bitsets (see ml/skill_bitset.py): overlaps
+        and coverage for all resumes are computed with bitwise AND and
+        popcount over one (n_resumes, n_words) matrix.
+
+        Returns:
+            list[tuple]: (score, matched_skills, missing_skills) per resume.
+        """
+        interner = get_interner().scope()
+        required = interner.encode(required_skills)
+        preferred = interner.encode(preferred_skills)
+        resumes = interner.encode_many(resume_skill_lists)
+        required, preferred, resumes = align(required, preferred, resumes)
+
+        # Calculate required / preferred skill match percentages
+        # (no requirements means full match)
+        n_required = popcount(required)
+        n_preferred = popcount(preferred)
+        required_pct = (
+            popcount(resumes & required) / n_required * 100
+            if n_required else np.full(len(resumes), 100.0)
+        )
+        preferred_pct = (
+            popcount(resumes & preferred) / n_preferred * 100
+            if n_preferred else np.full(len(resumes), 100.0)
+        )
 
         # Weighted skill score (required = 80%, preferred = 20%)
-        skill_score = (required_pct * 0.8) + (preferred_pct * 0.2)
+        skill_scores = (required_pct * 0.8) + (preferred_pct * 0.2)
 
-        matched_skills = sorted(list(matched_required | matched_preferred))
-        missing_skills = sorted(list(missing_required | missing_preferred))
+        job_skills = required | preferred
+        matched = resumes & job_skills
+        missing = job_skills & ~resumes
 
-        return skill_score, matched_skills, missing_skills
+        return [
+            (
+                float(skill_scores[i]),
+                interner.decode(matched[i]),
+                interner.decode(missing[i]),
+            )
+            for i in range(len(resumes))
+        ]
 
     # ── Experience Scoring ───────────────────────────────────────────────
     def _compute_experience_score(self, resume_experience, job_experience_level):
@@ -260,11 +260,24 @@ class MatchPredictor:
         Returns:
             float: Predicted score (0–100), or None if no model trained.
         """
+        return self.predict_scores(features)[0]
+
+    def predict_scores(self, features):
+        """
+        Predict match scores for a whole feature matrix in one call.
+
+        Args:
+            features (ndarray): Stacked feature rows, shape (n, 12).
+
+        Returns:
+            list: Predicted scores (0–100), or [None] * n if no model trained.
+        """
+        n_rows = len(features)
         if not self.is_trained:
-            return None
+            return [None] * n_rows
         features_scaled = self.scaler.transform(features)
-        score = float(self.predictor.predict(features_scaled)[0])
-        return round(min(max(score, 0), 100), 2)
+        scores = np.clip(self.predictor.predict(features_scaled), 0, 100)
+        return [round(float(score), 2) for score in scores]
 
     def predict_quality(self, features):
         """
@@ -276,20 +289,37 @@ class MatchPredictor:
         Returns:
             dict: {label, confidence, probabilities} or None if untrained.
         """
+        return self.predict_qualities(features)[0]
+
+    def predict_qualities(self, features):
+        """
+        Classify match quality for a whole feature matrix in one call.
+
+        Args:
+            features (ndarray): Stacked feature rows, shape (n, 12).
+
+        Returns:
+            list: {label, confidence, probabilities} dicts, or [None] * n
+                  if no classifier is trained.
+        """
+        n_rows = len(features)
         if not self.is_trained or self.classifier is None:
-            return None
+            return [None] * n_rows
         features_scaled = self.scaler.transform(features)
-        label_idx = int(self.classifier.predict(features_scaled)[0])
-        probabilities = self.classifier.predict_proba(features_scaled)[0]
-
-        return {
-            "label": self.QUALITY_LABELS[label_idx],
-            "confidence": round(float(max(probabilities)) * 100, 1),
-            "probabilities": {
-                self.QUALITY_LABELS[i]: round(float(p) * 100, 1)
-                for i, p in enumerate(probabilities)
-            },
-        }
+        label_indices = self.classifier.predict(features_scaled)
+        probability_rows = self.classifier.predict_proba(features_scaled)
+
+        return [
+            {
+                "label": self.QUALITY_LABELS[int(label_idx)],
+                "confidence": round(float(max(probabilities)) * 100, 1),
+                "probabilities": {
+                    self.QUALITY_LABELS[i]: round(float(p) * 100, 1)
+                    for i, p in enumerate(probabilities)
+                },
+            }
+            for label_idx, probabilities in zip(label_indices, probability_rows)
+        ]
 
     # ── Inspection ───────────────────────────────────────────────────────
 
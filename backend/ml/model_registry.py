@@ -0,0 +1,374 @@
+"""
+ml/model_registry.py - Process-wide Shared Model Registry
+-----------------------------------------------------------
+Loads the heavy AI/ML artifacts exactly once per process and hands out
+shared, read-only handles to every consumer (routes, services, engines):
+
+  - AIEngine         : all-MiniLM-L6-v2 sentence-transformer
+  - MatchPredictor   : score regressor, quality classifier and feature scaler
+  - CorpusVectorizer : corpus-level TF-IDF vocabulary / IDF
+  - MatchingEngine   : built on top of the shared components above
+  - EmbeddingIndex   : nearest-neighbour indexes over resume / job embeddings
+
+Usage:
+    from ml import model_registry
+    engine = model_registry.get_matching_engine()
+
+Lifecycle hooks:
+  - warm_up()       : load everything eagerly so the first request never
+                      pays the model load cost.
+  - start_warm_up() : the same in a background thread (used by
+                      app.create_app), so startup is not blocked.
+  - readiness()     : per-component load state and latency, for the
+                      /api/health/ready endpoint.
+  - reload()  : rebuild the components (e.g. after `train_model.py --retrain`)
+                and swap them in atomically. Requests already in flight keep
+                the handles they fetched; new requests see the fresh ones.
+
+The handles are shared between threads, so callers must treat them as
+read-only and never mutate their attributes.
+"""
+
+import threading
+import time
+
+# Component modules are imported inside the getters: several of them
+# depend on this registry themselves.
+
+_lock = threading.RLock()
+
+_ai_engine = None
+_ml_predictor = None
+_corpus_vectorizer = None
+_matching_engine = None
+_embedding_indexes = {}
+_warm_up_thread = None
+
+
+# ── Shared Handles ───────────────────────────────────────────────────────
+
+def get_ai_engine():
+    """Return the shared AIEngine, loading the transformer on first use."""
+    global _ai_engine
+    if _ai_engine is None:
+        with _lock:
+            if _ai_engine is None:
+                from ml.ai_engine import AIEngine
+                _ai_engine = _timed_load("transformer", AIEngine, _assess_ai_engine)
+    return _ai_engine
+
+
+def get_match_predictor():
+    """Return the shared MatchPredictor, loading the joblib artifacts on first use."""
+    global _ml_predictor
+    if _ml_predictor is None:
+        with _lock:
+            if _ml_predictor is None:
+                from ml.ml_model import MatchPredictor
+                _ml_predictor = _timed_load("predictor", MatchPredictor, _assess_predictor)
+    return _ml_predictor
+
+
+def get_corpus_vectorizer():
+    """Return the shared CorpusVectorizer, loading the persisted IDF on first use."""
+    global _corpus_vectorizer
+    if _corpus_vectorizer is None:
+        with _lock:
+            if _corpus_vectorizer is None:
+                from ml.corpus_vectorizer import CorpusVectorizer
+                _corpus_vectorizer = _timed_load(
+                    "corpus_tfidf", CorpusVectorizer, _assess_corpus
+                )
+    return _corpus_vectorizer
+
+
+def get_matching_engine():
+    """Return the shared MatchingEngine wired to the shared AI/ML components."""
+    global _matching_engine
+    if _matching_engine is None:
+        with _lock:
+            if _matching_engine is None:
+                from ml.matching_engine import MatchingEngine
+                _matching_engine = MatchingEngine(
+                    ai_engine=get_ai_engine(),
+                    ml_predictor=get_match_predictor(),
+                    corpus_vectorizer=get_corpus_vectorizer(),
+                )
+    return _matching_engine
+
+
+def get_embedding_index(name):
+    """
+    Return the shared EmbeddingIndex for a collection, loading it on first use.
+
+    Args:
+        name (str): "resumes" or "jobs".
+    """
+    index = _embedding_indexes.get(name)
+    if index is None:
+        # The index is tied to the loaded backend's embedding id
+        ai_engine = get_ai_engine()
+        with _lock:
+            index = _embedding_indexes.get(name)
+            if index is None:
+                from config import Config
+                from ml.embedding_index import EmbeddingIndex
+                index = EmbeddingIndex(
+                    name,
+                    model_id=ai_engine.EMBEDDING_ID,
+                    dim=ai_engine.EMBEDDING_DIM,
+                    mode=Config.EMBEDDING_INDEX_MODE,
+                    n_lists=Config.EMBEDDING_INDEX_LISTS,
+                    nprobe=Config.EMBEDDING_INDEX_NPROBE,
+                )
+                _embedding_indexes[name] = index
+    return index
+
+
+def get_resume_index():
+    """Return the shared nearest-neighbour index over resume embeddings."""
+    return get_embedding_index("resumes")
+
+
+def get_job_index():
+    """Return the shared nearest-neighbour index over job embeddings."""
+    return get_embedding_index("jobs")
+
+
+# ── Load State ───────────────────────────────────────────────────────────
+
+# Heavy components reported by readiness(), plus the warm-up match
+COMPONENTS = ("spacy", "transformer", "predictor", "classifier", "corpus_tfidf")
+
+_status = {
+    name: {"state": "pending", "load_seconds": None, "detail": None}
+    for name in COMPONENTS + ("warm_up_match",)
+}
+_warm_up_done = False
+
+
+def readiness():
+    """
+    Report whether the process is ready to serve matching traffic.
+
+    Component states: "pending", "loading", "ready", "degraded" (loaded,
+    but running a fallback, e.g. TF-IDF instead of the transformer) or
+    "failed". The process is ready once warm-up has completed and no
+    component failed; degraded components do not block readiness.
+
+    Returns:
+        dict: {"ready": bool, "status": str, "components": {name: {...}}}
+    """
+    components = {name: dict(info) for name, info in _status.items()}
+    states = {info["state"] for info in components.values()}
+    if "failed" in states:
+        status = "failed"
+    elif not _warm_up_done:
+        status = "loading"
+    elif "degraded" in states:
+        status = "degraded"
+    else:
+        status = "ready"
+    return {
+        "ready": status in ("ready", "degraded"),
+        "status": status,
+        "components": components,
+    }
+
+
+def _set_status(name, state, load_seconds=None, detail=None):
+    _status[name] = {
+        "state": state,
+        "load_seconds": round(load_seconds, 3) if load_seconds is not None else None,
+        "detail": detail,
+    }
+
+
+def _timed_load(name, load, assess=None):
+    """
+    Run a loader, recording its state and latency under `name`.
+
+    Args:
+        name (str): Component name.
+        load (callable): Zero-argument loader.
+        assess (callable): Optional (value, seconds) hook that records the
+                           final state (e.g. "degraded" for a fallback).
+    """
+    _set_status(name, "loading")
+    start = time.perf_counter()
+    try:
+        value = load()
+    except Exception as e:
+        _set_status(name, "failed", time.perf_counter() - start, str(e))
+        raise
+    elapsed = time.perf_counter() - start
+    if assess:
+        assess(value, elapsed)
+    else:
+        _set_status(name, "ready", elapsed)
+    return value
+
+
+def _assess_ai_engine(ai_engine, elapsed):
+    if ai_engine.ai_available:
+        _set_status(
+            "transformer", "ready", elapsed, f"{ai_engine.MODEL_NAME} ({ai_engine.backend})"
+        )
+    else:
+        _set_status(
+            "transformer", "degraded", elapsed,
+            "Transformer unavailable; using TF-IDF fallback for semantic similarity.",
+        )
+
+
+def _assess_predictor(predictor, elapsed):
+    if predictor.is_trained:
+        _set_status("predictor", "ready", elapsed)
+    else:
+        _set_status(
+            "predictor", "degraded", elapsed,
+            "No trained model found; using rule-based scores (run train_model.py).",
+        )
+    if predictor.classifier is not None:
+        _set_status("classifier", "ready", elapsed)
+    else:
+        _set_status("classifier", "degraded", elapsed, "No trained quality classifier found.")
+
+
+def _assess_corpus(vectorizer, elapsed):
+    _set_status(
+        "corpus_tfidf", "ready", elapsed,
+        f"{vectorizer.vocabulary_size} terms over {vectorizer.n_docs} documents",
+    )
+
+
+def _run_synthetic_match(engine):
+    """
+    Score one small synthetic resume/JD pair through the full pipeline, and
+    precompute the taxonomy skill-phrase embeddings.
+    """
+    if engine.ai_engine.ai_available:
+        engine.ai_engine.compute_skill_relevance_matrix(["python"], ["Backend developer"])
+    return engine.compute_match(
+        resume_text=(
+            "Software engineer with 4 years of experience building REST APIs "
+            "in Python and Flask, deploying with Docker on AWS. "
+            "Bachelor of Science in Computer Science."
+        ),
+        job_text=(
+            "We are hiring a backend developer. Required: Python, Flask, REST, "
+            "Docker. Preferred: AWS, Kubernetes. 3+ years of experience. "
+            "Bachelor's degree in Computer Science."
+        ),
+        resume_skills=["python", "flask", "rest", "docker", "aws"],
+        job_required_skills=["python", "flask", "rest", "docker"],
+        job_preferred_skills=["aws", "kubernetes"],
+        resume_experience=["Software engineer, 4 years"],
+        job_experience_level="3+ years",
+        resume_education=["Bachelor of Science in Computer Science"],
+        job_education_level="Bachelor's degree",
+    )
+
+
+# ── Lifecycle Hooks ──────────────────────────────────────────────────────
+
+def warm_up():
+    """
+    Eagerly load every shared component, including the spaCy pipeline,
+    then run one synthetic match end-to-end so lazy initialisation inside
+    the libraries (tokenizers, first inference) happens before real traffic.
+
+    Returns:
+        float: Seconds spent warming up.
+    """
+    global _warm_up_done
+    from ml import nlp_utils
+
+    start = time.perf_counter()
+    _timed_load(
+        "spacy",
+        lambda: (nlp_utils.get_nlp(), nlp_utils.get_stop_words()),
+    )
+    engine = get_matching_engine()
+    # IVF indexes train their clusters in the background, off the request path
+    get_resume_index().ensure_trained()
+    get_job_index().ensure_trained()
+    _timed_load("warm_up_match", lambda: _run_synthetic_match(engine))
+    _warm_up_done = True
+
+    elapsed = time.perf_counter() - start
+    print(f"[Model Registry] Models ready in {elapsed:.2f}s")
+    return elapsed
+
+
+def start_warm_up():
+    """
+    Run warm_up() in a background daemon thread so the process can serve
+    requests (health checks, auth) while the heavy models load. Requests
+    that need a model before it is ready simply load it on demand.
+
+    Returns:
+        threading.Thread: The warm-up thread (the existing one if already started).
+    """
+    global _warm_up_thread
+    with _lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_warm_up_safely, name="model-warm-up", daemon=True
+            )
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+def _warm_up_safely():
+    try:
+        warm_up()
+    except Exception as e:
+        print(f"[Model Registry] Warm-up failed: {e}")
+
+
+def reload(ai=True, ml=True, corpus=True):
+    """
+    Rebuild shared components from disk and swap them in atomically.
+
+    The new instances are constructed outside the lock so that requests
+    keep being served by the old handles while the reload is in progress.
+
+    Args:
+        ai (bool): Reload the transformer model.
+        ml (bool): Reload the predictor, classifier and scaler.
+        corpus (bool): Reload the corpus TF-IDF vocabulary / IDF.
+    """
+    global _ai_engine, _ml_predictor, _corpus_vectorizer, _matching_engine
+    from ml.ai_engine import AIEngine
+    from ml.ml_model import MatchPredictor
+    from ml.corpus_vectorizer import CorpusVectorizer
+    from ml.matching_engine import MatchingEngine
+
+    new_ai = (
+        _timed_load("transformer", AIEngine, _assess_ai_engine) if ai
+        else get_ai_engine()
+    )
+    new_ml = (
+        _timed_load("predictor", MatchPredictor, _assess_predictor) if ml
+        else get_match_predictor()
+    )
+    new_corpus = (
+        _timed_load("corpus_tfidf", CorpusVectorizer, _assess_corpus) if corpus
+        else get_corpus_vectorizer()
+    )
+    new_engine = MatchingEngine(
+        ai_engine=new_ai,
+        ml_predictor=new_ml,
+        corpus_vectorizer=new_corpus,
+    )
+
+    with _lock:
+        if _ai_engine is not None and new_ai.EMBEDDING_ID != _ai_engine.EMBEDDING_ID:
+            # Indexes hold vectors of one embedding id: reopen them for the new one
+            _embedding_indexes.clear()
+        _ai_engine = new_ai
+        _ml_predictor = new_ml
+        _corpus_vectorizer = new_corpus
+        _matching_engine = new_engine
+    print("[Model Registry] Models reloaded.")
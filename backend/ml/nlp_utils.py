@@ -6,35 +6,122 @@ Provides common NLP operations used across the ML pipeline:
   - Tokenization
   - Stop-word removal
   - Lemmatization
+  - Skill extraction (compiled, word-boundary-aware dictionary matcher)
 
 Uses:
   - spaCy (en_core_web_sm model) for tokenization and lemmatization
   - NLTK for stop-word lists
 
-All functions are stateless and reusable.
+All functions are stateless and reusable. Preprocessed strings are cached
+by content hash (in-memory LRU + optional disk tier, see ml/cache.py), so
+a given document costs a single spaCy pass per process.
 """
 
 import re
-import spacy
-import nltk
-from nltk.corpus import stopwords
+import threading
 
-# ── One-time downloads & model loads ─────────────────────────────────────
-# Download NLTK stop-words if not already present
-nltk.download("stopwords", quiet=True)
-nltk.download("punkt", quiet=True)
+from config import Config
+from ml.cache import ContentCache, content_hash
+from ml.skill_taxonomy import get_taxonomy
 
-# Load spaCy English model (small, fast, good for tokenization + lemma)
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    # If model not installed, download it programmatically
-    from spacy.cli import download
-    download("en_core_web_sm")
-    nlp = spacy.load("en_core_web_sm")
+# ── Lazy model loads ─────────────────────────────────────────────────────
+# spaCy and the NLTK stop-word list are loaded on first use (or by the
+# background warm-up), never at import time, and never downloaded at
+# runtime: both must be installed beforehand (see README / check below).
 
-# NLTK English stop-words set
-STOP_WORDS = set(stopwords.words("english"))
+_nlp = None
+_stop_words = None
+_load_lock = threading.Lock()
+
+
+def check_nlp_resources():
+    """
+    Check that the offline NLP resources are installed, without loading them.
+
+    Returns:
+        list[str]: Human-readable problems (empty when everything is present).
+    """
+    problems = []
+    try:
+        import spacy.util
+        if not spacy.util.is_package(Config.SPACY_MODEL):
+            problems.append(
+                f"spaCy model '{Config.SPACY_MODEL}' is not installed "
+                f"(run: python -m spacy download {Config.SPACY_MODEL})"
+            )
+    except ImportError:
+        problems.append("spaCy is not installed (run: pip install -r requirements.txt)")
+    try:
+        import nltk
+        nltk.data.find("corpora/stopwords")
+    except ImportError:
+        problems.append("NLTK is not installed (run: pip install -r requirements.txt)")
+    except LookupError:
+        problems.append(
+            "NLTK stop-words are not installed (run: python -m nltk.downloader stopwords)"
+        )
+    return problems
+
+
+def get_nlp():
+    """
+    Return the shared spaCy pipeline, loading it on first use.
+
+    Only tokens and lemmas are needed, so the dependency parser and NER are
+    excluded (configurable via SPACY_EXCLUDE); the lemmatizer still gets
+    the POS tags it relies on from the tagger / attribute ruler.
+
+    Raises:
+        RuntimeError: If the spaCy model is not installed.
+    """
+    global _nlp
+    if _nlp is None:
+        with _load_lock:
+            if _nlp is None:
+                import spacy
+                try:
+                    _nlp = spacy.load(Config.SPACY_MODEL, exclude=Config.SPACY_EXCLUDE)
+                except OSError as e:
+                    raise RuntimeError(
+                        f"spaCy model '{Config.SPACY_MODEL}' is not installed. "
+                        f"Run: python -m spacy download {Config.SPACY_MODEL}"
+                    ) from e
+                print(f"[NLP] Loaded spaCy model: {Config.SPACY_MODEL}")
+    return _nlp
+
+
+def get_stop_words():
+    """
+    Return the NLTK English stop-word set, loading it on first use.
+
+    Raises:
+        RuntimeError: If the NLTK stop-word corpus is not installed.
+    """
+    global _stop_words
+    if _stop_words is None:
+        with _load_lock:
+            if _stop_words is None:
+                from nltk.corpus import stopwords
+                try:
+                    _stop_words = frozenset(stopwords.words("english"))
+                except LookupError as e:
+                    raise RuntimeError(
+                        "NLTK stop-words are not installed. "
+                        "Run: python -m nltk.downloader stopwords"
+                    ) from e
+    return _stop_words
+
+
+# Version of the preprocessing pipeline. Bump whenever clean_text() or
+# preprocess_text() change: it invalidates cached and stored token strings.
+PREPROCESS_VERSION = 1
+
+# Cache of get_preprocessed_string() output, keyed by SHA-256 of the raw text.
+_preprocess_cache = ContentCache(
+    f"preprocess-v{PREPROCESS_VERSION}",
+    max_entries=Config.PREPROCESS_CACHE_SIZE,
+    disk_dir=Config.NLP_CACHE_DIR or None,
+)
 
 
 # ── Text Cleaning ────────────────────────────────────────────────────────
@@ -82,14 +169,38 @@ def preprocess_text(text):
     Returns:
         list[str]: List of lemmatized, meaningful tokens.
     """
-    cleaned = clean_text(text)
-    doc = nlp(cleaned)
+    return _doc_tokens(get_nlp()(clean_text(text)))
+
+
+def preprocess_texts(texts, batch_size=None, n_process=None):
+    """
+    Batched preprocess_text() built on nlp.pipe.
 
+    Args:
+        texts (iterable[str]): Raw texts.
+        batch_size (int): Texts per spaCy batch (default: Config.NLP_BATCH_SIZE).
+        n_process (int): spaCy worker processes (default: Config.NLP_N_PROCESS).
+
+    Yields:
+        list[str]: Lemmatized tokens of each text, in input order.
+    """
+    docs = get_nlp().pipe(
+        (clean_text(t) for t in texts),
+        batch_size=batch_size or Config.NLP_BATCH_SIZE,
+        n_process=n_process or Config.NLP_N_PROCESS,
+    )
+    for doc in docs:
+        yield _doc_tokens(doc)
+
+
+def _doc_tokens(doc):
+    """Lemmas of a spaCy Doc, without stop-words, punctuation or short tokens."""
+    stop_words = get_stop_words()
     tokens = []
     for token in doc:
         # Skip stop-words, punctuation, and very short tokens
         if (
-            token.text not in STOP_WORDS
+            token.text not in stop_words
             and not token.is_punct
             and not token.is_space
             and len(token.text) > 1
@@ -104,74 +215,96 @@ def get_preprocessed_string(text):
     Return preprocessed text as a single space-joined string.
     Useful for TF-IDF vectorization which expects string input.
 
+    Results are cached by content hash, so repeated calls for the same
+    text (e.g. one JD against hundreds of resumes) skip the spaCy pass.
+
     Args:
         text (str): Raw text.
 
     Returns:
         str: Preprocessed string.
     """
-    tokens = preprocess_text(text)
-    return " ".join(tokens)
+    if not text:
+        return ""
+    return _preprocess_cache.get_or_compute(
+        text, lambda: " ".join(preprocess_text(text))
+    )
+
+
+def get_preprocessed_strings(texts):
+    """
+    Batched get_preprocessed_string().
+
+    Cache hits are served directly; all misses go through spaCy together
+    in one nlp.pipe() stream and are then cached.
+
+    Args:
+        texts (iterable[str]): Raw texts.
+
+    Returns:
+        list[str]: Preprocessed string per text, in input order.
+    """
+    texts = list(texts)
+    results = [""] * len(texts)
+    misses = []   # (index, cache key)
+    for i, text in enumerate(texts):
+        if not text:
+            continue
+        key = content_hash(text)
+        cached = _preprocess_cache.get(key)
+        if cached is None:
+            misses.append((i, key))
+        else:
+            results[i] = cached
+
+    tokens_iter = preprocess_texts(texts[i] for i, _ in misses)
+    for (i, key), tokens in zip(misses, tokens_iter):
+        results[i] = " ".join(tokens)
+        _preprocess_cache.set(key, results[i])
+    return results
+
+
+# ── Lazy Module Attributes ───────────────────────────────────────────────
+def __getattr__(name):
+    """
+    Lazily resolved module attributes: the spaCy pipeline (nlp), the
+    stop-word set, and the skill sets derived from the live taxonomy.
+    """
+    if name == "nlp":
+        return get_nlp()
+    if name == "STOP_WORDS":
+        return get_stop_words()
+    if name == "TECHNICAL_SKILLS":
+        return get_taxonomy().technical_skills
+    if name == "SOFT_SKILLS":
+        return get_taxonomy().soft_skills
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # ── Skill Extraction Helpers ─────────────────────────────────────────────
-# Comprehensive skill keyword lists for matching
-TECHNICAL_SKILLS = {
-    # Programming Languages
-    "python", "java", "javascript", "typescript", "c++", "c#", "ruby", "go",
-    "rust", "kotlin", "swift", "php", "scala", "r", "matlab", "perl",
-    "objective-c", "dart", "lua", "haskell", "elixir", "clojure",
-
-    # Web Frameworks
-    "react", "angular", "vue", "django", "flask", "spring", "express",
-    "node", "nodejs", "next", "nextjs", "nuxt", "svelte", "fastapi",
-    "rails", "laravel", "asp.net", "bootstrap", "tailwind", "jquery",
-
-    # Databases
-    "sql", "mysql", "postgresql", "mongodb", "redis", "elasticsearch",
-    "cassandra", "dynamodb", "firebase", "sqlite", "oracle", "neo4j",
-    "mariadb", "couchdb",
-
-    # Cloud & DevOps
-    "aws", "azure", "gcp", "docker", "kubernetes", "jenkins", "terraform",
-    "ansible", "ci/cd", "linux", "git", "github", "gitlab", "bitbucket",
-    "nginx", "apache", "heroku", "vercel", "netlify", "cloudflare",
-
-    # Data Science & ML
-    "machine learning", "deep learning", "tensorflow", "pytorch", "keras",
-    "scikit-learn", "pandas", "numpy", "matplotlib", "seaborn", "nlp",
-    "computer vision", "opencv", "spacy", "nltk", "transformers",
-    "data analysis", "data science", "statistics", "hadoop", "spark",
-    "tableau", "power bi", "jupyter",
-
-    # Mobile
-    "android", "ios", "react native", "flutter", "xamarin",
-
-    # Other
-    "rest", "api", "graphql", "microservices", "agile", "scrum",
-    "html", "css", "sass", "less", "webpack", "babel", "testing",
-    "unit testing", "selenium", "cypress", "jest", "mocha",
-    "figma", "photoshop", "illustrator", "ui/ux",
-    "blockchain", "solidity", "web3",
-}
-
-SOFT_SKILLS = {
-    "communication", "leadership", "teamwork", "problem solving",
-    "problem-solving", "critical thinking", "time management",
-    "adaptability", "creativity", "collaboration", "decision making",
-    "conflict resolution", "negotiation", "presentation",
-    "analytical", "detail oriented", "detail-oriented",
-    "self motivated", "self-motivated", "multitasking",
-    "organizational", "interpersonal", "mentoring",
-    "project management", "strategic thinking",
-}
+# The skill dictionary lives in the versioned taxonomy file
+# (ml/skill_taxonomy.json); each snapshot carries its compiled matcher.
+
+def find_skill_mentions(text):
+    """
+    Find every skill mention in a text, with character offsets.
+
+    Args:
+        text (str): Raw text to search for skills.
+
+    Returns:
+        list[SkillHit]: (skill, start, end) mentions in order of appearance.
+    """
+    return get_taxonomy().matcher.find(text)
 
 
 def extract_skills_from_text(text):
     """
     Extract technical and soft skills from text using keyword matching.
 
-    Uses a curated skill dictionary and checks for multi-word skill phrases.
+    Uses the skill taxonomy compiled into a single matcher; skills only
+    match on word boundaries, multi-word phrases are supported and aliases
+    are reported under their canonical name (e.g. "nodejs" -> "node").
 
     Args:
         text (str): Raw text to search for skills.
@@ -179,16 +312,7 @@ def extract_skills_from_text(text):
     Returns:
         list[str]: Unique skills found in the text.
     """
-    text_lower = text.lower()
-    found_skills = set()
-
-    # Check for multi-word skills first (e.g., "machine learning")
-    all_skills = TECHNICAL_SKILLS | SOFT_SKILLS
-    for skill in all_skills:
-        if skill in text_lower:
-            found_skills.add(skill)
-
-    return list(found_skills)
+    return get_taxonomy().matcher.extract(text)
 
 
 def categorize_skill(skill):
@@ -201,8 +325,4 @@ def categorize_skill(skill):
     Returns:
         str: "technical" or "soft".
     """
-    if skill.lower() in TECHNICAL_SKILLS:
-        return "technical"
-    elif skill.lower() in SOFT_SKILLS:
-        return "soft"
-    return "technical"  # Default to technical for unknown skills
+    return get_taxonomy().category(skill)
@@ -0,0 +1,84 @@
+"""
+ml/pattern_set.py - Single-pass Multi-pattern Scanner
+--------------------------------------------------------
+Compiles many small, independent regexes (section headers, degrees, job
+titles, dates, requirement cues, ...) into one regex that reports, in a
+single left-to-right pass, where each of them matches:
+
+    patterns = PatternSet([
+        ("degree", r"bachelor", False),
+        ("date",   r"jan\w*\s*\d{4}", True),     # True = must start a word
+    ])
+    patterns.kinds("bachelor of science, jan 2020")   # {"degree", "date"}
+
+Alternatives that start with a literal character are grouped under it, so
+at each position the regex engine rejects every pattern that cannot start
+there with one cheap character test. Each alternative ends in an empty
+marker group naming its kind. After a hit the scan resumes one character
+later (not at the end of the hit), so overlapping mentions of different
+kinds are all reported.
+
+Patterns are matched case-sensitively: scan lower-cased text with
+lower-case patterns.
+"""
+
+import re
+
+
+class PatternSet:
+    """Many (kind, pattern) pairs compiled into one scanning regex."""
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries (list[tuple[str, str, bool]]): (kind, pattern, word_start)
+                per alternative. Several entries may share a kind. Where two
+                alternatives match at the same position, the earlier entry
+                wins. word_start patterns must begin with two literal
+                characters.
+        """
+        self._kinds = {}
+        slots = {}   # first literal char (or a unique key) -> alternatives
+        for i, (kind, pattern, word_start) in enumerate(entries):
+            marker = f"p{i}"
+            self._kinds[marker] = kind
+            if word_start:
+                # Word start = no word character before the first one. Checked
+                # after the second character, so the alternative still begins
+                # with a plain literal.
+                pattern = pattern[:2] + r"(?<!\w..)" + pattern[2:]
+            if pattern[0].isalnum() or pattern[0] == " ":
+                slots.setdefault(pattern[0], []).append(f"{pattern[1:]}(?P<{marker}>)")
+            else:
+                slots[marker] = [f"{pattern}(?P<{marker}>)"]
+
+        self.regex = re.compile("|".join(
+            f"{re.escape(key)}(?:{'|'.join(alternatives)})"
+            if len(key) == 1 else f"(?:{alternatives[0]})"
+            for key, alternatives in slots.items()
+        ))
+
+    def scan(self, text):
+        """
+        Yield (kind, start) for every hit, in order of position.
+
+        Args:
+            text (str): Text to scan (lower-cased).
+        """
+        search = self.regex.search
+        kinds = self._kinds
+        match = search(text)
+        while match:
+            yield kinds[match.lastgroup], match.start()
+            match = search(text, match.start() + 1)
+
+    def kinds(self, text):
+        """Return the set of kinds that occur anywhere in the text."""
+        return {kind for kind, _ in self.scan(text)}
+
+    def first_hits(self, text):
+        """Return {kind: start of its first hit} for every kind that occurs."""
+        hits = {}
+        for kind, start in self.scan(text):
+            hits.setdefault(kind, start)
+        return hits
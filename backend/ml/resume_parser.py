@@ -14,7 +14,15 @@ Uses:
 """
 
 import re
-from ml.nlp_utils import extract_skills_from_text, nlp
+from collections import namedtuple
+
+from ml.nlp_utils import extract_skills_from_text
+from ml.pattern_set import PatternSet
+from ml.skill_taxonomy import get_taxonomy
+
+# One classified resume line: the raw text, the section it opens (or None),
+# and whether it mentions a degree, a job title and a month-year date.
+LineTag = namedtuple("LineTag", ["text", "header", "degree", "title", "date"])
 
 
 class ResumeParser:
@@ -25,18 +33,60 @@ class ResumeParser:
     by identifying section headers and applying entity extraction.
     """
 
-    # Common section header patterns (case-insensitive)
-    SECTION_PATTERNS = {
-        "education": r"(?i)\b(education|academic|qualification|degree|university|college)\b",
-        "experience": r"(?i)\b(experience|employment|work history|professional|career)\b",
-        "projects": r"(?i)\b(project|personal project|academic project|portfolio)\b",
-        "skills": r"(?i)\b(skill|technical skill|competenc|expertise|proficiency|technology)\b",
+    # Bump whenever a change alters parse() output: documents stamped with an
+    # older version are re-parsed by the background migrator
+    # (services/migration_service.py).
+    PARSER_VERSION = 1
+
+    # Section header keywords (whole words, case-insensitive), in precedence order
+    SECTION_KEYWORDS = {
+        "education": ["education", "academic", "qualification", "degree", "university", "college"],
+        "experience": ["experience", "employment", "work history", "professional", "career"],
+        "projects": ["project", "personal project", "academic project", "portfolio"],
+        "skills": ["skill", "technical skill", "competenc", "expertise", "proficiency", "technology"],
     }
 
+    # Degree patterns (matched anywhere in a line, case-insensitive)
+    DEGREE_PATTERNS = [
+        r"b\.?\s*tech", r"b\.?\s*e\.?", r"bachelor",
+        r"m\.?\s*tech", r"m\.?\s*e\.?", r"master", r"m\.?\s*s\.?", r"m\.?\s*sc",
+        r"ph\.?\s*d", r"doctorate",
+        r"mba", r"m\.?\s*b\.?\s*a",
+        r"b\.?\s*sc", r"b\.?\s*com", r"b\.?\s*a\.?",
+        r"diploma", r"certification", r"certificate",
+        r"high school", r"secondary", r"hsc", r"ssc", r"12th", r"10th",
+    ]
+
+    # Job title keywords (matched anywhere in a line, case-insensitive)
+    TITLE_KEYWORDS = [
+        "developer", "engineer", "analyst", "manager", "designer", "architect", "consultant",
+        "intern", "trainee", "associate", "lead", "senior", "junior", "director",
+        "administrator", "coordinator", "specialist", "scientist", "researcher",
+    ]
+
+    # Dates: a word starting with a month, then a year (e.g., "Jan 2020 - Present")
+    DATE_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    DATE_SUFFIX = r"\w*\.?\s*\d{4}"
+
+    def __init__(self):
+        # Section keywords come first, in precedence order
+        entries = [
+            (f"section:{section}", re.escape(keyword) + r"\b", True)
+            for section, keywords in self.SECTION_KEYWORDS.items()
+            for keyword in keywords
+        ]
+        entries += [("degree", pattern, False) for pattern in self.DEGREE_PATTERNS]
+        entries += [("title", keyword, False) for keyword in self.TITLE_KEYWORDS]
+        entries += [("date", month + self.DATE_SUFFIX, True) for month in self.DATE_MONTHS]
+        self._line_patterns = PatternSet(entries)
+
     def parse(self, raw_text):
         """
         Main parsing method. Extracts all structured sections.
 
+        Every line is classified exactly once (see _classify_lines); the
+        section splitter and the extractors all read that tag stream.
+
         Args:
             raw_text (str): Full resume text extracted from PDF/DOCX.
 
@@ -51,16 +101,13 @@ class ResumeParser:
         # Extract skills using keyword matcher
         skills = extract_skills_from_text(raw_text)
 
-        # Split text into sections and extract relevant content
-        sections = self._split_into_sections(raw_text)
+        # Tag every line once, then split into sections
+        lines = self._classify_lines(raw_text)
+        sections = self._split_into_sections(lines)
 
-        education = self._extract_education(
-            sections.get("education", ""), raw_text
-        )
-        experience = self._extract_experience(
-            sections.get("experience", ""), raw_text
-        )
-        projects = self._extract_projects(sections.get("projects", ""))
+        education = self._extract_education(sections.get("education"), lines)
+        experience = self._extract_experience(sections.get("experience"), lines)
+        projects = self._extract_projects(sections.get("projects"))
 
         return {
             "skills": skills,
@@ -69,44 +116,88 @@ class ResumeParser:
             "projects": projects,
         }
 
-    def _split_into_sections(self, text):
+    def version(self):
         """
-        Split resume text into logical sections based on header patterns.
+        Version stamp stored next to parse() output. Skills come from the
+        live taxonomy, so its version is part of the stamp.
+
+        Returns:
+            dict: {"parser": int, "taxonomy": int}
+        """
+        return {"parser": self.PARSER_VERSION, "taxonomy": get_taxonomy().version}
+
+    def _classify_lines(self, text):
+        """
+        Tag every line of the resume with one classifier pass per line
+        (see ml/pattern_set.py).
+
+        Returns:
+            list[LineTag]: One tag per line, in order.
+        """
+        tags = []
+        for line in text.split("\n"):
+            found = self._line_patterns.kinds(line.lower())
+            tags.append(LineTag(
+                text=line,
+                header=next(
+                    (name for name in self.SECTION_KEYWORDS if f"section:{name}" in found),
+                    None,
+                ),
+                degree="degree" in found,
+                title="title" in found,
+                date="date" in found,
+            ))
+        return tags
+
+    def _split_into_sections(self, lines):
+        """
+        Split the tagged resume lines into logical sections.
 
         Strategy:
-        - Find all section header positions in the text.
-        - Extract text between consecutive headers.
+        - A line tagged as a section header starts a new section.
+        - The lines up to the next header are that section's content.
 
         Returns:
-            dict: Section name → section text content.
+            dict: Section name → list[LineTag] content lines.
         """
-        lines = text.split("\n")
         sections = {}
         current_section = None
         current_content = []
 
         for line in lines:
-            matched = False
-            for section_name, pattern in self.SECTION_PATTERNS.items():
-                if re.search(pattern, line):
-                    # Save the previous section
-                    if current_section:
-                        sections[current_section] = "\n".join(current_content)
-                    current_section = section_name
-                    current_content = []
-                    matched = True
-                    break
-
-            if not matched and current_section:
+            if line.header:
+                # Save the previous section
+                if current_section:
+                    sections[current_section] = current_content
+                current_section = line.header
+                current_content = []
+            elif current_section:
                 current_content.append(line)
 
         # Save the last section
         if current_section:
-            sections[current_section] = "\n".join(current_content)
+            sections[current_section] = current_content
 
         return sections
 
-    def _extract_education(self, section_text, full_text):
+    @staticmethod
+    def _has_content(section_lines):
+        """True unless the section is missing or holds just one empty line."""
+        return bool(section_lines) and (len(section_lines) > 1 or bool(section_lines[0].text))
+
+    @staticmethod
+    def _unique(entries):
+        """Deduplicate (case-insensitively) while preserving order."""
+        seen = set()
+        unique = []
+        for e in entries:
+            normalized = e.lower()
+            if normalized not in seen:
+                seen.add(normalized)
+                unique.append(e)
+        return unique
+
+    def _extract_education(self, section_lines, all_lines):
         """
         Extract education entries from the education section.
 
@@ -118,42 +209,15 @@ class ResumeParser:
         Returns:
             list[str]: Education entries.
         """
-        education = []
-        text = section_text if section_text else full_text
-
-        # Common degree patterns
-        degree_patterns = [
-            r"(?i)(b\.?\s*tech|b\.?\s*e\.?|bachelor)",
-            r"(?i)(m\.?\s*tech|m\.?\s*e\.?|master|m\.?\s*s\.?|m\.?\s*sc)",
-            r"(?i)(ph\.?\s*d|doctorate)",
-            r"(?i)(mba|m\.?\s*b\.?\s*a)",
-            r"(?i)(b\.?\s*sc|b\.?\s*com|b\.?\s*a\.?)",
-            r"(?i)(diploma|certification|certificate)",
-            r"(?i)(high school|secondary|hsc|ssc|12th|10th)",
-        ]
-
-        lines = text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            for pattern in degree_patterns:
-                if re.search(pattern, line):
-                    education.append(line)
-                    break
-
-        # Deduplicate while preserving order
-        seen = set()
-        unique_edu = []
-        for e in education:
-            normalized = e.lower().strip()
-            if normalized not in seen:
-                seen.add(normalized)
-                unique_edu.append(e.strip())
-
-        return unique_edu if unique_edu else ["Not specified"]
+        lines = section_lines if self._has_content(section_lines) else all_lines
+        education = self._unique(
+            line.text.strip()
+            for line in lines
+            if line.degree and line.text.strip()
+        )
+        return education if education else ["Not specified"]
 
-    def _extract_experience(self, section_text, full_text):
+    def _extract_experience(self, section_lines, all_lines):
         """
         Extract work experience entries.
 
@@ -165,43 +229,15 @@ class ResumeParser:
         Returns:
             list[str]: Experience entries.
         """
-        experience = []
-        text = section_text if section_text else full_text
-
-        # Job title patterns
-        job_patterns = [
-            r"(?i)(developer|engineer|analyst|manager|designer|architect|consultant)",
-            r"(?i)(intern|trainee|associate|lead|senior|junior|director)",
-            r"(?i)(administrator|coordinator|specialist|scientist|researcher)",
-        ]
-
-        # Date range patterns (e.g., "Jan 2020 - Present")
-        date_pattern = r"(?i)(\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)\w*\.?\s*\d{4})"
-
-        lines = text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            has_job_title = any(re.search(p, line) for p in job_patterns)
-            has_date = bool(re.search(date_pattern, line))
-
-            if has_job_title or has_date:
-                experience.append(line)
-
-        # Deduplicate
-        seen = set()
-        unique_exp = []
-        for e in experience:
-            normalized = e.lower().strip()
-            if normalized not in seen:
-                seen.add(normalized)
-                unique_exp.append(e.strip())
-
-        return unique_exp if unique_exp else ["Not specified"]
+        lines = section_lines if self._has_content(section_lines) else all_lines
+        experience = self._unique(
+            line.text.strip()
+            for line in lines
+            if (line.title or line.date) and line.text.strip()
+        )
+        return experience if experience else ["Not specified"]
 
-    def _extract_projects(self, section_text):
+    def _extract_projects(self, section_lines):
         """
         Extract project entries from the projects section.
 
@@ -210,14 +246,14 @@ class ResumeParser:
         Returns:
             list[str]: Project descriptions/names.
         """
-        if not section_text:
+        if not self._has_content(section_lines):
             return ["Not specified"]
 
         projects = []
-        for line in section_text.split("\n"):
-            line = line.strip()
+        for line in section_lines:
+            text = line.text.strip()
             # Filter out very short lines (headers, bullets, etc.)
-            if line and len(line) > 5:
-                projects.append(line)
+            if text and len(text) > 5:
+                projects.append(text)
 
         return projects if projects else ["Not specified"]
@@ -0,0 +1,188 @@
+"""
+ml/skill_bitset.py - Interned Skill IDs and Bitset Skill Overlap
+-------------------------------------------------------------------
+Skills are interned to small integer ids, and a set of skills becomes a
+bitset of uint64 words. Overlap, difference and coverage between a job and
+any number of resumes are then vectorized bit operations:
+
+    skills   = get_interner().scope()
+    resumes  = skills.encode_many([r["skills"] for r in parsed_resumes])  # (N, W)
+    required = skills.encode(jd["required_skills"])                      # (W,)
+    matched  = popcount(resumes & required)                              # (N,)
+
+Skill names are canonicalized through the skill taxonomy before interning,
+so aliases ("nodejs" / "node") share one bit. The shared interner only
+holds the taxonomy skills, so it never grows with request data; skills
+outside the taxonomy get ids in a per-call scope (after the taxonomy ids)
+that is discarded with it. Ids are process-local: they are never
+persisted, only used to score in memory.
+
+Libraries:
+  - numpy: bit operations
+"""
+
+import threading
+
+import numpy as np
+
+from ml.skill_taxonomy import get_taxonomy
+
+
+class SkillInterner:
+    """Immutable mapping between the taxonomy's canonical skills and int ids."""
+
+    def __init__(self, skills=()):
+        taxonomy = get_taxonomy()
+        self._taxonomy = taxonomy
+        self._ids = {}
+        self._names = []
+        for skill in skills:
+            name = taxonomy.canonical(skill)
+            if name not in self._ids:
+                self._ids[name] = len(self._names)
+                self._names.append(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def scope(self):
+        """Return a per-call SkillScope for encoding and decoding skill lists."""
+        return SkillScope(self)
+
+
+class SkillScope:
+    """
+    Per-call view of a SkillInterner: known skills use the shared ids,
+    unknown skills get ids local to this scope. Bitsets from one scope are
+    only comparable with bitsets from the same scope. Not thread-safe;
+    create one per call.
+    """
+
+    def __init__(self, interner):
+        self._interner = interner
+        self._taxonomy = interner._taxonomy
+        self._overflow_ids = {}
+        self._overflow_names = []
+
+    def __len__(self):
+        return len(self._interner) + len(self._overflow_names)
+
+    @property
+    def n_words(self):
+        """uint64 words needed for a bitset over every skill seen so far."""
+        return max(1, (len(self) + 63) // 64)
+
+    def intern(self, skill):
+        """Return the id of a skill (canonicalized), assigning a local one if unknown."""
+        name = self._taxonomy.canonical(skill)
+        skill_id = self._interner._ids.get(name)
+        if skill_id is None:
+            skill_id = self._overflow_ids.get(name)
+            if skill_id is None:
+                skill_id = len(self)
+                self._overflow_names.append(name)
+                self._overflow_ids[name] = skill_id
+        return skill_id
+
+    def ids(self, skills):
+        """Return the sorted, unique int ids of a skill list."""
+        return np.unique(np.fromiter(
+            (self.intern(s) for s in skills), dtype=np.int64, count=len(skills)
+        ))
+
+    def encode(self, skills, n_words=None):
+        """
+        Encode a skill list as a bitset.
+
+        Args:
+            skills (list[str]): Skill names.
+            n_words (int): Bitset width in words (default: current n_words).
+
+        Returns:
+            numpy.ndarray: uint64 array of shape (n_words,).
+        """
+        ids = self.ids(skills)
+        n_words = max(n_words or 0, self.n_words)
+        bits = np.zeros(n_words, dtype=np.uint64)
+        np.bitwise_or.at(
+            bits, ids // 64, np.left_shift(np.uint64(1), (ids % 64).astype(np.uint64))
+        )
+        return bits
+
+    def encode_many(self, skill_lists, n_words=None):
+        """
+        Encode several skill lists into one bitset matrix.
+
+        Returns:
+            numpy.ndarray: uint64 array of shape (len(skill_lists), n_words).
+        """
+        id_lists = [self.ids(skills) for skills in skill_lists]
+        n_words = max(n_words or 0, self.n_words)
+        bits = np.zeros((len(id_lists), n_words), dtype=np.uint64)
+        if id_lists:
+            rows = np.repeat(np.arange(len(id_lists)), [len(ids) for ids in id_lists])
+            ids = np.concatenate(id_lists)
+            np.bitwise_or.at(
+                bits, (rows, ids // 64),
+                np.left_shift(np.uint64(1), (ids % 64).astype(np.uint64)),
+            )
+        return bits
+
+    def decode(self, bits):
+        """Return the sorted skill names whose bits are set in a bitset."""
+        set_ids = np.flatnonzero(
+            np.unpackbits(np.ascontiguousarray(bits).view(np.uint8), bitorder="little")
+        )
+        known = self._interner._names
+        n_known = len(known)
+        names = [
+            known[i] if i < n_known else self._overflow_names[i - n_known]
+            for i in set_ids if i < len(self)
+        ]
+        return sorted(names)
+
+
+def popcount(bits):
+    """
+    Count set bits along the last axis of a uint64 bitset array.
+
+    Returns:
+        numpy.ndarray | int: Bit counts (one per row for 2-d input).
+    """
+    bits = np.ascontiguousarray(bits, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):   # NumPy >= 2.0
+        return np.bitwise_count(bits).sum(axis=-1, dtype=np.int64)
+    as_bytes = bits.view(np.uint8).reshape(bits.shape[:-1] + (-1,))
+    return np.unpackbits(as_bytes, axis=-1).sum(axis=-1, dtype=np.int64)
+
+
+def align(*bitsets):
+    """Zero-pad bitsets / bitset matrices to the same number of words."""
+    n_words = max(b.shape[-1] for b in bitsets)
+    return [
+        b if b.shape[-1] == n_words
+        else np.pad(b, [(0, 0)] * (b.ndim - 1) + [(0, n_words - b.shape[-1])])
+        for b in bitsets
+    ]
+
+
+# ── Shared Interner ──────────────────────────────────────────────────────
+
+_interner = None
+_interner_taxonomy = None
+_interner_lock = threading.Lock()
+
+
+def get_interner():
+    """
+    Return the process-wide interner over the current taxonomy's skills
+    (rebuilt when the taxonomy is reloaded).
+    """
+    global _interner, _interner_taxonomy
+    taxonomy = get_taxonomy()
+    if _interner_taxonomy is not taxonomy:
+        with _interner_lock:
+            if _interner_taxonomy is not taxonomy:
+                _interner = SkillInterner(sorted(taxonomy.skills))
+                _interner_taxonomy = taxonomy
+    return _interner
@@ -0,0 +1,141 @@
+"""
+ml/skill_matcher.py - Compiled Multi-pattern Skill Matcher
+-------------------------------------------------------------
+Finds every dictionary skill mentioned in a text in one linear pass.
+
+The skill dictionary is compiled once into a single regular expression
+shaped like a trie (shared prefixes are factored out, e.g.
+"react(?: native)?"), so matching cost depends on the text length, not on
+the number of skills. Matches must sit on word boundaries: "r" and "go"
+no longer match inside "rust" or "google".
+
+Skills nested inside a longer match ("react" in "react native",
+"testing" in "unit testing") are reported as well, with their own offsets.
+
+Usage:
+    matcher = SkillMatcher({"python", "react", "react native"})
+    matcher.find("React Native and Python")
+    # [SkillHit("react native", 0, 12), SkillHit("react", 0, 5),
+    #  SkillHit("python", 17, 23)]
+"""
+
+import re
+from collections import namedtuple
+
+# A skill mention: canonical skill name and [start, end) character offsets
+SkillHit = namedtuple("SkillHit", ["skill", "start", "end"])
+
+# Characters that may not directly precede / follow a skill mention.
+# "+" and "#" are included so "c" would not match inside "c++" or "c#".
+_WORD_CHARS = r"\w+#"
+
+# Trie node key marking the end of a term
+_END = ""
+
+
+class SkillMatcher:
+    """Single-pass, word-boundary-aware dictionary matcher."""
+
+    def __init__(self, terms):
+        """
+        Compile the dictionary.
+
+        Args:
+            terms (iterable[str] | dict): Skill names, or a mapping of surface
+                                          form -> canonical skill name (aliases).
+        """
+        if not isinstance(terms, dict):
+            terms = {t: t for t in terms}
+        self._canonical = {
+            surface.lower(): canonical
+            for surface, canonical in terms.items() if surface.strip()
+        }
+
+        self._trie = {}
+        for surface in self._canonical:
+            node = self._trie
+            for ch in surface:
+                node = node.setdefault(ch, {})
+            node[_END] = True
+
+        body = self._trie_to_regex(self._trie) or r"(?!)"
+        self._pattern = re.compile(
+            rf"(?<![{_WORD_CHARS}])(?:{body})(?![{_WORD_CHARS}])",
+            re.IGNORECASE,
+        )
+        # Shorter dictionary terms contained in each term, with their offsets
+        self._nested = {
+            surface: self._find_nested(surface) for surface in self._canonical
+        }
+
+    def __len__(self):
+        return len(self._canonical)
+
+    def find(self, text):
+        """
+        Return every skill mention in the text.
+
+        Args:
+            text (str): Text to scan.
+
+        Returns:
+            list[SkillHit]: Mentions in order of appearance.
+        """
+        hits = []
+        for m in self._pattern.finditer(text):
+            surface = m.group(0).lower()
+            if surface not in self._canonical:
+                continue   # case-folding quirk of a non-ASCII character
+            start = m.start()
+            hits.append(SkillHit(self._canonical[surface], start, m.end()))
+            for nested, offset in self._nested[surface]:
+                hits.append(SkillHit(
+                    self._canonical[nested], start + offset, start + offset + len(nested)
+                ))
+        return hits
+
+    def extract(self, text):
+        """
+        Return the unique skills mentioned in the text.
+
+        Returns:
+            list[str]: Canonical skill names in order of first appearance.
+        """
+        return list(dict.fromkeys(hit.skill for hit in self.find(text)))
+
+    # ── Internal Helpers ─────────────────────────────────────────────────
+
+    @classmethod
+    def _trie_to_regex(cls, node):
+        """Convert a trie node into an equivalent (greedy) regex fragment."""
+        branches = [
+            re.escape(ch) + cls._trie_to_regex(child)
+            for ch, child in sorted(node.items()) if ch != _END
+        ]
+        if not branches:
+            return ""
+        if len(branches) == 1 and _END not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Optional tail: greedy, so the longest matching term wins
+        return group + "?" if _END in node else group
+
+    def _find_nested(self, surface):
+        """
+        List the other dictionary terms that occur on word boundaries
+        inside a term, as (term, offset) pairs.
+        """
+        is_word = re.compile(rf"[{_WORD_CHARS}]").match
+        nested = []
+        for start in range(len(surface)):
+            if start > 0 and is_word(surface[start - 1]):
+                continue
+            node = self._trie
+            for end in range(start, len(surface)):
+                node = node.get(surface[end])
+                if node is None:
+                    break
+                at_boundary = end + 1 == len(surface) or not is_word(surface[end + 1])
+                if _END in node and at_boundary and (start, end + 1) != (0, len(surface)):
+                    nested.append((surface[start:end + 1], start))
+        return nested
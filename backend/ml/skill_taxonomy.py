@@ -0,0 +1,175 @@
+"""
+ml/skill_taxonomy.py - Versioned, Hot-reloadable Skill Taxonomy
+------------------------------------------------------------------
+Loads the skill dictionary from ml/skill_taxonomy.json (or the file set
+via SKILL_TAXONOMY_PATH) and compiles it into an immutable in-memory
+snapshot used by skill extraction and skill-gap analysis.
+
+Taxonomy file format:
+{
+    "version" : int,
+    "groups"  : {group_id: display name},
+    "skills"  : [
+        {
+            "id"             : str   (canonical, lower-case skill name),
+            "category"       : str   ("technical" | "soft"),
+            "parent"         : str   (group id, e.g. "web-frameworks"),
+            "aliases"        : [str] (other spellings, e.g. "nodejs"),
+            "recommendation" : str   (learning advice, optional)
+        },
+        ...
+    ]
+}
+
+Hot reload:
+  get_taxonomy() checks the file's modification time at most once every
+  SKILL_TAXONOMY_RELOAD_INTERVAL seconds. A changed file is compiled off
+  to the side and swapped in atomically; callers that already hold a
+  snapshot keep using it. An invalid file is reported and ignored, so the
+  previous taxonomy stays active.
+"""
+
+import json
+import os
+import threading
+import time
+
+from config import Config
+from ml.skill_matcher import SkillMatcher
+
+
+class SkillTaxonomy:
+    """Immutable compiled snapshot of the skill taxonomy."""
+
+    def __init__(self, data):
+        """
+        Compile a parsed taxonomy document.
+
+        Args:
+            data (dict): Taxonomy file content (see module docstring).
+
+        Raises:
+            ValueError: If the document is malformed.
+        """
+        if not isinstance(data.get("skills"), list):
+            raise ValueError("taxonomy has no 'skills' list")
+
+        self.version = data.get("version", 0)
+        self.groups = dict(data.get("groups", {}))
+        self.skills = {}
+        aliases = {}
+        for entry in data["skills"]:
+            skill_id = entry["id"].strip().lower()
+            if entry.get("category", "technical") not in ("technical", "soft"):
+                raise ValueError(f"skill '{skill_id}' has an invalid category")
+            self.skills[skill_id] = {
+                "id": skill_id,
+                "category": entry.get("category", "technical"),
+                "parent": entry.get("parent"),
+                "aliases": [a.strip().lower() for a in entry.get("aliases", [])],
+                "recommendation": entry.get("recommendation"),
+            }
+            aliases[skill_id] = skill_id
+            for alias in self.skills[skill_id]["aliases"]:
+                aliases.setdefault(alias, skill_id)
+        self._aliases = aliases
+
+        self.technical_skills = frozenset(
+            s for s, e in self.skills.items() if e["category"] == "technical"
+        )
+        self.soft_skills = frozenset(
+            s for s, e in self.skills.items() if e["category"] == "soft"
+        )
+        self.matcher = SkillMatcher(aliases)
+
+    def canonical(self, skill):
+        """Map a skill name or alias to its canonical id (unknown names pass through)."""
+        name = skill.strip().lower()
+        return self._aliases.get(name, name)
+
+    def category(self, skill):
+        """Return "technical" or "soft" (unknown skills default to technical)."""
+        entry = self.skills.get(self.canonical(skill))
+        return entry["category"] if entry else "technical"
+
+    def parent(self, skill):
+        """Return the parent group id of a skill, or None."""
+        entry = self.skills.get(self.canonical(skill))
+        return entry["parent"] if entry else None
+
+    def recommendation(self, skill):
+        """Return the learning recommendation of a skill, or None."""
+        entry = self.skills.get(self.canonical(skill))
+        return entry["recommendation"] if entry else None
+
+
+def load_taxonomy(path):
+    """
+    Read and compile a taxonomy file.
+
+    Args:
+        path (str): Path to the taxonomy JSON file.
+
+    Returns:
+        SkillTaxonomy: Compiled snapshot.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return SkillTaxonomy(json.load(f))
+
+
+# ── Shared, Hot-reloaded Snapshot ────────────────────────────────────────
+
+_taxonomy = None
+_mtime = None
+_next_check = 0.0
+_lock = threading.Lock()
+
+
+def get_taxonomy():
+    """
+    Return the current taxonomy snapshot, reloading it if the file changed.
+
+    Never blocks on a reload in progress: while one thread recompiles a
+    changed file, other threads keep getting the previous snapshot.
+    """
+    global _next_check
+    if _taxonomy is None:
+        with _lock:
+            if _taxonomy is None:
+                _reload(force=True)
+                _next_check = time.monotonic() + Config.SKILL_TAXONOMY_RELOAD_INTERVAL
+        return _taxonomy
+
+    interval = Config.SKILL_TAXONOMY_RELOAD_INTERVAL
+    if interval > 0 and time.monotonic() >= _next_check and _lock.acquire(blocking=False):
+        try:
+            _next_check = time.monotonic() + interval
+            _reload()
+        finally:
+            _lock.release()
+    return _taxonomy
+
+
+def _reload(force=False):
+    """Load the taxonomy file if it changed since the last load. Caller holds _lock."""
+    global _taxonomy, _mtime
+    path = Config.SKILL_TAXONOMY_PATH
+    mtime = None
+    try:
+        mtime = os.path.getmtime(path)
+        if not force and mtime == _mtime:
+            return
+        taxonomy = load_taxonomy(path)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"[Skill Taxonomy] Could not load '{path}': {e}")
+        if _taxonomy is None:
+            raise
+        # Keep the previous taxonomy; retry once the file changes again
+        _mtime = mtime
+        return
+
+    _taxonomy, _mtime = taxonomy, mtime
+    print(
+        f"[Skill Taxonomy] Loaded version {taxonomy.version} "
+        f"({len(taxonomy.skills)} skills)."
+    )
@@ -0,0 +1,217 @@
+"""
+models/bulk_job.py - Asynchronous Bulk Matching Job Model
+-----------------------------------------------------------
+Tracks background bulk-matching jobs and their scored candidates.
+
+Jobs belong to the user who submitted them and are only readable by that
+user. Jobs and their candidates are removed automatically by TTL indexes
+once they are older than the configured retention (Config.BULK_JOB_TTL).
+Candidates store scores and skill analysis only, never the parsed resume.
+
+Jobs run on an in-process executor and are leased by that process: it
+refreshes updated_at while the job is queued or running. A job whose
+lease has expired (its process stopped) is marked failed at startup.
+
+MongoDB Collection: bulk_jobs
+Document Schema:
+{
+    _id             : ObjectId,
+    user_id         : str  (submitting user),
+    owner           : str  (host:pid of the process running it),
+    status          : str  ("queued" | "running" | "completed" | "failed"),
+    total           : int  (resume documents to score),
+    processed       : int  (documents handled so far, scored or failed),
+    jd_parsed       : dict (JDParser output),
+    errors          : [str],
+    best_candidate  : { file_name, overall_score, ai_recommendation } | None,
+    created_at      : datetime,
+    updated_at      : datetime  (lease heartbeat while queued / running),
+    completed_at    : datetime | None
+}
+
+MongoDB Collection: bulk_job_candidates
+Document Schema:
+{
+    _id             : ObjectId,
+    bulk_job_id     : str  (reference to bulk_jobs._id),
+    file_name       : str,
+    overall_score   : float,
+    ...             : candidate scores, skills, gaps, explanation,
+    created_at      : datetime  (TTL anchor)
+}
+"""
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo.errors import OperationFailure
+
+
+class BulkJobModel:
+    """Encapsulates all bulk-job database operations."""
+
+    def __init__(self, db, ttl_seconds=None):
+        """
+        Args:
+            db: MongoDB database.
+            ttl_seconds (int): Retention of jobs and candidates in seconds
+                               (None or 0 = keep forever).
+        """
+        self.db = db
+        self.collection = db["bulk_jobs"]
+        self.candidates = db["bulk_job_candidates"]
+        # Ranked pagination: candidates of one job sorted by score, with _id
+        # as a tiebreaker so equal scores keep a stable order across pages
+        self.candidates.create_index(
+            [("bulk_job_id", 1), ("overall_score", -1), ("_id", 1)]
+        )
+        self.collection.create_index([("status", 1), ("updated_at", 1)])
+        if ttl_seconds:
+            self._ensure_ttl_index(self.collection, ttl_seconds)
+            self._ensure_ttl_index(self.candidates, ttl_seconds)
+
+    def _ensure_ttl_index(self, collection, ttl_seconds):
+        """Create the created_at TTL index, or update its expiry if it changed."""
+        try:
+            collection.create_index(
+                "created_at", name="created_at_ttl", expireAfterSeconds=ttl_seconds
+            )
+        except OperationFailure:
+            self.db.command(
+                "collMod", collection.name,
+                index={"name": "created_at_ttl", "expireAfterSeconds": ttl_seconds},
+            )
+
+    # ── Create ───────────────────────────────────────────────────────────
+    def create_job(self, user_id, owner, total, jd_parsed, errors=None):
+        """
+        Register a new queued bulk job owned by a user, leased by a process.
+
+        Returns:
+            str: Inserted job ID.
+        """
+        doc = {
+            "user_id": user_id,
+            "owner": owner,
+            "status": "queued",
+            "total": total,
+            "processed": 0,
+            "jd_parsed": jd_parsed,
+            "errors": list(errors or []),
+            "best_candidate": None,
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            "completed_at": None,
+        }
+        result = self.collection.insert_one(doc)
+        return str(result.inserted_id)
+
+    def add_candidates(self, job_id, candidates, processed, errors):
+        """
+        Store a chunk of scored candidates and advance the progress counter.
+
+        Args:
+            job_id (str): Bulk job ID.
+            candidates (list[dict]): Scored candidates of this chunk
+                                     (parsed resumes are not stored).
+            processed (int): Documents handled in this chunk (incl. failures).
+            errors (list[str]): Error messages raised by this chunk.
+        """
+        if candidates:
+            now = datetime.utcnow()
+            self.candidates.insert_many([
+                {
+                    **{k: v for k, v in c.items() if k != "resume_parsed"},
+                    "bulk_job_id": job_id,
+                    "created_at": now,
+                }
+                for c in candidates
+            ])
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$inc": {"processed": processed},
+                "$push": {"errors": {"$each": list(errors)}},
+                "$set": {"status": "running", "updated_at": datetime.utcnow()},
+            },
+        )
+
+    # ── Read ─────────────────────────────────────────────────────────────
+    def find_by_id(self, job_id, user_id=None):
+        """Return a single bulk job by its ID (only if owned by user_id, when given)."""
+        query = {"_id": ObjectId(job_id)}
+        if user_id is not None:
+            query["user_id"] = user_id
+        return self.collection.find_one(query)
+
+    def count_candidates(self, job_id):
+        """Number of candidates scored so far for a job."""
+        return self.candidates.count_documents({"bulk_job_id": job_id})
+
+    def find_candidates(self, job_id, skip=0, limit=20):
+        """Return one page of a job's candidates, best score first."""
+        return list(
+            self.candidates.find(
+                {"bulk_job_id": job_id},
+                {"bulk_job_id": 0, "created_at": 0, "resume_parsed": 0},
+            )
+            .sort([("overall_score", -1), ("_id", 1)])
+            .skip(skip)
+            .limit(limit)
+        )
+
+    # ── Update ───────────────────────────────────────────────────────────
+    def heartbeat(self, owner):
+        """Renew the lease of every unfinished job run by a process."""
+        self.collection.update_many(
+            {"owner": owner, "status": {"$in": ["queued", "running"]}},
+            {"$set": {"updated_at": datetime.utcnow()}},
+        )
+
+    def fail_orphaned(self, lease_seconds):
+        """
+        Mark unfinished jobs whose lease has expired as failed (their process
+        stopped, e.g. on a restart, and nothing will finish them).
+
+        Returns:
+            int: Number of jobs marked failed.
+        """
+        now = datetime.utcnow()
+        result = self.collection.update_many(
+            {
+                "status": {"$in": ["queued", "running"]},
+                "updated_at": {"$lt": now - timedelta(seconds=lease_seconds)},
+            },
+            {
+                "$set": {"status": "failed", "updated_at": now, "completed_at": now},
+                "$push": {"errors": "Bulk matching was interrupted by a server restart."},
+            },
+        )
+        return result.modified_count
+
+    def mark_completed(self, job_id, best_candidate):
+        """Mark a job as finished with its best-candidate recommendation."""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$set": {
+                    "status": "completed",
+                    "best_candidate": best_candidate,
+                    "updated_at": datetime.utcnow(),
+                    "completed_at": datetime.utcnow(),
+                }
+            },
+        )
+
+    def mark_failed(self, job_id, error):
+        """Mark a job as failed, recording the fatal error."""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$set": {
+                    "status": "failed",
+                    "updated_at": datetime.utcnow(),
+                    "completed_at": datetime.utcnow(),
+                },
+                "$push": {"errors": error},
+            },
+        )
@@ -17,6 +17,19 @@ Document Schema:
         experience_level : str,
         education_level  : str
     },
+    features         : {            (precomputed at ingest, see ml/document_features.py)
+        preprocess_version : int,
+        tokens             : str,
+        model_id           : str,
+        embedding          : bytes  (float32 384-d),
+        chunk_spans        : [[int, int]],
+        chunk_embeddings   : bytes  (float32 n_chunks x 384)
+    },
+    parse_version    : {            (what produced parsed_data, see JDParser.version)
+        parser   : int,
+        taxonomy : int
+    },
+    file_hash        : str | None  (SHA-256 of the uploaded file, None for text input),
     created_at       : datetime,
     updated_at       : datetime
 }
@@ -32,11 +45,16 @@ class JobModel:
     def __init__(self, db):
         self.collection = db["jobs"]
         self.collection.create_index("user_id")
+        # Reference count of cached extraction results (utils/extraction_cache.py)
+        self.collection.create_index("file_hash")
 
     # ── Create ───────────────────────────────────────────────────────────
-    def create_job(self, user_id, title, company, description, parsed_data):
+    def create_job(self, user_id, title, company, description, parsed_data,
+                   features=None, parse_version=None, file_hash=None):
         """
-        Save a new job description with its NLP-parsed structured data.
+        Save a new job description with its NLP-parsed structured data
+        (stamped with the parse_version that produced it) and (optionally)
+        its precomputed matching features.
 
         Returns:
             str: Inserted document ID.
@@ -47,6 +65,9 @@ class JobModel:
             "company": company,
             "description": description,
             "parsed_data": parsed_data,
+            "features": features,
+            "parse_version": parse_version,
+            "file_hash": file_hash,
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
         }
@@ -58,6 +79,12 @@ class JobModel:
         """Return a single job description by its ID."""
         return self.collection.find_one({"_id": ObjectId(job_id)})
 
+    def find_by_ids(self, job_ids, projection=None):
+        """Return the jobs with the given IDs (in no particular order)."""
+        return list(self.collection.find(
+            {"_id": {"$in": [ObjectId(i) for i in job_ids]}}, projection
+        ))
+
     def find_by_user(self, user_id):
         """Return all job descriptions created by a specific recruiter."""
         return list(self.collection.find({"user_id": user_id}))
@@ -66,9 +93,20 @@ class JobModel:
         """Return all job descriptions (for admin or listing)."""
         return list(self.collection.find())
 
-    def count_jobs(self):
-        """Total number of job descriptions in the system."""
-        return self.collection.count_documents({})
+    def count_jobs(self, query=None):
+        """Total number of job descriptions in the system (or matching a query)."""
+        return self.collection.count_documents(query or {})
+
+    def find_batch(self, query, after_id=None, limit=100, projection=None):
+        """
+        Return up to `limit` job descriptions matching a query, in _id order,
+        starting after `after_id` (for resumable scans over the collection).
+        """
+        if after_id is not None:
+            query = {"$and": [query, {"_id": {"$gt": after_id}}]}
+        return list(
+            self.collection.find(query, projection).sort("_id", 1).limit(limit)
+        )
 
     # ── Update ───────────────────────────────────────────────────────────
     def update_job(self, job_id, update_fields):
@@ -79,6 +117,41 @@ class JobModel:
             {"$set": update_fields},
         )
 
+    def update_parsed_data(self, job_id, parsed_data, parse_version=None,
+                           features=None, unchanged_since=None):
+        """
+        Re-parse and update structured data for an existing job.
+
+        Args:
+            job_id (str | ObjectId): Job to update.
+            parsed_data (dict): New structured extraction.
+            parse_version (dict): Parser / taxonomy versions behind parsed_data.
+            features (dict): Recomputed matching features (None = keep).
+            unchanged_since (datetime): Only update if the job's updated_at
+                                        still equals this (optimistic check).
+
+        Returns:
+            bool: True if the job was updated.
+        """
+        query = {"_id": ObjectId(job_id)}
+        if unchanged_since is not None:
+            query["updated_at"] = unchanged_since
+        fields = {
+            "parsed_data": parsed_data,
+            "parse_version": parse_version,
+            "updated_at": datetime.utcnow(),
+        }
+        if features is not None:
+            fields["features"] = features
+        return self.collection.update_one(query, {"$set": fields}).matched_count == 1
+
+    def update_features(self, job_id, features):
+        """Store (re)computed matching features for an existing job."""
+        self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"features": features}},
+        )
+
     # ── Delete ───────────────────────────────────────────────────────────
     def delete_job(self, job_id):
         """Remove a job description by ID."""
@@ -0,0 +1,236 @@
+"""
+models/migration.py - Background Migration Checkpoint Model
+--------------------------------------------------------------
+Tracks resumable background migrations (e.g. re-parsing and re-embedding
+documents produced by an older parser, taxonomy or embedding model).
+
+MongoDB Collection: migrations
+Document Schema:
+{
+    _id          : ObjectId,
+    kind         : str  ("reparse"),
+    status       : str  ("queued" | "running" | "paused" | "completed"
+                         | "failed" | "superseded"),
+    active       : bool (True while queued, running or paused; at most one
+                         active run per kind, enforced by a unique index),
+    owner        : str | None  (host:pid of the process running it),
+    targets      : dict | None (versions documents are migrated to),
+    progress     : {
+        <collection> : {
+            total     : int  (stale documents when the run started),
+            processed : int  (documents handled so far),
+            updated   : int,
+            skipped   : int  (changed or deleted while being migrated),
+            failed    : int,
+            last_id   : ObjectId | None  (checkpoint: last handled _id),
+            done      : bool
+        }
+    },
+    errors       : [str]  (most recent errors only),
+    created_at   : datetime,
+    updated_at   : datetime  (heartbeat: refreshed at every checkpoint),
+    completed_at : datetime | None
+}
+"""
+
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+class MigrationModel:
+    """Encapsulates all migration-checkpoint database operations."""
+
+    # Errors kept per run (older ones are dropped)
+    MAX_ERRORS = 50
+    # Statuses of an unfinished run (the one a new start resumes)
+    ACTIVE_STATUSES = ("queued", "running", "paused")
+
+    def __init__(self, db):
+        self.collection = db["migrations"]
+        self.collection.create_index([("kind", 1), ("created_at", -1)])
+        self._backfill_active()
+        self.collection.create_index(
+            "kind", unique=True, name="kind_active_unique",
+            partialFilterExpression={"active": True},
+        )
+
+    def _backfill_active(self):
+        """
+        Flag unfinished runs stored before the `active` field existed. Only
+        the newest one per kind stays active; older ones are superseded.
+        """
+        legacy = self.collection.find(
+            {"status": {"$in": list(self.ACTIVE_STATUSES)}, "active": {"$exists": False}},
+            sort=[("created_at", -1)],
+        )
+        for run in legacy:
+            if self.collection.find_one({"kind": run["kind"], "active": True}):
+                self.set_status(str(run["_id"]), "superseded")
+            else:
+                self.collection.update_one({"_id": run["_id"]}, {"$set": {"active": True}})
+
+    # ── Create ───────────────────────────────────────────────────────────
+    def get_or_create_active(self, kind, collections):
+        """
+        Return the unfinished run of a kind, registering a new queued run if
+        there is none. Atomic across processes: concurrent callers all get
+        the same run.
+
+        Args:
+            kind (str): Migration kind (e.g. "reparse").
+            collections (list[str]): Collections the run walks through, in order.
+
+        Returns:
+            tuple: (run_id (str), created (bool)).
+        """
+        doc = self._new_run(kind, collections)
+        try:
+            run = self.collection.find_one_and_update(
+                {"kind": kind, "active": True},
+                {"$setOnInsert": doc},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race: the other caller's run is the active one
+            run = self.find_active(kind)
+        return str(run["_id"]), run["_id"] == doc["_id"]
+
+    @staticmethod
+    def _new_run(kind, collections):
+        """Build the document of a new queued run."""
+        now = datetime.utcnow()
+        return {
+            "_id": ObjectId(),
+            "kind": kind,
+            "status": "queued",
+            "active": True,
+            "owner": None,
+            "targets": None,
+            "progress": {
+                name: {
+                    "total": 0,
+                    "processed": 0,
+                    "updated": 0,
+                    "skipped": 0,
+                    "failed": 0,
+                    "last_id": None,
+                    "done": False,
+                }
+                for name in collections
+            },
+            "errors": [],
+            "created_at": now,
+            "updated_at": now,
+            "completed_at": None,
+        }
+
+    # ── Read ─────────────────────────────────────────────────────────────
+    def find_by_id(self, run_id):
+        """Return a single migration run by its ID."""
+        return self.collection.find_one({"_id": ObjectId(run_id)})
+
+    def find_latest(self, kind):
+        """Return the most recently created run of a kind, or None."""
+        return self.collection.find_one({"kind": kind}, sort=[("created_at", -1)])
+
+    def find_active(self, kind):
+        """Return the unfinished (queued, running or paused) run of a kind, or None."""
+        return self.collection.find_one({"kind": kind, "active": True})
+
+    # ── Update ───────────────────────────────────────────────────────────
+    def claim(self, run_id, owner, lease_seconds, resume_paused=True):
+        """
+        Atomically mark an unfinished run as running in this process.
+
+        A run that is already running elsewhere can only be taken over once
+        its heartbeat is older than the lease (its process has died).
+
+        Args:
+            run_id (str): Migration run ID.
+            owner (str): host:pid of the claiming process.
+            lease_seconds (int): Heartbeat age after which a running run is dead.
+            resume_paused (bool): Whether a paused run may be claimed (False for
+                automatic restarts: only an admin resumes a run an admin paused).
+
+        Returns:
+            bool: True if the run was claimed.
+        """
+        now = datetime.utcnow()
+        claimable = ["queued", "paused"] if resume_paused else ["queued"]
+        result = self.collection.update_one(
+            {
+                "_id": ObjectId(run_id),
+                "active": True,
+                "$or": [
+                    {"status": {"$in": claimable}},
+                    {"status": "running", "owner": owner},
+                    {
+                        "status": "running",
+                        "updated_at": {"$lt": now - timedelta(seconds=lease_seconds)},
+                    },
+                ],
+            },
+            {"$set": {"status": "running", "owner": owner, "updated_at": now}},
+        )
+        return result.matched_count == 1
+
+    def set_targets(self, run_id, targets, totals):
+        """Record the target versions and the stale-document count per collection."""
+        fields = {"targets": targets, "updated_at": datetime.utcnow()}
+        for name, total in totals.items():
+            fields[f"progress.{name}.total"] = total
+        self.collection.update_one({"_id": ObjectId(run_id)}, {"$set": fields})
+
+    def checkpoint(self, run_id, name, last_id, updated, skipped, failed, errors):
+        """
+        Store the progress of one finished batch.
+
+        Args:
+            run_id (str): Migration run ID.
+            name (str): Collection the batch came from.
+            last_id (ObjectId): Last _id of the batch (the scan resumes after it).
+            updated, skipped, failed (int): Outcome counts of the batch.
+            errors (list[str]): Error messages raised by the batch.
+        """
+        self.collection.update_one(
+            {"_id": ObjectId(run_id)},
+            {
+                "$set": {
+                    f"progress.{name}.last_id": last_id,
+                    "updated_at": datetime.utcnow(),
+                },
+                "$inc": {
+                    f"progress.{name}.processed": updated + skipped + failed,
+                    f"progress.{name}.updated": updated,
+                    f"progress.{name}.skipped": skipped,
+                    f"progress.{name}.failed": failed,
+                },
+                "$push": {
+                    "errors": {"$each": list(errors), "$slice": -self.MAX_ERRORS}
+                },
+            },
+        )
+
+    def mark_collection_done(self, run_id, name):
+        """Mark one collection of a run as fully migrated."""
+        self.collection.update_one(
+            {"_id": ObjectId(run_id)},
+            {"$set": {f"progress.{name}.done": True, "updated_at": datetime.utcnow()}},
+        )
+
+    def set_status(self, run_id, status, error=None):
+        """
+        Move a run to a new status ("paused", "completed", "failed" or
+        "superseded"), optionally recording a fatal error. Every status but
+        "paused" finishes the run, so the next start creates a new one.
+        """
+        update = {"$set": {"status": status, "owner": None, "updated_at": datetime.utcnow()}}
+        if status != "paused":
+            update["$set"]["active"] = False
+            update["$set"]["completed_at"] = datetime.utcnow()
+        if error:
+            update["$push"] = {"errors": {"$each": [error], "$slice": -self.MAX_ERRORS}}
+        self.collection.update_one({"_id": ObjectId(run_id)}, update)
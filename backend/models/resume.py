@@ -17,6 +17,19 @@ Document Schema:
         experience  : [str],
         projects    : [str]
     },
+    features      : {               (precomputed at ingest, see ml/document_features.py)
+        preprocess_version : int,
+        tokens             : str,
+        model_id           : str,
+        embedding          : bytes  (float32 384-d),
+        chunk_spans        : [[int, int]],
+        chunk_embeddings   : bytes  (float32 n_chunks x 384)
+    },
+    parse_version : {               (what produced parsed_data, see ResumeParser.version)
+        parser   : int,
+        taxonomy : int
+    },
+    file_hash     : str  (SHA-256 of the uploaded file),
     uploaded_at   : datetime,
     updated_at    : datetime
 }
@@ -33,9 +46,12 @@ class ResumeModel:
         self.collection = db["resumes"]
         # Index on user_id for fast lookups
         self.collection.create_index("user_id")
+        # Reference count of cached extraction results (utils/extraction_cache.py)
+        self.collection.create_index("file_hash")
 
     # ── Create ───────────────────────────────────────────────────────────
-    def save_resume(self, user_id, filename, file_path, raw_text, parsed_data):
+    def save_resume(self, user_id, filename, file_path, raw_text, parsed_data,
+                    features=None, parse_version=None, file_hash=None):
         """
         Store a parsed resume document.
 
@@ -45,6 +61,10 @@ class ResumeModel:
             file_path (str): Server-side storage path.
             raw_text (str): Extracted plain text.
             parsed_data (dict): Structured extraction (skills, education, etc.).
+            features (dict): Precomputed matching features (tokens,
+                             embedding), or None.
+            parse_version (dict): Parser / taxonomy versions behind parsed_data.
+            file_hash (str): SHA-256 of the uploaded file (None for text input).
 
         Returns:
             str: Inserted document ID.
@@ -55,6 +75,9 @@ class ResumeModel:
             "file_path": file_path,
             "raw_text": raw_text,
             "parsed_data": parsed_data,
+            "features": features,
+            "parse_version": parse_version,
+            "file_hash": file_hash,
             "uploaded_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
         }
@@ -70,6 +93,12 @@ class ResumeModel:
         """Return a single resume by its ID."""
         return self.collection.find_one({"_id": ObjectId(resume_id)})
 
+    def find_by_ids(self, resume_ids, projection=None):
+        """Return the resumes with the given IDs (in no particular order)."""
+        return list(self.collection.find(
+            {"_id": {"$in": [ObjectId(i) for i in resume_ids]}}, projection
+        ))
+
     def get_latest_by_user(self, user_id):
         """Get the most recently uploaded resume for a user."""
         return self.collection.find_one(
@@ -77,21 +106,55 @@ class ResumeModel:
             sort=[("uploaded_at", -1)],
         )
 
-    def count_resumes(self):
-        """Total number of resumes in the system."""
-        return self.collection.count_documents({})
+    def count_resumes(self, query=None):
+        """Total number of resumes in the system (or matching a query)."""
+        return self.collection.count_documents(query or {})
+
+    def find_batch(self, query, after_id=None, limit=100, projection=None):
+        """
+        Return up to `limit` resumes matching a query, in _id order,
+        starting after `after_id` (for resumable scans over the collection).
+        """
+        if after_id is not None:
+            query = {"$and": [query, {"_id": {"$gt": after_id}}]}
+        return list(
+            self.collection.find(query, projection).sort("_id", 1).limit(limit)
+        )
 
     # ── Update ───────────────────────────────────────────────────────────
-    def update_parsed_data(self, resume_id, parsed_data):
-        """Re-parse and update structured data for an existing resume."""
+    def update_parsed_data(self, resume_id, parsed_data, parse_version=None,
+                           features=None, unchanged_since=None):
+        """
+        Re-parse and update structured data for an existing resume.
+
+        Args:
+            resume_id (str | ObjectId): Resume to update.
+            parsed_data (dict): New structured extraction.
+            parse_version (dict): Parser / taxonomy versions behind parsed_data.
+            features (dict): Recomputed matching features (None = keep).
+            unchanged_since (datetime): Only update if the resume's updated_at
+                                        still equals this (optimistic check).
+
+        Returns:
+            bool: True if the resume was updated.
+        """
+        query = {"_id": ObjectId(resume_id)}
+        if unchanged_since is not None:
+            query["updated_at"] = unchanged_since
+        fields = {
+            "parsed_data": parsed_data,
+            "parse_version": parse_version,
+            "updated_at": datetime.utcnow(),
+        }
+        if features is not None:
+            fields["features"] = features
+        return self.collection.update_one(query, {"$set": fields}).matched_count == 1
+
+    def update_features(self, resume_id, features):
+        """Store (re)computed matching features for an existing resume."""
         self.collection.update_one(
             {"_id": ObjectId(resume_id)},
-            {
-                "$set": {
-                    "parsed_data": parsed_data,
-                    "updated_at": datetime.utcnow(),
-                }
-            },
+            {"$set": {"features": features}},
         )
 
     # ── Delete ───────────────────────────────────────────────────────────
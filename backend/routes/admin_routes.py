@@ -7,11 +7,16 @@ Exposes RESTful endpoints for admin dashboard functionality:
   GET /api/admin/users      - List all registered users
   GET /api/admin/logs       - Recent matching activity logs
 
+  POST /api/admin/migrations/reparse       - Start / resume the re-parse migration
+  GET  /api/admin/migrations/reparse       - Progress of the latest migration run
+  POST /api/admin/migrations/reparse/stop  - Pause the running migration
+
 All routes are protected by JWT + Admin role check.
 """
 
 from flask import Blueprint, request, jsonify
 from services.admin_service import AdminService
+from services.migration_service import MigrationService
 from utils.auth import token_required, role_required
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/api/admin")
@@ -28,6 +33,7 @@ def init_admin_routes(db):
         Blueprint: Configured admin blueprint.
     """
     service = AdminService(db)
+    migration_service = MigrationService(db)
 
     # ── GET /api/admin/stats ─────────────────────────────────────────────
     @admin_bp.route("/stats", methods=["GET"])
@@ -122,4 +128,82 @@ def init_admin_routes(db):
         except Exception as e:
             return jsonify({"error": f"Failed to get logs: {str(e)}"}), 500
 
+    # ── POST /api/admin/migrations/reparse ───────────────────────────────
+    @admin_bp.route("/migrations/reparse", methods=["POST"])
+    @token_required
+    @role_required("Admin")
+    def start_reparse_migration():
+        """
+        Re-parse and re-embed every resume and job whose stored parse or
+        features are stale, in the background. Resumes the latest paused
+        or interrupted run from its checkpoint.
+
+        Requires: Admin role.
+
+        Response (202):
+            {
+                "message": "Re-parse migration started.",
+                "migration_id": "...",
+                "status": "running",
+                "status_url": "/api/admin/migrations/reparse"
+            }
+        """
+        try:
+            response, status_code = migration_service.start_reparse()
+            return jsonify(response), status_code
+
+        except Exception as e:
+            return jsonify({"error": f"Failed to start migration: {str(e)}"}), 500
+
+    # ── GET /api/admin/migrations/reparse ────────────────────────────────
+    @admin_bp.route("/migrations/reparse", methods=["GET"])
+    @token_required
+    @role_required("Admin")
+    def get_reparse_migration():
+        """
+        Get the progress of the latest re-parse migration run.
+
+        Requires: Admin role.
+
+        Response (200):
+            {
+                "migration": {
+                    "id": "...",
+                    "status": "running",
+                    "targets": {...},
+                    "collections": {
+                        "resumes": {"total": 150, "processed": 64, "updated": 63,
+                                    "skipped": 1, "failed": 0, "percent": 42.7, ...},
+                        "jobs": {...}
+                    },
+                    "errors": [...],
+                    ...
+                }
+            }
+        """
+        try:
+            response, status_code = migration_service.get_reparse_status()
+            return jsonify(response), status_code
+
+        except Exception as e:
+            return jsonify({"error": f"Failed to get migration status: {str(e)}"}), 500
+
+    # ── POST /api/admin/migrations/reparse/stop ──────────────────────────
+    @admin_bp.route("/migrations/reparse/stop", methods=["POST"])
+    @token_required
+    @role_required("Admin")
+    def stop_reparse_migration():
+        """
+        Pause the running re-parse migration after its current batch.
+        Start it again to resume from the checkpoint.
+
+        Requires: Admin role.
+        """
+        try:
+            response, status_code = migration_service.stop_reparse()
+            return jsonify(response), status_code
+
+        except Exception as e:
+            return jsonify({"error": f"Failed to stop migration: {str(e)}"}), 500
+
     return admin_bp
@@ -7,26 +7,33 @@ Exposes RESTful endpoints for AI-based resume–JD matching:
   GET  /api/match/history         - Get all past match results for the user
   GET  /api/match/<match_id>      - Get a specific match result
   GET  /api/match/job/<job_id>    - Get all matches for a job (recruiter)
+  GET  /api/match/job/<job_id>/top       - Top-K resumes for a job (embedding index)
+  GET  /api/match/resume/<id>/jobs       - Top-K jobs for a resume (embedding index)
   POST /api/match/skillgap        - Run standalone skill gap analysis
+  POST /api/match/direct          - Match an uploaded resume against a JD
+  POST /api/match/bulk            - Rank many resumes against one JD
+                                    (synchronous, streamed as NDJSON/SSE,
+                                     or a background job)
+  GET  /api/match/bulk/<job_id>   - Poll a bulk job's progress and results
 
 Protected by JWT authentication.
 """
 
-import os
-import zipfile
-import tempfile
-import shutil
-
-from flask import Blueprint, request, jsonify, g
+from flask import Blueprint, Response, request, jsonify, g, stream_with_context
 from services.match_service import MatchService
+from services.bulk_match_service import BulkMatchService, STREAM_FORMATS
 from ml.skill_gap_analyzer import SkillGapAnalyzer
-from ml.matching_engine import MatchingEngine
+from ml import model_registry
 from ml.resume_parser import ResumeParser
 from ml.jd_parser import JDParser
-from ml.ai_engine import AIEngine
 from models.resume import ResumeModel
-from utils.auth import token_required, role_required
-from utils.file_handler import save_uploaded_file, extract_text, allowed_file
+from utils.auth import decode_token, token_required, role_required
+from utils.file_handler import (
+    save_uploaded_file,
+    read_zip_documents,
+    allowed_file,
+)
+from utils.extraction_cache import extract_text_cached, parse_cached
 
 match_bp = Blueprint("match", __name__, url_prefix="/api/match")
 
@@ -42,6 +49,7 @@ def init_match_routes(db):
         Blueprint: Configured match blueprint.
     """
     service = MatchService(db)
+    bulk_service = BulkMatchService(db)
     resume_model = ResumeModel(db)
     skill_gap_analyzer = SkillGapAnalyzer()
 
@@ -170,6 +178,67 @@ def init_match_routes(db):
         except Exception as e:
             return jsonify({"error": f"Failed to get matches: {str(e)}"}), 500
 
+    # ── GET /api/match/job/<job_id>/top ──────────────────────────────────
+    @match_bp.route("/job/<job_id>/top", methods=["GET"])
+    @token_required
+    @role_required("Recruiter", "Admin")
+    def top_candidates_for_job(job_id):
+        """
+        Get the top-K stored resumes for a job by semantic similarity,
+        served from the resume embedding index.
+
+        Query params:
+            k (int): Number of candidates, max 100 (default 10)
+
+        Response (200):
+            {
+                "job_id": "...",
+                "candidates": [
+                    {"rank": 1, "resume_id": "...", "filename": "...",
+                     "semantic_similarity": 82.4, ...},
+                    ...
+                ]
+            }
+        """
+        try:
+            k = request.args.get("k", 10, type=int)
+            response, status_code = service.top_candidates_for_job(job_id, k)
+            return jsonify(response), status_code
+
+        except Exception as e:
+            return jsonify({"error": f"Failed to get top candidates: {str(e)}"}), 500
+
+    # ── GET /api/match/resume/<resume_id>/jobs ───────────────────────────
+    @match_bp.route("/resume/<resume_id>/jobs", methods=["GET"])
+    @token_required
+    def top_jobs_for_resume(resume_id):
+        """
+        Get the top-K stored jobs for a resume by semantic similarity,
+        served from the job embedding index. Candidates may only query
+        their own resumes.
+
+        Query params:
+            k (int): Number of jobs, max 100 (default 10)
+
+        Response (200):
+            {
+                "resume_id": "...",
+                "jobs": [
+                    {"rank": 1, "job_id": "...", "title": "...",
+                     "semantic_similarity": 78.1, ...},
+                    ...
+                ]
+            }
+        """
+        try:
+            k = request.args.get("k", 10, type=int)
+            owner_id = g.user["user_id"] if g.user.get("role") == "Candidate" else None
+            response, status_code = service.top_jobs_for_resume(resume_id, k, owner_id)
+            return jsonify(response), status_code
+
+        except Exception as e:
+            return jsonify({"error": f"Failed to get top jobs: {str(e)}"}), 500
+
     # ── POST /api/match/skillgap ─────────────────────────────────────────
     @match_bp.route("/skillgap", methods=["POST"])
     @token_required
@@ -264,23 +333,23 @@ def init_match_routes(db):
 
             resume_file = request.files["resume"]
 
-            # Save and extract resume text
-            resume_path, resume_name = save_uploaded_file(resume_file)
+            # Save and extract resume text (cached by file hash)
+            resume_path, resume_name, resume_hash = save_uploaded_file(resume_file)
             if not resume_path:
                 return jsonify({"error": "Invalid resume file. Only PDF and DOCX allowed."}), 400
 
-            resume_text = extract_text(resume_path)
+            resume_text = extract_text_cached(resume_path, resume_hash)
             if not resume_text.strip():
                 return jsonify({"error": "Could not extract text from resume file."}), 400
 
             # JD: accept either file upload OR raw text
-            jd_text = ""
+            jd_text, jd_hash = "", None
             if "jd" in request.files and request.files["jd"].filename:
                 jd_file = request.files["jd"]
-                jd_path, jd_name = save_uploaded_file(jd_file)
+                jd_path, jd_name, jd_hash = save_uploaded_file(jd_file)
                 if not jd_path:
                     return jsonify({"error": "Invalid JD file. Only PDF and DOCX allowed."}), 400
-                jd_text = extract_text(jd_path)
+                jd_text = extract_text_cached(jd_path, jd_hash)
             elif request.form.get("jd_text", "").strip():
                 jd_text = request.form["jd_text"].strip()
             else:
@@ -293,11 +362,14 @@ def init_match_routes(db):
             resume_parser = ResumeParser()
             jd_parser = JDParser()
 
-            resume_parsed = resume_parser.parse(resume_text)
-            jd_parsed = jd_parser.parse(jd_text)
+            resume_parsed, _ = parse_cached(resume_parser, resume_hash, resume_text)
+            jd_parsed = (
+                parse_cached(jd_parser, jd_hash, jd_text)[0] if jd_hash
+                else jd_parser.parse(jd_text)
+            )
 
             # Run matching engine
-            engine = MatchingEngine()
+            engine = model_registry.get_matching_engine()
             match_result = engine.compute_match(
                 resume_text=resume_text,
                 job_text=jd_text,
@@ -349,6 +421,24 @@ def init_match_routes(db):
                 "jd"      - Job description file (PDF/DOCX)   [optional if jd_text given]
                 "jd_text" - Job description as plain text      [optional if jd given]
                 "resumes" - One or more resume files (PDF/DOCX/ZIP), may repeat
+                "async"   - "true" to run as a background job          [optional]
+                            (may also be passed as a query parameter;
+                            requires an Authorization bearer token, the
+                            job is only readable by its submitter)
+
+        Query params:
+            stream - "ndjson" or "sse" to stream each candidate as soon as
+                     it is scored (see BulkMatchService.stream_matches);
+                     a final "summary" frame carries ranks and the
+                     best-candidate recommendation.               [optional]
+
+        Response (202, async):
+            {
+                "message": "Bulk matching job accepted.",
+                "job_id": "...",
+                "status": "queued",
+                "status_url": "/api/match/bulk/<job_id>"
+            }
 
         Response (200):
             {
@@ -366,7 +456,7 @@ def init_match_routes(db):
                         "skill_gap": {...},
                         "recommendations": [...],
                         "ai_explanation": "Alice is the strongest match because...",
-                        "resume_parsed": {...},
+                        "resume_parsed": {...},   (not in async job results)
                         "jd_parsed": {...}
                     },
                     ...
@@ -382,14 +472,27 @@ def init_match_routes(db):
             }
         """
         try:
+            # ── Background jobs are stored: they need an owner ───────────
+            run_async = (
+                request.args.get("async", request.form.get("async", ""))
+                .strip().lower() in ("1", "true", "yes")
+            )
+            user = None
+            if run_async:
+                auth_header = request.headers.get("Authorization", "")
+                if auth_header.startswith("Bearer "):
+                    user = decode_token(auth_header.split(" ")[1])
+                if user is None:
+                    return jsonify({"error": "Authentication is required for background bulk jobs."}), 401
+
             # ── Parse JD ─────────────────────────────────────────────────
-            jd_text = ""
+            jd_text, jd_hash = "", None
             if "jd" in request.files and request.files["jd"].filename:
                 jd_file = request.files["jd"]
-                jd_path, _ = save_uploaded_file(jd_file)
+                jd_path, _, jd_hash = save_uploaded_file(jd_file)
                 if not jd_path:
                     return jsonify({"error": "Invalid JD file. Only PDF and DOCX allowed."}), 400
-                jd_text = extract_text(jd_path)
+                jd_text = extract_text_cached(jd_path, jd_hash)
             elif request.form.get("jd_text", "").strip():
                 jd_text = request.form["jd_text"].strip()
             else:
@@ -403,8 +506,7 @@ def init_match_routes(db):
             if not resume_files:
                 return jsonify({"error": "No resume files provided. Use 'resumes' field."}), 400
 
-            resume_entries = []   # list of (filepath, original_name)
-            temp_dirs = []        # temp dirs to clean up later
+            resume_entries = []   # list of (original_name, file_bytes)
             errors = []
 
             for f in resume_files:
@@ -413,38 +515,16 @@ def init_match_routes(db):
                 ext = f.filename.rsplit(".", 1)[-1].lower() if "." in f.filename else ""
 
                 if ext == "zip":
-                    # Extract ZIP and collect inner PDF/DOCX files
-                    tmp_dir = tempfile.mkdtemp(prefix="jdmatch_zip_")
-                    temp_dirs.append(tmp_dir)
-                    zip_path = os.path.join(tmp_dir, "upload.zip")
-                    f.save(zip_path)
-                    try:
-                        with zipfile.ZipFile(zip_path, "r") as zf:
-                            zf.extractall(tmp_dir)
-                        # Walk extracted directory for valid resume files
-                        for root, _dirs, files in os.walk(tmp_dir):
-                            for fname in files:
-                                if fname.startswith("__") or fname.startswith("."):
-                                    continue
-                                fext = fname.rsplit(".", 1)[-1].lower() if "." in fname else ""
-                                if fext in ("pdf", "docx"):
-                                    full = os.path.join(root, fname)
-                                    resume_entries.append((full, fname))
-                    except zipfile.BadZipFile:
-                        errors.append(f"'{f.filename}' is not a valid ZIP file.")
+                    # Stream PDF/DOCX members straight from the archive into memory
+                    documents, zip_errors = read_zip_documents(f.stream, f.filename)
+                    resume_entries.extend(documents)
+                    errors.extend(zip_errors)
                 elif ext in ("pdf", "docx"):
-                    saved_path, orig_name = save_uploaded_file(f)
-                    if saved_path:
-                        resume_entries.append((saved_path, orig_name))
-                    else:
-                        errors.append(f"Failed to save '{f.filename}'.")
+                    resume_entries.append((f.filename, f.read()))
                 else:
                     errors.append(f"'{f.filename}' is not a supported format (PDF, DOCX, or ZIP).")
 
             if not resume_entries:
-                # Cleanup
-                for d in temp_dirs:
-                    shutil.rmtree(d, ignore_errors=True)
                 return jsonify({
                     "error": "No valid resume files found.",
                     "details": errors,
@@ -452,237 +532,62 @@ def init_match_routes(db):
 
             # ── Parse JD once ────────────────────────────────────────────
             jd_parser = JDParser()
-            jd_parsed = jd_parser.parse(jd_text)
-
-            # ── Process each resume ──────────────────────────────────────
-            resume_parser = ResumeParser()
-            engine = MatchingEngine()
-            analyzer = SkillGapAnalyzer()
-
-            candidates = []
-            resume_texts_for_ai = []
-
-            for filepath, filename in resume_entries:
-                try:
-                    resume_text = extract_text(filepath)
-                    if not resume_text.strip():
-                        errors.append(f"Could not extract text from '{filename}'.")
-                        continue
-
-                    resume_parsed = resume_parser.parse(resume_text)
-                    match_result = engine.compute_match(
-                        resume_text=resume_text,
-                        job_text=jd_text,
-                        resume_skills=resume_parsed.get("skills", []),
-                        job_required_skills=jd_parsed.get("required_skills", []),
-                        job_preferred_skills=jd_parsed.get("preferred_skills", []),
-                        resume_experience=resume_parsed.get("experience", []),
-                        job_experience_level=jd_parsed.get("experience_level", ""),
-                        resume_education=resume_parsed.get("education", []),
-                        job_education_level=jd_parsed.get("education_level", ""),
-                    )
-
-                    skill_gap = analyzer.analyze(
-                        candidate_skills=resume_parsed.get("skills", []),
-                        required_skills=jd_parsed.get("required_skills", []),
-                        preferred_skills=jd_parsed.get("preferred_skills", []),
-                    )
-
-                    candidates.append({
-                        "file_name": filename,
-                        "overall_score": match_result["overall_score"],
-                        "skill_score": match_result["skill_score"],
-                        "experience_score": match_result["experience_score"],
-                        "education_score": match_result["education_score"],
-                        "tfidf_similarity": match_result["tfidf_similarity"],
-                        "matched_skills": match_result["matched_skills"],
-                        "missing_skills": match_result["missing_skills"],
-                        "skill_gap": skill_gap["skill_gap"],
-                        "recommendations": skill_gap["recommendations"],
-                        "resume_parsed": resume_parsed,
-                        "jd_parsed": jd_parsed,
-                    })
-                    resume_texts_for_ai.append(resume_text)
-
-                except Exception as e:
-                    errors.append(f"Error processing '{filename}': {str(e)}")
-
-            # Cleanup temp dirs
-            for d in temp_dirs:
-                shutil.rmtree(d, ignore_errors=True)
-
-            if not candidates:
-                return jsonify({
-                    "error": "No resumes could be processed successfully.",
-                    "details": errors,
-                }), 400
-
-            # ── Sort by overall_score descending ─────────────────────────
-            candidates.sort(key=lambda c: c["overall_score"], reverse=True)
-
-            # ── Generate AI Explanations ─────────────────────────────────
-            _generate_ai_explanations(candidates, jd_text, jd_parsed)
-
-            # Add rank numbers
-            for i, c in enumerate(candidates):
-                c["rank"] = i + 1
-
-            # ── Best candidate recommendation ────────────────────────────
-            best = candidates[0]
-            best_rec = _build_best_recommendation(best, candidates, jd_parsed)
+            jd_parsed = (
+                parse_cached(jd_parser, jd_hash, jd_text)[0] if jd_hash
+                else jd_parser.parse(jd_text)
+            )
 
-            return jsonify({
-                "candidates": candidates,
-                "best_candidate": {
-                    "file_name": best["file_name"],
-                    "overall_score": best["overall_score"],
-                    "ai_recommendation": best_rec,
-                },
-                "total_processed": len(candidates),
-                "total_errors": len(errors),
-                "errors": errors,
-            }), 200
+            # ── Score: stream, queue in the background or rank inline ────
+            stream_fmt = request.args.get("stream", "").strip().lower()
+            if stream_fmt:
+                if stream_fmt not in STREAM_FORMATS:
+                    return jsonify({"error": "Invalid stream format. Use 'ndjson' or 'sse'."}), 400
+                frames = bulk_service.stream_matches(
+                    jd_text, jd_parsed, resume_entries, errors, fmt=stream_fmt
+                )
+                return Response(
+                    stream_with_context(frames),
+                    mimetype=STREAM_FORMATS[stream_fmt],
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+                )
+
+            if run_async:
+                result, status = bulk_service.submit_job(
+                    user["user_id"], jd_text, jd_parsed, resume_entries, errors
+                )
+            else:
+                result, status = bulk_service.match_all(
+                    jd_text, jd_parsed, resume_entries, errors
+                )
+            return jsonify(result), status
 
         except Exception as e:
             return jsonify({"error": f"Bulk matching failed: {str(e)}"}), 500
 
-    return match_bp
-
+    # ── GET /api/match/bulk/<job_id> ─────────────────────────────────────
+    @match_bp.route("/bulk/<job_id>", methods=["GET"])
+    @token_required
+    def bulk_job_status(job_id):
+        """
+        Poll an asynchronous bulk matching job (submitter only).
 
-# ═══════════════════════════════════════════════════════════════════════
-# Helper functions for AI explanations (outside the blueprint factory)
-# ═══════════════════════════════════════════════════════════════════════
+        Query params:
+            page     (int): 1-based page of ranked candidates (default 1)
+            per_page (int): Candidates per page, max 100 (default 20)
 
-def _generate_ai_explanations(candidates, jd_text, jd_parsed):
-    """
-    Generate a personalised AI explanation for each candidate explaining
-    why they rank where they do relative to the JD.
-    """
-    required = jd_parsed.get("required_skills", [])
-    preferred = jd_parsed.get("preferred_skills", [])
-    exp_level = jd_parsed.get("experience_level", "")
-    edu_level = jd_parsed.get("education_level", "")
-
-    for c in candidates:
-        parts = []
-        score = c["overall_score"]
-        matched = c["matched_skills"]
-        missing = c["missing_skills"]
-        skill_sc = c["skill_score"]
-        exp_sc = c["experience_score"]
-        edu_sc = c["education_score"]
-
-        # ── Opening assessment ───────────────────────────────────────
-        if score >= 85:
-            parts.append(f"{c['file_name']} is an excellent fit for this role with a {score:.0f}% overall match.")
-        elif score >= 70:
-            parts.append(f"{c['file_name']} is a strong candidate with a {score:.0f}% match, showing good alignment with the job requirements.")
-        elif score >= 55:
-            parts.append(f"{c['file_name']} is a moderate match at {score:.0f}%, meeting some key requirements but with notable gaps.")
-        else:
-            parts.append(f"{c['file_name']} has a {score:.0f}% match and may need significant upskilling to meet the role's demands.")
-
-        # ── Skills analysis ──────────────────────────────────────────
-        if matched:
-            core_matched = [s for s in matched if s.lower() in [r.lower() for r in required]]
-            pref_matched = [s for s in matched if s.lower() in [p.lower() for p in preferred]]
-            if core_matched:
-                parts.append(f"They demonstrate proficiency in {len(core_matched)} core required skill(s): {', '.join(core_matched[:5])}.")
-            if pref_matched:
-                parts.append(f"Additionally, they bring {len(pref_matched)} preferred skill(s): {', '.join(pref_matched[:4])}.")
-            if not core_matched and not pref_matched and matched:
-                parts.append(f"They possess relevant skills ({', '.join(matched[:4])}) that align with the role.")
-
-        if missing:
-            critical_missing = [s for s in missing if s.lower() in [r.lower() for r in required]]
-            if critical_missing:
-                parts.append(f"However, they are missing {len(critical_missing)} critical required skill(s): {', '.join(critical_missing[:4])}.")
-            elif missing:
-                parts.append(f"They are missing some preferred skills: {', '.join(missing[:3])}.")
-
-        # ── Experience analysis ──────────────────────────────────────
-        if exp_sc >= 80:
-            if exp_level:
-                parts.append(f"Their experience level aligns well with the {exp_level} requirement (score: {exp_sc:.0f}%).")
-            else:
-                parts.append(f"They have strong relevant experience (score: {exp_sc:.0f}%).")
-        elif exp_sc >= 50:
-            parts.append(f"Their experience partially meets expectations (score: {exp_sc:.0f}%).")
-        else:
-            parts.append(f"Experience is a concern area with a score of {exp_sc:.0f}%.")
-
-        # ── Education analysis ───────────────────────────────────────
-        if edu_sc >= 80:
-            parts.append(f"Education requirements are well satisfied (score: {edu_sc:.0f}%).")
-        elif edu_sc >= 50:
-            parts.append(f"Education partially meets the requirement (score: {edu_sc:.0f}%).")
-
-        # ── Final verdict ────────────────────────────────────────────
-        strengths = []
-        if skill_sc >= 75:
-            strengths.append("technical skills")
-        if exp_sc >= 75:
-            strengths.append("experience")
-        if edu_sc >= 75:
-            strengths.append("education")
-        if strengths:
-            parts.append(f"Key strengths: {', '.join(strengths)}.")
-
-        c["ai_explanation"] = " ".join(parts)
-
-
-def _build_best_recommendation(best, all_candidates, jd_parsed):
-    """
-    Build a comprehensive AI recommendation for the top-ranked candidate.
-    """
-    parts = []
-    parts.append(
-        f"Based on comprehensive AI analysis of {len(all_candidates)} candidate(s), "
-        f"'{best['file_name']}' is the top recommendation with a {best['overall_score']:.0f}% overall match."
-    )
-
-    if best["matched_skills"]:
-        parts.append(
-            f"This candidate demonstrates the strongest alignment with the required skill set, "
-            f"matching {len(best['matched_skills'])} skill(s) including "
-            f"{', '.join(best['matched_skills'][:5])}."
-        )
-
-    if len(all_candidates) > 1:
-        second = all_candidates[1]
-        gap = best["overall_score"] - second["overall_score"]
-        if gap > 10:
-            parts.append(
-                f"They lead the next closest candidate ('{second['file_name']}') by {gap:.0f} percentage points, "
-                f"indicating a clear advantage."
-            )
-        elif gap > 0:
-            parts.append(
-                f"The margin over the runner-up ('{second['file_name']}' at {second['overall_score']:.0f}%) "
-                f"is narrow ({gap:.0f} pts), so both are worth considering."
-            )
-        else:
-            parts.append(
-                f"'{second['file_name']}' scored equally and is also worth strong consideration."
+        Returns progress ("processed" / "total"), the job status, and one
+        page of candidates ranked so far. Partial results are available
+        while the job is still running; "best_candidate" is set once it
+        has completed.
+        """
+        try:
+            page = request.args.get("page", 1, type=int)
+            per_page = request.args.get("per_page", 20, type=int)
+            result, status = bulk_service.get_job_status(
+                job_id, g.user["user_id"], page, per_page
             )
+            return jsonify(result), status
+        except Exception as e:
+            return jsonify({"error": f"Failed to fetch bulk job: {str(e)}"}), 500
 
-    if best["missing_skills"]:
-        parts.append(
-            f"Note: Even the top candidate is missing {len(best['missing_skills'])} skill(s) "
-            f"({', '.join(best['missing_skills'][:3])}). "
-            f"Consider evaluating trainability during the interview."
-        )
-    else:
-        parts.append("This candidate meets all identified skill requirements — a rare and ideal match.")
-
-    # Hiring readiness
-    if best["overall_score"] >= 85:
-        parts.append("Recommendation: Proceed directly to interview.")
-    elif best["overall_score"] >= 70:
-        parts.append("Recommendation: Strong shortlist candidate. Schedule a technical screening.")
-    elif best["overall_score"] >= 55:
-        parts.append("Recommendation: Potential fit with development. Conduct a skills assessment first.")
-    else:
-        parts.append("Recommendation: Consider broadening the candidate pool for a better match.")
-
-    return " ".join(parts)
+    return match_bp
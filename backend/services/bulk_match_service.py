@@ -0,0 +1,559 @@
+"""
+services/bulk_match_service.py - Bulk Matching Business Logic
+----------------------------------------------------------------
+Ranks many resumes against a single job description:
+  1. Extract resume text in parallel (process pool).
+  2. Parse each resume with NLP.
+     (steps 1-2 are skipped for files seen before, e.g. the same ZIP
+     re-run against another JD, see utils/extraction_cache.py)
+  3. Score resumes in batches via MatchingEngine.compute_matches_batch.
+  4. Analyze skill gaps and write a personalised AI explanation per candidate.
+  5. Recommend the best candidate.
+
+Three execution modes:
+  - Synchronous  : match_all() returns the full ranked result.
+  - Streaming    : stream_matches() emits each candidate as NDJSON or
+                   Server-Sent Events as soon as it is scored, followed by
+                   a summary frame with the final ranking.
+  - Asynchronous : submit_job() queues the work on a local background
+                   thread pool (no external broker) and returns a job id;
+                   scored chunks are persisted as they finish, so
+                   get_job_status() can report progress and paginate
+                   partial, ranked results while the job is running.
+                   Jobs are leased by the process that runs them; jobs
+                   left unfinished by a stopped process are marked
+                   failed when the service starts.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bson import ObjectId
+
+from config import Config
+from models.bulk_job import BulkJobModel
+from ml import model_registry
+from ml.resume_parser import ResumeParser
+from ml.skill_gap_analyzer import SkillGapAnalyzer
+from ml.skill_taxonomy import get_taxonomy
+from utils.extraction_cache import extract_texts_cached, parse_cached
+
+# Shared background executor for asynchronous bulk jobs
+_executor = None
+_executor_lock = threading.Lock()
+_heartbeat = None
+
+
+def _get_executor():
+    """Return the background job executor, creating it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.BULK_JOB_WORKERS,
+                thread_name_prefix="bulk-match",
+            )
+        return _executor
+
+
+def _start_heartbeat(bulk_job_model, owner):
+    """Start the thread renewing this process's job leases (once per process)."""
+    global _heartbeat
+    with _executor_lock:
+        if _heartbeat is not None:
+            return
+
+        def renew():
+            while True:
+                time.sleep(max(Config.BULK_JOB_LEASE_SECONDS / 3, 1))
+                try:
+                    bulk_job_model.heartbeat(owner)
+                except Exception as e:
+                    print(f"[Bulk Match] Lease heartbeat failed: {e}")
+
+        _heartbeat = threading.Thread(target=renew, name="bulk-match-lease", daemon=True)
+        _heartbeat.start()
+
+
+class BulkMatchService:
+    """Business logic for ranking many resumes against one job description."""
+
+    # Resumes scored per batch: large enough for efficient batched
+    # inference, small enough to report progress frequently.
+    CHUNK_SIZE = 32
+
+    def __init__(self, db):
+        self.bulk_job_model = BulkJobModel(db, ttl_seconds=Config.BULK_JOB_TTL)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        orphaned = self.bulk_job_model.fail_orphaned(Config.BULK_JOB_LEASE_SECONDS)
+        if orphaned:
+            print(f"[Bulk Match] Marked {orphaned} interrupted bulk job(s) as failed.")
+        self.resume_parser = ResumeParser()
+        self.analyzer = SkillGapAnalyzer()
+
+    # ── Scoring Pipeline ─────────────────────────────────────────────────
+    def iter_scored_chunks(self, jd_text, jd_parsed, resume_entries):
+        """
+        Score resumes chunk by chunk, yielding results as they finish.
+
+        Args:
+            jd_text (str): Raw JD text.
+            jd_parsed (dict): JDParser output.
+            resume_entries (list[tuple]): (filename, file_bytes) per resume.
+
+        Yields:
+            tuple: (candidates, errors, processed) for each chunk, where
+                   candidates are unranked result dicts with explanations.
+        """
+        engine = model_registry.get_matching_engine()
+
+        for start in range(0, len(resume_entries), self.CHUNK_SIZE):
+            chunk = resume_entries[start:start + self.CHUNK_SIZE]
+            errors = []
+
+            # Text extraction is CPU-bound: fan it out over worker processes
+            # (files already extracted before are served from the cache)
+            extracted = extract_texts_cached(chunk)
+
+            parsed_resumes = []   # list of (filename, text, parsed)
+            for (filename, _), (resume_text, extract_error, file_hash) in zip(chunk, extracted):
+                try:
+                    if extract_error:
+                        errors.append(extract_error)
+                        continue
+                    if not resume_text.strip():
+                        errors.append(f"Could not extract text from '{filename}'.")
+                        continue
+                    resume_parsed, _ = parse_cached(self.resume_parser, file_hash, resume_text)
+                    parsed_resumes.append((filename, resume_text, resume_parsed))
+                except Exception as e:
+                    errors.append(f"Error processing '{filename}': {str(e)}")
+
+            # Score the whole chunk in one batched pass
+            match_results = engine.compute_matches_batch(
+                {"text": jd_text, "parsed": jd_parsed},
+                [{"text": text, "parsed": parsed} for _, text, parsed in parsed_resumes],
+            )
+
+            candidates = []
+            for (filename, _, resume_parsed), match_result in zip(parsed_resumes, match_results):
+                skill_gap = self.analyzer.analyze(
+                    candidate_skills=resume_parsed.get("skills", []),
+                    required_skills=jd_parsed.get("required_skills", []),
+                    preferred_skills=jd_parsed.get("preferred_skills", []),
+                )
+
+                candidates.append({
+                    "file_name": filename,
+                    "overall_score": match_result["overall_score"],
+                    "skill_score": match_result["skill_score"],
+                    "experience_score": match_result["experience_score"],
+                    "education_score": match_result["education_score"],
+                    "tfidf_similarity": match_result["tfidf_similarity"],
+                    "matched_skills": match_result["matched_skills"],
+                    "missing_skills": match_result["missing_skills"],
+                    "skill_gap": skill_gap["skill_gap"],
+                    "recommendations": skill_gap["recommendations"],
+                    "resume_parsed": resume_parsed,
+                })
+
+            # Explanations only depend on each candidate and the JD
+            _generate_ai_explanations(candidates, jd_text, jd_parsed)
+
+            yield candidates, errors, len(chunk)
+
+    # ── Synchronous Mode ─────────────────────────────────────────────────
+    def match_all(self, jd_text, jd_parsed, resume_entries, errors):
+        """
+        Score and rank every resume within the current request.
+
+        Args:
+            jd_text (str): Raw JD text.
+            jd_parsed (dict): JDParser output.
+            resume_entries (list[tuple]): (filename, file_bytes) per resume.
+            errors (list[str]): Errors collected while reading the upload.
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        errors = list(errors)
+        candidates = []
+        for chunk_candidates, chunk_errors, _ in self.iter_scored_chunks(
+            jd_text, jd_parsed, resume_entries
+        ):
+            candidates.extend(chunk_candidates)
+            errors.extend(chunk_errors)
+
+        if not candidates:
+            return {
+                "error": "No resumes could be processed successfully.",
+                "details": errors,
+            }, 400
+
+        # ── Sort by overall_score descending & add rank numbers ──────
+        candidates.sort(key=lambda c: c["overall_score"], reverse=True)
+        for i, c in enumerate(candidates):
+            c["rank"] = i + 1
+            c["jd_parsed"] = jd_parsed
+
+        # ── Best candidate recommendation ────────────────────────────
+        best = candidates[0]
+        runner_up = candidates[1] if len(candidates) > 1 else None
+        best_rec = _build_best_recommendation(best, runner_up, len(candidates))
+
+        return {
+            "candidates": candidates,
+            "best_candidate": {
+                "file_name": best["file_name"],
+                "overall_score": best["overall_score"],
+                "ai_recommendation": best_rec,
+            },
+            "total_processed": len(candidates),
+            "total_errors": len(errors),
+            "errors": errors,
+        }, 200
+
+    # ── Streaming Mode ───────────────────────────────────────────────────
+    def stream_matches(self, jd_text, jd_parsed, resume_entries, errors, fmt="ndjson"):
+        """
+        Score resumes and yield each candidate as soon as it is scored.
+
+        Only a light (index, file name, score) summary per candidate and the
+        two best full candidates are kept in memory, so server memory stays
+        flat regardless of the number of resumes.
+
+        Frames, in order:
+            start     : {"type": "start", "total": int, "jd_parsed": dict}
+            candidate : {"type": "candidate", "candidate": {..., "index": int}}
+            summary   : {"type": "summary", "ranking": [...],
+                         "best_candidate": {...}, "total_processed": int,
+                         "total_errors": int, "errors": [...]}
+
+        Args:
+            jd_text (str): Raw JD text.
+            jd_parsed (dict): JDParser output.
+            resume_entries (list[tuple]): (filename, file_bytes) per resume.
+            errors (list[str]): Errors collected while reading the upload.
+            fmt (str): "ndjson" (one JSON object per line) or "sse"
+                       (Server-Sent Events, frame type as the event name).
+
+        Yields:
+            str: Encoded frames.
+        """
+        errors = list(errors)
+        summaries = []   # (index, file_name, overall_score) per candidate
+        top = []         # two best full candidates, best first
+
+        yield _encode_frame(fmt, "start", {
+            "total": len(resume_entries),
+            "jd_parsed": jd_parsed,
+        })
+
+        try:
+            for chunk_candidates, chunk_errors, _ in self.iter_scored_chunks(
+                jd_text, jd_parsed, resume_entries
+            ):
+                errors.extend(chunk_errors)
+                for c in chunk_candidates:
+                    c["index"] = len(summaries)
+                    summaries.append((c["index"], c["file_name"], c["overall_score"]))
+                    top = sorted(top + [c], key=lambda t: t["overall_score"], reverse=True)[:2]
+                    yield _encode_frame(fmt, "candidate", {"candidate": c})
+        except Exception as e:
+            errors.append(f"Bulk matching failed: {str(e)}")
+
+        # ── Final ranking & best candidate recommendation ────────────
+        summaries.sort(key=lambda t: t[2], reverse=True)
+        ranking = [
+            {"rank": i + 1, "index": index, "file_name": name, "overall_score": score}
+            for i, (index, name, score) in enumerate(summaries)
+        ]
+
+        best_candidate = None
+        if top:
+            best = top[0]
+            runner_up = top[1] if len(top) > 1 else None
+            best_candidate = {
+                "file_name": best["file_name"],
+                "overall_score": best["overall_score"],
+                "ai_recommendation": _build_best_recommendation(
+                    best, runner_up, len(summaries)
+                ),
+            }
+
+        yield _encode_frame(fmt, "summary", {
+            "ranking": ranking,
+            "best_candidate": best_candidate,
+            "total_processed": len(summaries),
+            "total_errors": len(errors),
+            "errors": errors,
+        })
+
+    # ── Asynchronous Mode ────────────────────────────────────────────────
+    def submit_job(self, user_id, jd_text, jd_parsed, resume_entries, errors):
+        """
+        Queue a bulk matching job on the background executor.
+
+        Args:
+            user_id (str): Submitting user; only they can read the job.
+
+        Returns:
+            tuple: (response_dict, http_status_code) with the new job id.
+        """
+        _start_heartbeat(self.bulk_job_model, self.owner)
+        job_id = self.bulk_job_model.create_job(
+            user_id, self.owner, total=len(resume_entries), jd_parsed=jd_parsed, errors=errors
+        )
+        _get_executor().submit(
+            self._run_job, job_id, jd_text, jd_parsed, resume_entries
+        )
+        return {
+            "message": "Bulk matching job accepted.",
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/api/match/bulk/{job_id}",
+        }, 202
+
+    def _run_job(self, job_id, jd_text, jd_parsed, resume_entries):
+        """Background worker: score chunks, persist them, then finalize."""
+        try:
+            for candidates, errors, processed in self.iter_scored_chunks(
+                jd_text, jd_parsed, resume_entries
+            ):
+                self.bulk_job_model.add_candidates(job_id, candidates, processed, errors)
+
+            top = self.bulk_job_model.find_candidates(job_id, skip=0, limit=2)
+            best_candidate = None
+            if top:
+                best = top[0]
+                runner_up = top[1] if len(top) > 1 else None
+                best_candidate = {
+                    "file_name": best["file_name"],
+                    "overall_score": best["overall_score"],
+                    "ai_recommendation": _build_best_recommendation(
+                        best, runner_up, self.bulk_job_model.count_candidates(job_id)
+                    ),
+                }
+            self.bulk_job_model.mark_completed(job_id, best_candidate)
+        except Exception as e:
+            print(f"[Bulk Match] Job {job_id} failed: {e}")
+            self.bulk_job_model.mark_failed(job_id, f"Bulk matching failed: {str(e)}")
+
+    def get_job_status(self, job_id, user_id, page=1, per_page=20):
+        """
+        Report progress and one page of ranked (possibly partial) results.
+
+        Args:
+            job_id (str): Bulk job ID.
+            user_id (str): Requesting user; other users' jobs are not found.
+            page (int): 1-based page number.
+            per_page (int): Candidates per page (capped at 100).
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        if not ObjectId.is_valid(job_id):
+            return {"error": "Bulk job not found."}, 404
+        job = self.bulk_job_model.find_by_id(job_id, user_id=user_id)
+        if not job:
+            return {"error": "Bulk job not found."}, 404
+
+        page = max(page, 1)
+        per_page = min(max(per_page, 1), 100)
+        skip = (page - 1) * per_page
+
+        candidates = self.bulk_job_model.find_candidates(job_id, skip=skip, limit=per_page)
+        for i, c in enumerate(candidates):
+            c.pop("_id", None)
+            c["rank"] = skip + i + 1
+            c["jd_parsed"] = job["jd_parsed"]
+
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "progress": {
+                "processed": job["processed"],
+                "total": job["total"],
+            },
+            "candidates": candidates,
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "total_candidates": self.bulk_job_model.count_candidates(job_id),
+            },
+            "best_candidate": job.get("best_candidate"),
+            "total_errors": len(job.get("errors", [])),
+            "errors": job.get("errors", []),
+            "created_at": job["created_at"].isoformat(),
+            "completed_at": (
+                job["completed_at"].isoformat() if job.get("completed_at") else None
+            ),
+        }, 200
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Streaming frame encoding
+# ═══════════════════════════════════════════════════════════════════════
+
+STREAM_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode_frame(fmt, frame_type, payload):
+    """Encode one streaming frame as an NDJSON line or an SSE event."""
+    data = json.dumps({"type": frame_type, **payload}, default=str)
+    if fmt == "sse":
+        return f"event: {frame_type}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Helper functions for AI explanations
+# ═══════════════════════════════════════════════════════════════════════
+
+def _generate_ai_explanations(candidates, jd_text, jd_parsed):
+    """
+    Generate a personalised AI explanation for each candidate explaining
+    why they rank where they do relative to the JD.
+    """
+    # Canonical skill sets built once per JD, not per candidate skill
+    taxonomy = get_taxonomy()
+    required = {taxonomy.canonical(s) for s in jd_parsed.get("required_skills", [])}
+    preferred = {taxonomy.canonical(s) for s in jd_parsed.get("preferred_skills", [])}
+    exp_level = jd_parsed.get("experience_level", "")
+    edu_level = jd_parsed.get("education_level", "")
+
+    for c in candidates:
+        parts = []
+        score = c["overall_score"]
+        matched = c["matched_skills"]
+        missing = c["missing_skills"]
+        skill_sc = c["skill_score"]
+        exp_sc = c["experience_score"]
+        edu_sc = c["education_score"]
+
+        # ── Opening assessment ───────────────────────────────────────
+        if score >= 85:
+            parts.append(f"{c['file_name']} is an excellent fit for this role with a {score:.0f}% overall match.")
+        elif score >= 70:
+            parts.append(f"{c['file_name']} is a strong candidate with a {score:.0f}% match, showing good alignment with the job requirements.")
+        elif score >= 55:
+            parts.append(f"{c['file_name']} is a moderate match at {score:.0f}%, meeting some key requirements but with notable gaps.")
+        else:
+            parts.append(f"{c['file_name']} has a {score:.0f}% match and may need significant upskilling to meet the role's demands.")
+
+        # ── Skills analysis ──────────────────────────────────────────
+        if matched:
+            core_matched = [s for s in matched if s in required]
+            pref_matched = [s for s in matched if s in preferred]
+            if core_matched:
+                parts.append(f"They demonstrate proficiency in {len(core_matched)} core required skill(s): {', '.join(core_matched[:5])}.")
+            if pref_matched:
+                parts.append(f"Additionally, they bring {len(pref_matched)} preferred skill(s): {', '.join(pref_matched[:4])}.")
+            if not core_matched and not pref_matched and matched:
+                parts.append(f"They possess relevant skills ({', '.join(matched[:4])}) that align with the role.")
+
+        if missing:
+            critical_missing = [s for s in missing if s in required]
+            if critical_missing:
+                parts.append(f"However, they are missing {len(critical_missing)} critical required skill(s): {', '.join(critical_missing[:4])}.")
+            elif missing:
+                parts.append(f"They are missing some preferred skills: {', '.join(missing[:3])}.")
+
+        # ── Experience analysis ──────────────────────────────────────
+        if exp_sc >= 80:
+            if exp_level:
+                parts.append(f"Their experience level aligns well with the {exp_level} requirement (score: {exp_sc:.0f}%).")
+            else:
+                parts.append(f"They have strong relevant experience (score: {exp_sc:.0f}%).")
+        elif exp_sc >= 50:
+            parts.append(f"Their experience partially meets expectations (score: {exp_sc:.0f}%).")
+        else:
+            parts.append(f"Experience is a concern area with a score of {exp_sc:.0f}%.")
+
+        # ── Education analysis ───────────────────────────────────────
+        if edu_sc >= 80:
+            parts.append(f"Education requirements are well satisfied (score: {edu_sc:.0f}%).")
+        elif edu_sc >= 50:
+            parts.append(f"Education partially meets the requirement (score: {edu_sc:.0f}%).")
+
+        # ── Final verdict ────────────────────────────────────────────
+        strengths = []
+        if skill_sc >= 75:
+            strengths.append("technical skills")
+        if exp_sc >= 75:
+            strengths.append("experience")
+        if edu_sc >= 75:
+            strengths.append("education")
+        if strengths:
+            parts.append(f"Key strengths: {', '.join(strengths)}.")
+
+        c["ai_explanation"] = " ".join(parts)
+
+
+def _build_best_recommendation(best, runner_up, total_candidates):
+    """
+    Build a comprehensive AI recommendation for the top-ranked candidate.
+
+    Args:
+        best (dict): Top-ranked candidate.
+        runner_up (dict): Second-ranked candidate, or None.
+        total_candidates (int): Number of candidates ranked.
+    """
+    parts = []
+    parts.append(
+        f"Based on comprehensive AI analysis of {total_candidates} candidate(s), "
+        f"'{best['file_name']}' is the top recommendation with a {best['overall_score']:.0f}% overall match."
+    )
+
+    if best["matched_skills"]:
+        parts.append(
+            f"This candidate demonstrates the strongest alignment with the required skill set, "
+            f"matching {len(best['matched_skills'])} skill(s) including "
+            f"{', '.join(best['matched_skills'][:5])}."
+        )
+
+    if runner_up is not None:
+        second = runner_up
+        gap = best["overall_score"] - second["overall_score"]
+        if gap > 10:
+            parts.append(
+                f"They lead the next closest candidate ('{second['file_name']}') by {gap:.0f} percentage points, "
+                f"indicating a clear advantage."
+            )
+        elif gap > 0:
+            parts.append(
+                f"The margin over the runner-up ('{second['file_name']}' at {second['overall_score']:.0f}%) "
+                f"is narrow ({gap:.0f} pts), so both are worth considering."
+            )
+        else:
+            parts.append(
+                f"'{second['file_name']}' scored equally and is also worth strong consideration."
+            )
+
+    if best["missing_skills"]:
+        parts.append(
+            f"Note: Even the top candidate is missing {len(best['missing_skills'])} skill(s) "
+            f"({', '.join(best['missing_skills'][:3])}). "
+            f"Consider evaluating trainability during the interview."
+        )
+    else:
+        parts.append("This candidate meets all identified skill requirements — a rare and ideal match.")
+
+    # Hiring readiness
+    if best["overall_score"] >= 85:
+        parts.append("Recommendation: Proceed directly to interview.")
+    elif best["overall_score"] >= 70:
+        parts.append("Recommendation: Strong shortlist candidate. Schedule a technical screening.")
+    elif best["overall_score"] >= 55:
+        parts.append("Recommendation: Potential fit with development. Conduct a skills assessment first.")
+    else:
+        parts.append("Recommendation: Consider broadening the candidate pool for a better match.")
+
+    return " ".join(parts)
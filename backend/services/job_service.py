@@ -5,13 +5,19 @@ Orchestrates:
   - Accepting raw JD text from the frontend
   - Running NLP extraction (skills, experience level, etc.)
   - Storing structured JD data in MongoDB
+  - Precomputing matching features (tokens, embedding)
+  - Keeping the job embedding index in sync for top-K search
   - CRUD operations for job descriptions
 """
 
 from models.job import JobModel
+from models.resume import ResumeModel
 from ml.jd_parser import JDParser
+from ml import model_registry
+from ml.document_features import compute_document_features, index_document
 from utils.validators import validate_required_fields, sanitize_string
-from utils.file_handler import save_uploaded_file, extract_text
+from utils.file_handler import save_uploaded_file
+from utils.extraction_cache import extract_text_cached, forget, parse_cached
 
 
 class JobService:
@@ -19,6 +25,7 @@ class JobService:
 
     def __init__(self, db):
         self.job_model = JobModel(db)
+        self.resume_model = ResumeModel(db)
         self.jd_parser = JDParser()
 
     # ── Create ───────────────────────────────────────────────────────────
@@ -29,7 +36,8 @@ class JobService:
         Steps:
         1. Validate required fields (title, company, description).
         2. Run NLP parser on the description text.
-        3. Store structured result in MongoDB.
+        3. Precompute matching features (also refreshes corpus IDF).
+        4. Store structured result in MongoDB.
 
         Args:
             user_id (str): Recruiter's user ID.
@@ -48,8 +56,12 @@ class JobService:
         description = sanitize_string(data["description"])
 
         # Run NLP extraction on the job description text
+        parse_version = self.jd_parser.version()
         parsed_data = self.jd_parser.parse(description)
 
+        # Compute features once so matching can skip NLP inference
+        features = compute_document_features(description, add_to_corpus=True)
+
         # Persist to database
         job_id = self.job_model.create_job(
             user_id=user_id,
@@ -57,7 +69,10 @@ class JobService:
             company=company,
             description=description,
             parsed_data=parsed_data,
+            features=features,
+            parse_version=parse_version,
         )
+        index_document(model_registry.get_job_index(), job_id, features)
 
         return {
             "message": "Job description created successfully.",
@@ -79,15 +94,15 @@ class JobService:
         Returns:
             tuple: (response_dict, http_status_code).
         """
-        # Save file securely
-        filepath, original_filename = save_uploaded_file(file_storage)
+        # Save file securely (hashing it on the way)
+        filepath, original_filename, file_hash = save_uploaded_file(file_storage)
         if not filepath:
             return {
                 "error": "Invalid file. Only PDF and DOCX files up to 5 MB are allowed."
             }, 400
 
-        # Extract text from the uploaded document
-        raw_text = extract_text(filepath)
+        # Extract text from the uploaded document (cached by file hash)
+        raw_text = extract_text_cached(filepath, file_hash)
         if not raw_text.strip():
             return {
                 "error": "Could not extract text from the uploaded file. "
@@ -98,7 +113,10 @@ class JobService:
         company = sanitize_string(company) if company else ""
 
         # Run NLP extraction on the job description text
-        parsed_data = self.jd_parser.parse(raw_text)
+        parsed_data, parse_version = parse_cached(self.jd_parser, file_hash, raw_text)
+
+        # Compute features once so matching can skip NLP inference
+        features = compute_document_features(raw_text, add_to_corpus=True)
 
         # Persist to database
         job_id = self.job_model.create_job(
@@ -107,7 +125,11 @@ class JobService:
             company=company,
             description=raw_text,
             parsed_data=parsed_data,
+            features=features,
+            parse_version=parse_version,
+            file_hash=file_hash,
         )
+        index_document(model_registry.get_job_index(), job_id, features)
 
         return {
             "message": "Job description uploaded and parsed successfully.",
@@ -174,4 +196,13 @@ class JobService:
             return {"error": "Access denied."}, 403
 
         self.job_model.delete_job(job_id)
+        model_registry.get_job_index().remove(job_id)
+
+        # Drop the file's cached text once no stored document uses it
+        file_hash = job.get("file_hash")
+        if file_hash and not (
+            self.job_model.count_jobs({"file_hash": file_hash})
+            or self.resume_model.count_resumes({"file_hash": file_hash})
+        ):
+            forget(file_hash)
         return {"message": "Job description deleted successfully."}, 200
@@ -8,12 +8,21 @@ Orchestrates the full resume ↔ job description matching pipeline:
   4. Invoke skill-gap analyzer.
   5. Persist match result.
   6. Return explainable scores and recommendations.
+
+Also answers top-K "best candidates for a job" / "best jobs for a resume"
+queries from the embedding indexes, without running pairwise matches.
 """
 
 from models.resume import ResumeModel
 from models.job import JobModel
 from models.match import MatchModel
-from ml.matching_engine import MatchingEngine
+from ml import model_registry
+from ml.document_features import (
+    compute_document_features,
+    features_are_current,
+    get_embedding,
+    index_document,
+)
 from ml.skill_gap_analyzer import SkillGapAnalyzer
 
 
@@ -24,9 +33,13 @@ class MatchService:
         self.resume_model = ResumeModel(db)
         self.job_model = JobModel(db)
         self.match_model = MatchModel(db)
-        self.matching_engine = MatchingEngine()
         self.skill_gap_analyzer = SkillGapAnalyzer()
 
+    @property
+    def matching_engine(self):
+        """Shared MatchingEngine (re-fetched so registry reloads take effect)."""
+        return model_registry.get_matching_engine()
+
     # ── Core Matching ────────────────────────────────────────────────────
     def match_resume_to_job(self, user_id, data):
         """
@@ -64,10 +77,22 @@ class MatchService:
         resume_parsed = resume.get("parsed_data", {})
         job_parsed = job.get("parsed_data", {})
 
+        # Documents stored before features existed are backfilled once
+        resume_features = self._ensure_features(
+            self.resume_model, resume, resume.get("raw_text", ""),
+            model_registry.get_resume_index(),
+        )
+        job_features = self._ensure_features(
+            self.job_model, job, job.get("description", ""),
+            model_registry.get_job_index(),
+        )
+
         # ── Step 2 & 3: Run matching engine ──────────────────────────────
         match_result = self.matching_engine.compute_match(
             resume_text=resume.get("raw_text", ""),
             job_text=job.get("description", ""),
+            resume_features=resume_features,
+            job_features=job_features,
             resume_skills=resume_parsed.get("skills", []),
             job_required_skills=job_parsed.get("required_skills", []),
             job_preferred_skills=job_parsed.get("preferred_skills", []),
@@ -193,3 +218,129 @@ class MatchService:
                 "created_at": m["created_at"].isoformat(),
             })
         return {"matches": result}, 200
+
+    # ── Nearest-neighbour Search ─────────────────────────────────────────
+    def top_candidates_for_job(self, job_id, k=10):
+        """
+        Return the k stored resumes semantically closest to a job.
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        job = self.job_model.find_by_id(job_id)
+        if not job:
+            return {"error": "Job description not found."}, 404
+
+        hits, error = self._search_index(
+            model_registry.get_resume_index(),
+            self._ensure_features(
+                self.job_model, job, job.get("description", ""),
+                model_registry.get_job_index(),
+            ),
+            k,
+        )
+        if error:
+            return error
+
+        resumes = {
+            str(r["_id"]): r
+            for r in self.resume_model.find_by_ids(
+                [doc_id for doc_id, _ in hits],
+                {"user_id": 1, "filename": 1, "parsed_data.skills": 1, "uploaded_at": 1},
+            )
+        }
+        candidates = []
+        for doc_id, score in hits:
+            r = resumes.get(doc_id)
+            if not r:
+                continue   # deleted since it was indexed
+            candidates.append({
+                "rank": len(candidates) + 1,
+                "resume_id": doc_id,
+                "user_id": r["user_id"],
+                "filename": r["filename"],
+                "skills": r.get("parsed_data", {}).get("skills", []),
+                "semantic_similarity": round(score * 100, 2),
+                "uploaded_at": r["uploaded_at"].isoformat(),
+            })
+        return {"job_id": job_id, "candidates": candidates}, 200
+
+    def top_jobs_for_resume(self, resume_id, k=10, user_id=None):
+        """
+        Return the k stored jobs semantically closest to a resume.
+        Optionally verify resume ownership.
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        resume = self.resume_model.find_by_id(resume_id)
+        if not resume:
+            return {"error": "Resume not found."}, 404
+        if user_id and resume["user_id"] != user_id:
+            return {"error": "Access denied."}, 403
+
+        hits, error = self._search_index(
+            model_registry.get_job_index(),
+            self._ensure_features(
+                self.resume_model, resume, resume.get("raw_text", ""),
+                model_registry.get_resume_index(),
+            ),
+            k,
+        )
+        if error:
+            return error
+
+        jobs = {
+            str(j["_id"]): j
+            for j in self.job_model.find_by_ids(
+                [doc_id for doc_id, _ in hits],
+                {"title": 1, "company": 1, "parsed_data.required_skills": 1, "created_at": 1},
+            )
+        }
+        results = []
+        for doc_id, score in hits:
+            j = jobs.get(doc_id)
+            if not j:
+                continue   # deleted since it was indexed
+            results.append({
+                "rank": len(results) + 1,
+                "job_id": doc_id,
+                "title": j["title"],
+                "company": j.get("company", ""),
+                "required_skills": j.get("parsed_data", {}).get("required_skills", []),
+                "semantic_similarity": round(score * 100, 2),
+                "created_at": j["created_at"].isoformat(),
+            })
+        return {"resume_id": resume_id, "jobs": results}, 200
+
+    # ── Internal Helpers ─────────────────────────────────────────────────
+    @staticmethod
+    def _ensure_features(model, doc, text, own_index=None):
+        """
+        Return a document's stored features, recomputing and saving them if
+        absent or stale (e.g. embedded by a previous embedding model), so a
+        query works before the re-parse migration has reached the document.
+        The refreshed embedding is also pushed into the document's own index
+        when one is given.
+        """
+        features = doc.get("features")
+        if not features_are_current(features) and text.strip():
+            features = compute_document_features(text)
+            model.update_features(str(doc["_id"]), features)
+            if own_index is not None:
+                index_document(own_index, str(doc["_id"]), features)
+        return features
+
+    @staticmethod
+    def _search_index(index, features, k):
+        """
+        Query an embedding index with a document's stored embedding.
+
+        Returns:
+            tuple: (hits, None) on success, or (None, (error_dict, status)).
+        """
+        embedding = get_embedding(features, index.model_id)
+        if embedding is None:
+            return None, ({"error": "Semantic search is unavailable for this document."}, 503)
+        k = min(max(k, 1), 100)
+        return index.search(embedding, k), None
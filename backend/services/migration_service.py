@@ -0,0 +1,359 @@
+"""
+services/migration_service.py - Background Re-parse Migrator
+---------------------------------------------------------------
+Brings stored resumes and jobs up to date after a parser, skill taxonomy,
+preprocessing or embedding-model change, without blocking the online API:
+
+  1. A document is stale when its parse_version differs from the running
+     parser / taxonomy versions, or its stored features were computed by
+     another preprocessing version or embedding model.
+  2. Stale documents are scanned in _id order, in batches: each batch is
+     re-parsed, stale features are recomputed in one batched pass, and the
+     results are written back (guarded against concurrent edits) and pushed
+     into the embedding indexes.
+  3. After every batch the scan position is checkpointed in the
+     `migrations` collection, so a paused or interrupted run resumes where
+     it stopped.
+  4. Throughput is capped (Config.REPARSE_MAX_DOCS_PER_SECOND) and the run
+     executes on a single daemon thread, leaving CPU for online requests.
+
+At most one run per kind is unfinished at a time (created atomically), and
+a process must claim its lease to run it; a running run is only taken over
+once its heartbeat is older than the lease.
+
+With Config.REPARSE_ON_STARTUP, every process checks for stale documents
+at startup (e.g. after an embedding model change) and starts the migration,
+or resumes a queued run or one whose lease expired; the lease lets only
+one process run it. A run an admin paused is left paused.
+"""
+
+import os
+import socket
+import threading
+import time
+from collections import namedtuple
+
+from config import Config
+from models.migration import MigrationModel
+from models.resume import ResumeModel
+from models.job import JobModel
+from ml import model_registry
+from ml.jd_parser import JDParser
+from ml.nlp_utils import PREPROCESS_VERSION
+from ml.resume_parser import ResumeParser
+from ml.document_features import (
+    compute_document_features_many,
+    features_are_current,
+    index_document,
+)
+
+# A migrated collection: its model, parser, text field, stale-count and
+# embedding-index accessors
+_Source = namedtuple("_Source", ["model", "parser", "text_field", "count", "get_index"])
+
+# One migration thread per process; set _stop to pause it after its batch
+_runner = None
+_runner_lock = threading.Lock()
+_stop = threading.Event()
+
+
+class MigrationService:
+    """Business logic for the background re-parse / re-embed migration."""
+
+    KIND = "reparse"
+    # Seconds without a checkpoint after which a "running" run is presumed
+    # dead (its process stopped) and may be resumed by another process
+    LEASE_SECONDS = 300
+
+    def __init__(self, db):
+        self.migration_model = MigrationModel(db)
+        self.resume_model = ResumeModel(db)
+        self.job_model = JobModel(db)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self.sources = {
+            "resumes": _Source(self.resume_model, ResumeParser(), "raw_text",
+                               self.resume_model.count_resumes,
+                               model_registry.get_resume_index),
+            "jobs": _Source(self.job_model, JDParser(), "description",
+                            self.job_model.count_jobs,
+                            model_registry.get_job_index),
+        }
+
+    # ── Control ──────────────────────────────────────────────────────────
+    def start_reparse(self, resume_paused=True):
+        """
+        Start a migration run, or resume the unfinished one from its
+        checkpoint.
+
+        Args:
+            resume_paused (bool): Whether a paused run may be resumed (False
+                for the startup check).
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        global _runner
+        with _runner_lock:
+            if _runner is not None and _runner.is_alive():
+                return {"error": "A re-parse migration is already running."}, 409
+
+            run_id, created = self.migration_model.get_or_create_active(
+                self.KIND, list(self.sources)
+            )
+            message = (
+                "Re-parse migration started." if created
+                else "Re-parse migration resumed from its checkpoint."
+            )
+
+            if not self.migration_model.claim(
+                run_id, self.owner, self.LEASE_SECONDS, resume_paused=resume_paused
+            ):
+                run = self.migration_model.find_by_id(run_id)
+                if run and run["status"] == "paused":
+                    return {"error": "The re-parse migration is paused; resume it from the admin API."}, 409
+                return {"error": "The re-parse migration is running in another process."}, 409
+
+            _stop.clear()
+            _runner = threading.Thread(
+                target=self._run, args=(run_id,), name="reparse-migrator", daemon=True
+            )
+            _runner.start()
+
+        return {
+            "message": message,
+            "migration_id": run_id,
+            "status": "running",
+            "status_url": "/api/admin/migrations/reparse",
+        }, 202
+
+    def stop_reparse(self):
+        """
+        Ask the running migration to pause after its current batch.
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        with _runner_lock:
+            if _runner is None or not _runner.is_alive():
+                return {"error": "No re-parse migration is running in this process."}, 409
+            _stop.set()
+        return {"message": "Re-parse migration will pause after the current batch."}, 202
+
+    def get_reparse_status(self):
+        """
+        Report the progress of the latest migration run.
+
+        Returns:
+            tuple: (response_dict, http_status_code).
+        """
+        run = self.migration_model.find_latest(self.KIND)
+        if not run:
+            return {"error": "No re-parse migration has been run."}, 404
+
+        collections = {}
+        for name, progress in run["progress"].items():
+            total = progress["total"]
+            collections[name] = {
+                **progress,
+                "last_id": str(progress["last_id"]) if progress["last_id"] else None,
+                "percent": (
+                    100.0 if progress["done"]
+                    else round(100.0 * progress["processed"] / total, 1) if total else 0.0
+                ),
+            }
+
+        return {
+            "migration": {
+                "id": str(run["_id"]),
+                "status": run["status"],
+                "targets": run["targets"],
+                "collections": collections,
+                "errors": run["errors"],
+                "created_at": run["created_at"].isoformat(),
+                "updated_at": run["updated_at"].isoformat(),
+                "completed_at": (
+                    run["completed_at"].isoformat() if run["completed_at"] else None
+                ),
+            }
+        }, 200
+
+    def start_if_stale(self):
+        """
+        Start the migration in the background if any stored document is
+        stale, or resume an unfinished run that is queued or whose lease
+        expired. Paused runs are left for an admin to resume. Called at
+        startup; the check itself runs on a daemon thread because it loads
+        the embedding model.
+        """
+        def check():
+            try:
+                active = self.migration_model.find_active(self.KIND)
+                if active:
+                    stale = True   # unfinished run: the claim decides
+                else:
+                    targets = self.current_targets()
+                    stale = any(
+                        source.count(self.stale_query(name, targets))
+                        for name, source in self.sources.items()
+                    )
+                if stale:
+                    response, status = self.start_reparse(resume_paused=False)
+                    print(f"[Migration] Startup check: {response.get('message') or response.get('error')}")
+            except Exception as e:
+                print(f"[Migration] Startup check failed: {e}")
+
+        threading.Thread(target=check, name="reparse-startup-check", daemon=True).start()
+
+    # ── Staleness ────────────────────────────────────────────────────────
+    def current_targets(self):
+        """Versions a document must carry to be up to date."""
+        ai_engine = model_registry.get_ai_engine()
+        targets = {name: source.parser.version() for name, source in self.sources.items()}
+        targets["preprocess_version"] = PREPROCESS_VERSION
+        # Without the transformer nothing can be re-embedded: ignore model ids
+        targets["model_id"] = ai_engine.EMBEDDING_ID if ai_engine.ai_available else None
+        return targets
+
+    @staticmethod
+    def stale_query(name, targets):
+        """MongoDB filter matching the documents of a collection that are stale."""
+        version = targets[name]
+        clauses = [
+            {"parse_version.parser": {"$ne": version["parser"]}},
+            {"parse_version.taxonomy": {"$ne": version["taxonomy"]}},
+            {"features.preprocess_version": {"$ne": targets["preprocess_version"]}},
+        ]
+        if targets["model_id"]:
+            clauses.append({"features.model_id": {"$ne": targets["model_id"]}})
+        return {"$or": clauses}
+
+    # ── Background Worker ────────────────────────────────────────────────
+    def _run(self, run_id):
+        """Background worker: migrate every collection batch by batch."""
+        try:
+            run = self.migration_model.find_by_id(run_id)
+            targets = self.current_targets()
+            if run["targets"] is not None and run["targets"] != targets:
+                # Versions moved on since the run was checkpointed: documents
+                # before the checkpoint are stale again, so start over
+                self.migration_model.set_status(run_id, "superseded")
+                run_id, _ = self.migration_model.get_or_create_active(
+                    self.KIND, list(self.sources)
+                )
+                if not self.migration_model.claim(run_id, self.owner, self.LEASE_SECONDS):
+                    print(f"[Migration] Re-parse run {run_id} taken over by another process.")
+                    return
+                run = self.migration_model.find_by_id(run_id)
+            if run["targets"] is None:
+                totals = {
+                    name: source.count(self.stale_query(name, targets))
+                    for name, source in self.sources.items()
+                }
+                self.migration_model.set_targets(run_id, targets, totals)
+            print(f"[Migration] Re-parse run {run_id} started (targets: {targets}).")
+
+            for name in self.sources:
+                progress = run["progress"][name]
+                if progress["done"]:
+                    continue
+                if not self._migrate_collection(run_id, name, targets, progress["last_id"]):
+                    self.migration_model.set_status(run_id, "paused")
+                    print(f"[Migration] Re-parse run {run_id} paused.")
+                    return
+                self.migration_model.mark_collection_done(run_id, name)
+
+            self.migration_model.set_status(run_id, "completed")
+            print(f"[Migration] Re-parse run {run_id} completed.")
+        except Exception as e:
+            print(f"[Migration] Re-parse run {run_id} failed: {e}")
+            self.migration_model.set_status(
+                run_id, "failed", error=f"Re-parse migration failed: {str(e)}"
+            )
+
+    def _migrate_collection(self, run_id, name, targets, last_id):
+        """
+        Migrate the stale documents of one collection, starting after the
+        checkpointed _id.
+
+        Returns:
+            bool: True once the collection is done, False if asked to stop.
+        """
+        source = self.sources[name]
+        query = self.stale_query(name, targets)
+        projection = {
+            source.text_field: 1,
+            "updated_at": 1,
+            "features.preprocess_version": 1,
+            "features.model_id": 1,
+        }
+        batch_size = max(Config.REPARSE_BATCH_SIZE, 1)
+        rate = Config.REPARSE_MAX_DOCS_PER_SECOND
+
+        while not _stop.is_set():
+            started = time.monotonic()
+            docs = source.model.find_batch(query, after_id=last_id, limit=batch_size,
+                                    projection=projection)
+            if not docs:
+                return True
+
+            updated, skipped, failed, errors = self._migrate_batch(name, docs)
+            last_id = docs[-1]["_id"]
+            self.migration_model.checkpoint(
+                run_id, name, last_id, updated, skipped, failed, errors
+            )
+
+            # Throttle: never exceed `rate` documents per second
+            if rate > 0:
+                _stop.wait(max(len(docs) / rate - (time.monotonic() - started), 0))
+        return False
+
+    def _migrate_batch(self, name, docs):
+        """
+        Re-parse one batch of documents and recompute their stale features.
+
+        Returns:
+            tuple: (updated, skipped, failed, errors).
+        """
+        source = self.sources[name]
+        # Stamp before parsing: if the taxonomy reloads mid-batch, the older
+        # version is recorded and the documents are picked up again later
+        parse_version = source.parser.version()
+
+        errors = []
+        parsed_docs = []   # (doc, text, parsed_data)
+        for doc in docs:
+            text = doc.get(source.text_field) or ""
+            try:
+                parsed_docs.append((doc, text, source.parser.parse(text)))
+            except Exception as e:
+                errors.append(f"Error re-parsing {name} {doc['_id']}: {str(e)}")
+
+        # Recompute features in one batched pass, only where they are stale
+        stale = [i for i, (doc, _, _) in enumerate(parsed_docs)
+                 if not features_are_current(doc.get("features"))]
+        features = [None] * len(parsed_docs)
+        for i, value in zip(stale, compute_document_features_many(
+            [parsed_docs[i][1] for i in stale]
+        )):
+            features[i] = value
+
+        updated = skipped = 0
+        for (doc, _, parsed_data), doc_features in zip(parsed_docs, features):
+            try:
+                if not source.model.update_parsed_data(
+                    doc["_id"], parsed_data,
+                    parse_version=parse_version,
+                    features=doc_features,
+                    unchanged_since=doc.get("updated_at"),
+                ):
+                    # Edited or deleted since it was read: leave it alone
+                    skipped += 1
+                    continue
+                updated += 1
+                if doc_features is not None:
+                    index_document(source.get_index(), str(doc["_id"]), doc_features)
+            except Exception as e:
+                errors.append(f"Error updating {name} {doc['_id']}: {str(e)}")
+
+        failed = len(docs) - updated - skipped
+        return updated, skipped, failed, errors
@@ -5,14 +5,22 @@ Orchestrates the full resume upload pipeline:
   1. File validation & storage
   2. Text extraction (PDF / DOCX)
   3. NLP-based parsing (delegates to ml.resume_parser)
-  4. Persistence to MongoDB
+     (steps 2-3 are skipped for byte-identical re-uploads, see
+     utils/extraction_cache.py)
+  4. Feature precomputation (tokens, embedding) for fast matching
+  5. Persistence to MongoDB
+  6. Embedding index update (top-K job / candidate search)
 
 Also provides retrieval methods for parsed resume data.
 """
 
 from models.resume import ResumeModel
-from utils.file_handler import save_uploaded_file, extract_text
+from models.job import JobModel
+from utils.file_handler import save_uploaded_file
+from utils.extraction_cache import extract_text_cached, forget, parse_cached
 from ml.resume_parser import ResumeParser
+from ml import model_registry
+from ml.document_features import compute_document_features, index_document
 
 
 class ResumeService:
@@ -20,6 +28,7 @@ class ResumeService:
 
     def __init__(self, db):
         self.resume_model = ResumeModel(db)
+        self.job_model = JobModel(db)
         self.parser = ResumeParser()
 
     # ── Upload & Parse ───────────────────────────────────────────────────
@@ -31,7 +40,9 @@ class ResumeService:
         1. Validate and save file to disk.
         2. Extract raw text from the file.
         3. Run NLP parser to extract structured data.
-        4. Store everything in MongoDB.
+        4. Precompute matching features (also refreshes corpus IDF).
+        5. Store everything in MongoDB.
+        6. Add the embedding to the resume search index.
 
         Args:
             user_id (str): Authenticated user's ID.
@@ -40,33 +51,43 @@ class ResumeService:
         Returns:
             tuple: (response_dict, http_status_code).
         """
-        # Step 1: Save file securely
-        filepath, original_filename = save_uploaded_file(file_storage)
+        # Step 1: Save file securely (hashing it on the way)
+        filepath, original_filename, file_hash = save_uploaded_file(file_storage)
         if not filepath:
             return {
                 "error": "Invalid file. Only PDF and DOCX files up to 5 MB are allowed."
             }, 400
 
         # Step 2: Extract text from the uploaded document
-        raw_text = extract_text(filepath)
+        raw_text = extract_text_cached(filepath, file_hash)
         if not raw_text.strip():
             return {
                 "error": "Could not extract text from the uploaded file. "
                          "Please ensure the file is not empty or image-based."
             }, 400
 
-        # Step 3: Parse structured data using NLP
-        parsed_data = self.parser.parse(raw_text)
+        # Step 3: Parse structured data using NLP (stamped with the parser
+        # and taxonomy versions, so stale results can be migrated later)
+        parsed_data, parse_version = parse_cached(self.parser, file_hash, raw_text)
 
-        # Step 4: Store in MongoDB
+        # Step 4: Compute features once so matching can skip NLP inference
+        features = compute_document_features(raw_text, add_to_corpus=True)
+
+        # Step 5: Store in MongoDB
         resume_id = self.resume_model.save_resume(
             user_id=user_id,
             filename=original_filename,
             file_path=filepath,
             raw_text=raw_text,
             parsed_data=parsed_data,
+            features=features,
+            parse_version=parse_version,
+            file_hash=file_hash,
         )
 
+        # Step 6: Make the resume discoverable by nearest-neighbour search
+        index_document(model_registry.get_resume_index(), resume_id, features)
+
         return {
             "message": "Resume uploaded and parsed successfully.",
             "resume_id": resume_id,
@@ -151,4 +172,13 @@ class ResumeService:
             return {"error": "Access denied."}, 403
 
         self.resume_model.delete_resume(resume_id)
+        model_registry.get_resume_index().remove(resume_id)
+
+        # Drop the file's cached text once no stored document uses it
+        file_hash = resume.get("file_hash")
+        if file_hash and not (
+            self.resume_model.count_resumes({"file_hash": file_hash})
+            or self.job_model.count_jobs({"file_hash": file_hash})
+        ):
+            forget(file_hash)
         return {"message": "Resume deleted successfully."}, 200
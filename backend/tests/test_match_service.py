@@ -0,0 +1,129 @@
+"""
+tests/test_match_service.py - MatchService Regression Tests
+--------------------------------------------------------------
+Runs MatchService.match_resume_to_job end to end against in-memory
+stand-ins for the models, the matching engine and the embedding indexes,
+so a broken call inside the pipeline surfaces as a test failure rather
+than a 500 from POST /api/match.
+
+Skipped when bson (PyMongo) or numpy is not installed.
+
+Usage (from backend/):
+    python -m pytest tests/test_match_service.py
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("bson")
+pytest.importorskip("numpy")
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import match_service
+from services.match_service import MatchService
+
+SCORE_KEYS = (
+    "overall_score", "skill_score", "experience_score", "education_score",
+    "tfidf_similarity", "semantic_similarity", "ml_predicted_score",
+    "ml_quality", "rule_based_score", "ai_enhanced_score",
+)
+
+
+class FakeDocumentModel:
+    def __init__(self, docs):
+        self.docs = docs
+        self.updated = {}
+
+    def find_by_id(self, doc_id):
+        return self.docs.get(doc_id)
+
+    def update_features(self, doc_id, features):
+        self.updated[doc_id] = features
+
+
+class FakeMatchModel:
+    def __init__(self):
+        self.saved = []
+
+    def save_match(self, match_doc):
+        self.saved.append(match_doc)
+        return "match-1"
+
+
+class FakeIndex:
+    def __init__(self):
+        self.added = []
+
+
+class FakeMatchingEngine:
+    def __init__(self):
+        self.calls = []
+
+    def compute_match(self, **kwargs):
+        self.calls.append(kwargs)
+        result = {key: 0.5 for key in SCORE_KEYS}
+        result.update(matched_skills=["python"], missing_skills=["aws"])
+        return result
+
+
+class FakeSkillGapAnalyzer:
+    def analyze(self, candidate_skills, required_skills, preferred_skills):
+        return {"skill_gap": {"missing": ["aws"]}, "recommendations": []}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    resume_index, job_index = FakeIndex(), FakeIndex()
+    engine = FakeMatchingEngine()
+    monkeypatch.setattr(match_service.model_registry, "get_resume_index", lambda: resume_index)
+    monkeypatch.setattr(match_service.model_registry, "get_job_index", lambda: job_index)
+    monkeypatch.setattr(match_service.model_registry, "get_matching_engine", lambda: engine)
+    # Every stored feature document counts as stale, forcing the backfill path
+    monkeypatch.setattr(match_service, "features_are_current", lambda features: False)
+    monkeypatch.setattr(
+        match_service, "compute_document_features", lambda text: {"text": text}
+    )
+    monkeypatch.setattr(
+        match_service, "index_document",
+        lambda index, doc_id, features: index.added.append(doc_id),
+    )
+
+    svc = MatchService.__new__(MatchService)
+    svc.resume_model = FakeDocumentModel({
+        "r1": {"_id": "r1", "raw_text": "Python developer", "parsed_data": {"skills": ["python"]}},
+    })
+    svc.job_model = FakeDocumentModel({
+        "j1": {"_id": "j1", "description": "Python and AWS engineer",
+               "parsed_data": {"required_skills": ["python", "aws"]}},
+    })
+    svc.match_model = FakeMatchModel()
+    svc.skill_gap_analyzer = FakeSkillGapAnalyzer()
+    return svc, engine, resume_index, job_index
+
+
+def test_match_resume_to_job_refreshes_stale_features(service):
+    svc, engine, resume_index, job_index = service
+
+    body, status = svc.match_resume_to_job("u1", {"resume_id": "r1", "job_id": "j1"})
+
+    assert status == 200
+    assert body["match_id"] == "match-1"
+    assert body["result"]["overall_score"] == 0.5
+    # Stale features are recomputed, stored and pushed into each document's own index
+    assert svc.resume_model.updated == {"r1": {"text": "Python developer"}}
+    assert svc.job_model.updated == {"j1": {"text": "Python and AWS engineer"}}
+    assert resume_index.added == ["r1"]
+    assert job_index.added == ["j1"]
+    assert engine.calls[0]["resume_features"] == {"text": "Python developer"}
+    assert engine.calls[0]["job_features"] == {"text": "Python and AWS engineer"}
+
+
+def test_match_resume_to_job_requires_both_ids(service):
+    svc = service[0]
+    body, status = svc.match_resume_to_job("u1", {"resume_id": "r1"})
+    assert status == 400
+    assert "error" in body
@@ -0,0 +1,81 @@
+"""
+tests/test_onnx_parity.py - ONNX / PyTorch Embedding Parity
+--------------------------------------------------------------
+Checks that the ONNX Runtime backends reproduce the PyTorch
+sentence-transformer embeddings within tolerance, and that every backend
+counts tokens identically (chunking decisions depend on those counts).
+
+Skipped when torch / sentence-transformers or onnxruntime is not
+installed. The first run exports the model to ONNX_MODEL_DIR.
+
+Usage (from backend/):
+    python -m pytest tests/test_onnx_parity.py
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("tokenizers")
+
+# Ensure the backend directory is in the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from ml.ai_engine import AIEngine
+from ml.inference_backend import OnnxBackend, TorchBackend
+
+# Minimum cosine similarity between a backend's embedding and PyTorch's
+PARITY_TOLERANCE = {"onnx": 0.9999, "onnx-int8": 0.99}
+
+SENTENCES = [
+    "Senior Python developer with 6 years of experience building REST APIs in Flask and Django.",
+    "We are looking for a data engineer skilled in Spark, Airflow and AWS.",
+    "Frontend engineer: React, TypeScript, CSS; strong communication and teamwork.",
+    "Professional experience with kubernetes",
+    "Kurze deutsche Zeile mit Sonderzeichen: äöü ß — and some emoji 🚀.",
+    # Longer than max_seq_length: encode() truncates, count_tokens() must not
+    "Machine learning engineer with PyTorch, scikit-learn and MLOps experience. " * 40,
+]
+
+
+@pytest.fixture(scope="module")
+def torch_backend():
+    return TorchBackend(AIEngine.MODEL_NAME)
+
+
+@pytest.fixture(scope="module", params=sorted(PARITY_TOLERANCE))
+def onnx_backend(request):
+    return request.param, OnnxBackend(
+        AIEngine.MODEL_NAME, quantize=request.param == "onnx-int8"
+    )
+
+
+def test_embedding_parity(torch_backend, onnx_backend):
+    name, backend = onnx_backend
+    expected = torch_backend.encode(SENTENCES)
+    actual = backend.encode(SENTENCES)
+
+    assert actual.shape == expected.shape
+    cosines = np.sum(actual * expected, axis=1) / (
+        np.linalg.norm(actual, axis=1) * np.linalg.norm(expected, axis=1)
+    )
+    assert float(cosines.min()) >= PARITY_TOLERANCE[name], (
+        f"{name}: min cosine {cosines.min():.5f} < {PARITY_TOLERANCE[name]}"
+    )
+
+
+def test_count_tokens_parity(torch_backend, onnx_backend):
+    _, backend = onnx_backend
+    # Encode first: it must not leave truncation / padding on the counter
+    torch_backend.encode(SENTENCES)
+    backend.encode(SENTENCES)
+
+    expected = torch_backend.count_tokens(SENTENCES)
+    assert backend.count_tokens(SENTENCES) == expected
+    assert expected[-1] > torch_backend.max_seq_length
@@ -0,0 +1,156 @@
+"""
+utils/extraction_cache.py - Content-addressed Extraction / Parse Cache
+-------------------------------------------------------------------------
+The same resume file is uploaded again and again (single uploads, direct
+matching, ZIPs re-run against several JDs). Uploads are identified by the
+SHA-256 of their bytes, and this cache maps that hash to:
+
+  - the extracted text (valid for the current PDF engine and budget), and
+  - the parse result per parser, stamped with the parser's version
+    (ResumeParser.version / JDParser.version), so a parser or taxonomy
+    change transparently re-parses from the cached text.
+
+A byte-identical file therefore skips text extraction and NLP parsing.
+
+The disk tier is bounded by size and age (EXTRACTION_CACHE_MAX_MB /
+EXTRACTION_CACHE_MAX_AGE_DAYS). Stored resumes and jobs record their
+file_hash, and forget() drops a hash's entry once the last document
+uploaded from that file is deleted (other processes' in-memory copies
+expire with their LRU).
+
+Cache entry (ml/cache.ContentCache, memory LRU + optional disk tier):
+{
+    text   : str,
+    parsed : {<parser class>: {"version": {...}, "data": {...}}}
+}
+"""
+
+import copy
+import threading
+
+from config import Config
+from ml.cache import ContentCache, content_hash
+from utils.file_handler import extract_text, extract_texts_parallel, get_pdf_backend
+
+# Bump whenever a change alters extracted text for the same file bytes
+EXTRACTION_VERSION = 1
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def _get_cache():
+    """Return the shared cache, creating it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            # Extracted text depends on the PDF engine and budget
+            namespace = (
+                f"extract-v{EXTRACTION_VERSION}-{get_pdf_backend().name}"
+                f"-p{Config.PDF_MAX_PAGES}-c{Config.PDF_MAX_CHARS}"
+            )
+            _cache = ContentCache(
+                namespace,
+                max_entries=Config.EXTRACTION_CACHE_SIZE,
+                disk_dir=Config.EXTRACTION_CACHE_DIR or None,
+                max_disk_bytes=Config.EXTRACTION_CACHE_MAX_MB * 1024 * 1024,
+                max_disk_age=Config.EXTRACTION_CACHE_MAX_AGE_DAYS * 24 * 3600,
+            )
+        return _cache
+
+
+def _store_text(sha256, text):
+    """Cache the extracted text of a file (empty results are not cached)."""
+    if text.strip():
+        _get_cache().set(sha256, {"text": text, "parsed": {}})
+
+
+def extract_text_cached(filepath, sha256):
+    """
+    extract_text() for a saved upload, served from the cache when the same
+    bytes were extracted before.
+
+    Args:
+        filepath (str): Path of the saved upload.
+        sha256 (str): Hex SHA-256 of the file (from save_uploaded_file).
+
+    Returns:
+        str: Extracted text content.
+    """
+    entry = _get_cache().get(sha256)
+    if entry is not None:
+        return entry["text"]
+    text = extract_text(filepath)
+    _store_text(sha256, text)
+    return text
+
+
+def extract_texts_cached(documents):
+    """
+    extract_texts_parallel() for in-memory documents: cached files are
+    served directly, only the misses go to the extraction pool.
+
+    Args:
+        documents (list[tuple]): (filename, bytes) per document.
+
+    Returns:
+        list[tuple]: (text, error, sha256) per document, in input order.
+    """
+    cache = _get_cache()
+    hashes = [content_hash(data) for _, data in documents]
+    results = [None] * len(documents)
+    misses = []
+    for i, sha256 in enumerate(hashes):
+        entry = cache.get(sha256)
+        if entry is not None:
+            results[i] = (entry["text"], None, sha256)
+        else:
+            misses.append(i)
+
+    extracted = extract_texts_parallel([documents[i] for i in misses])
+    for i, (text, error) in zip(misses, extracted):
+        if error is None:
+            _store_text(hashes[i], text)
+        results[i] = (text, error, hashes[i])
+    return results
+
+
+def parse_cached(parser, sha256, text):
+    """
+    parser.parse(text) for the text extracted from a file, cached by the
+    file hash and the parser's version stamp.
+
+    Args:
+        parser (ResumeParser | JDParser): Parser to run on a miss.
+        sha256 (str): Hex SHA-256 of the file the text came from.
+        text (str): Extracted text of that file.
+
+    Returns:
+        tuple: (parsed_data, parse_version).
+    """
+    version = parser.version()
+    kind = type(parser).__name__
+    cache = _get_cache()
+    entry = cache.get(sha256)
+    if entry is not None and entry["text"] == text:
+        cached = entry["parsed"].get(kind)
+        if cached is not None and cached["version"] == version:
+            # Callers own the result; keep the cached copy pristine
+            return copy.deepcopy(cached["data"]), version
+
+    parsed = parser.parse(text)
+    if entry is not None and entry["text"] == text:
+        cache.set(sha256, {
+            "text": text,
+            "parsed": {
+                **entry["parsed"],
+                kind: {"version": version, "data": copy.deepcopy(parsed)},
+            },
+        })
+    return parsed, version
+
+
+def forget(sha256):
+    """Remove the cached text and parse results of a file (memory and disk)."""
+    if sha256:
+        _get_cache().delete(sha256)
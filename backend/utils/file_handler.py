@@ -4,13 +4,33 @@ utils/file_handler.py - Secure File Upload Utilities
 Handles:
   - MIME type and extension validation for uploaded resumes
   - Secure filename generation (prevents path traversal)
-  - Text extraction from PDF and DOCX files
-
-Supported formats: .pdf, .docx
+  - Text extraction from PDF and DOCX files (on disk or in memory), with
+    pluggable PDF engines (PyPDF2, or PyMuPDF when installed) and a
+    per-document page / character budget
+  - Page-parallel extraction of single large PDFs (process pool)
+  - Streaming ZIP ingestion with member-count / size limits
+  - Parallel extraction for bulk uploads (process pool)
+
+Supported formats: .pdf, .docx (individually or inside .zip archives)
 """
 
+import hashlib
+import importlib.util
+import io
+import multiprocessing
 import os
+import threading
+import time
 import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    TimeoutError as FutureTimeoutError,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
 
 import PyPDF2
 import docx
@@ -18,6 +38,12 @@ from werkzeug.utils import secure_filename
 
 from config import Config
 
+# Bytes read per step while streaming an upload to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Optional, much faster C-based PDF engine (see PDF_BACKEND)
+PYMUPDF_AVAILABLE = importlib.util.find_spec("fitz") is not None
+
 
 def allowed_file(filename):
     """
@@ -44,19 +70,24 @@ def save_uploaded_file(file_storage):
     - Uses werkzeug's secure_filename to sanitize.
     - Prepends a UUID to prevent filename collisions.
 
+    The upload is streamed to disk in chunks and hashed on the way, so the
+    SHA-256 identifies byte-identical files (see utils/extraction_cache.py)
+    without reading them twice.
+
     Args:
         file_storage: Flask FileStorage object from request.files.
 
     Returns:
-        tuple: (saved_filepath, original_filename) or (None, None) on failure.
+        tuple: (saved_filepath, original_filename, sha256_hex) or
+               (None, None, None) on failure.
     """
     if not file_storage or file_storage.filename == "":
-        return None, None
+        return None, None, None
 
     original_filename = file_storage.filename
 
     if not allowed_file(original_filename):
-        return None, None
+        return None, None, None
 
     # Secure the filename and add a UUID prefix for uniqueness
     safe_name = secure_filename(original_filename)
@@ -66,72 +97,507 @@ def save_uploaded_file(file_storage):
     os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
 
     filepath = os.path.join(Config.UPLOAD_FOLDER, unique_name)
-    file_storage.save(filepath)
+    digest = hashlib.sha256()
+    with open(filepath, "wb") as out:
+        while True:
+            chunk = file_storage.stream.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+
+    return filepath, original_filename, digest.hexdigest()
+
+
+# ── PDF Extraction Backends ──────────────────────────────────────────────
+# Every backend exposes:
+#     backend.open(source)          -> document handle (path, bytes or stream)
+#     backend.page_count(doc)       -> int
+#     backend.page_text(doc, index) -> str ("" for pages without text)
+#     backend.close(doc)
+class PyPDF2Backend:
+    """Pure-Python PDF text extraction (always available)."""
+
+    name = "pypdf2"
+
+    def open(self, source):
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return PyPDF2.PdfReader(source)
+
+    def page_count(self, doc):
+        return len(doc.pages)
+
+    def page_text(self, doc, index):
+        return doc.pages[index].extract_text() or ""
+
+    def close(self, doc):
+        pass
 
-    return filepath, original_filename
 
+class PyMuPDFBackend:
+    """MuPDF (C library) text extraction, typically several times faster."""
 
-def extract_text_from_pdf(filepath):
+    name = "pymupdf"
+
+    def open(self, source):
+        import fitz
+        if isinstance(source, (bytes, bytearray)):
+            return fitz.open(stream=bytes(source), filetype="pdf")
+        if hasattr(source, "read"):
+            return fitz.open(stream=source.read(), filetype="pdf")
+        return fitz.open(source)
+
+    def page_count(self, doc):
+        return doc.page_count
+
+    def page_text(self, doc, index):
+        return doc.load_page(index).get_text() or ""
+
+    def close(self, doc):
+        doc.close()
+
+
+PDF_BACKENDS = {"pypdf2": PyPDF2Backend, "pymupdf": PyMuPDFBackend}
+
+
+def get_pdf_backend(name=None):
+    """
+    Return the PDF extraction backend to use.
+
+    Args:
+        name (str): "pypdf2", "pymupdf" or "auto" (PyMuPDF when installed,
+                    else PyPDF2). Defaults to Config.PDF_BACKEND.
+
+    Returns:
+        PyPDF2Backend | PyMuPDFBackend
+    """
+    name = (name or Config.PDF_BACKEND).lower()
+    if name == "auto":
+        name = "pymupdf" if PYMUPDF_AVAILABLE else "pypdf2"
+    if name == "pymupdf" and not PYMUPDF_AVAILABLE:
+        print("[WARN] PyMuPDF is not installed; falling back to PyPDF2.")
+        name = "pypdf2"
+    backend = PDF_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(
+            f"Unknown PDF backend '{name}' (expected one of {tuple(PDF_BACKENDS)} or 'auto')"
+        )
+    return backend()
+
+
+def extract_text_from_pdf(source, backend=None, parallel=False):
     """
     Extract all text content from a PDF file.
 
-    Uses PyPDF2 to iterate through every page and concatenate text.
+    Pages are read in order until the per-document budget
+    (Config.PDF_MAX_PAGES / PDF_MAX_CHARS) is used up, and joined once at
+    the end. With parallel=True, a PDF of at least PDF_PARALLEL_MIN_PAGES
+    pages is split into page ranges extracted across the extraction pool.
 
     Args:
-        filepath (str): Absolute path to the PDF file.
+        source (str | file-like): Path to the PDF file, or a binary stream
+                                  such as io.BytesIO.
+        backend (str): PDF backend name (default: Config.PDF_BACKEND).
+        parallel (bool): Allow page-parallel extraction. Only pass True
+                         outside the extraction pool's own workers.
 
     Returns:
-        str: Concatenated text from all pages.
+        str: Concatenated text from all pages (within the budget).
     """
-    text = ""
+    pages = []
     try:
-        with open(filepath, "rb") as f:
-            reader = PyPDF2.PdfReader(f)
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        engine = get_pdf_backend(backend)
+        if parallel and not isinstance(source, (str, os.PathLike)):
+            # Workers re-open the PDF from its bytes
+            source = source.read()
+        doc = engine.open(source)
+        try:
+            n_pages = engine.page_count(doc)
+            if Config.PDF_MAX_PAGES:
+                n_pages = min(n_pages, Config.PDF_MAX_PAGES)
+            if parallel and _use_page_parallelism(n_pages):
+                pages = _extract_pages_parallel(engine.name, source, n_pages)
+            else:
+                pages = _extract_pages(engine, doc, 0, n_pages, Config.PDF_MAX_CHARS)
+        finally:
+            engine.close(doc)
     except Exception as e:
         print(f"[ERROR] PDF extraction failed: {e}")
-    return text.strip()
+
+    text = "\n".join(page for page in pages if page).strip()
+    if Config.PDF_MAX_CHARS:
+        text = text[:Config.PDF_MAX_CHARS]
+    return text
+
+
+def _extract_pages(engine, doc, start, stop, max_chars=0):
+    """Text of pages [start, stop), stopping early once max_chars is reached."""
+    pages = []
+    total = 0
+    for index in range(start, stop):
+        page_text = engine.page_text(doc, index)
+        pages.append(page_text)
+        total += len(page_text)
+        if max_chars and total >= max_chars:
+            break
+    return pages
+
+
+def _use_page_parallelism(n_pages):
+    """True if a PDF is long enough to be worth splitting across workers."""
+    workers = Config.EXTRACTION_WORKERS or os.cpu_count() or 1
+    return (
+        workers > 1
+        and Config.PDF_PARALLEL_MIN_PAGES > 0
+        and n_pages >= Config.PDF_PARALLEL_MIN_PAGES
+    )
 
 
-def extract_text_from_docx(filepath):
+def _extract_pages_parallel(backend_name, source, n_pages):
+    """
+    Extract page ranges of one PDF across the extraction pool.
+
+    Falls back to in-process extraction if the pool is unavailable.
+
+    Returns:
+        list[str]: Page texts, in page order.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            source = f.read()
+
+    workers = Config.EXTRACTION_WORKERS or os.cpu_count() or 1
+    step = max(-(-n_pages // workers), 1)
+    ranges = [(start, min(start + step, n_pages)) for start in range(0, n_pages, step)]
+    try:
+        pool = _get_extraction_pool()
+        # One deadline for the whole file, not one per page range
+        deadline = time.monotonic() + Config.EXTRACTION_TIMEOUT
+        futures = [
+            pool.submit(_extract_page_range, backend_name, source, start, stop)
+            for start, stop in ranges
+        ]
+        pages = []
+        for future in futures:
+            pages.extend(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        return pages
+    except BrokenProcessPool:
+        _reset_extraction_pool()
+    except FutureTimeoutError:
+        print("[WARN] Page-parallel PDF extraction timed out; retrying serially.")
+
+    engine = get_pdf_backend(backend_name)
+    doc = engine.open(source)
+    try:
+        return _extract_pages(engine, doc, 0, n_pages, Config.PDF_MAX_CHARS)
+    finally:
+        engine.close(doc)
+
+
+def _extract_page_range(backend_name, data, start, stop):
+    """Pool task: text of pages [start, stop) of an in-memory PDF."""
+    engine = get_pdf_backend(backend_name)
+    doc = engine.open(data)
+    try:
+        return _extract_pages(engine, doc, start, stop)
+    finally:
+        engine.close(doc)
+
+
+def extract_text_from_docx(source):
     """
     Extract all text content from a DOCX file.
 
     Uses python-docx to iterate through paragraphs.
 
     Args:
-        filepath (str): Absolute path to the DOCX file.
+        source (str | file-like): Path to the DOCX file, or a binary stream
+                                  such as io.BytesIO.
 
     Returns:
         str: Concatenated paragraph text.
     """
-    text = ""
+    paragraphs = []
     try:
-        doc = docx.Document(filepath)
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        doc = docx.Document(source)
+        paragraphs = [paragraph.text for paragraph in doc.paragraphs]
     except Exception as e:
         print(f"[ERROR] DOCX extraction failed: {e}")
-    return text.strip()
+    return "\n".join(paragraphs).strip()
 
 
-def extract_text(filepath):
+def extract_text(filepath, parallel=True):
     """
     Dispatcher: extract text based on file extension.
 
     Args:
         filepath (str): Path to uploaded resume file.
+        parallel (bool): Allow page-parallel extraction of large PDFs.
 
     Returns:
         str: Extracted text content.
     """
     ext = filepath.rsplit(".", 1)[1].lower()
     if ext == "pdf":
-        return extract_text_from_pdf(filepath)
+        return extract_text_from_pdf(filepath, parallel=parallel)
     elif ext == "docx":
         return extract_text_from_docx(filepath)
     else:
         return ""
+
+
+def extract_text_from_bytes(data, filename, parallel=True):
+    """
+    Extract text from an in-memory document (no temp file needed).
+
+    Args:
+        data (bytes): Raw file content.
+        filename (str): Original filename, used to pick the format.
+        parallel (bool): Allow page-parallel extraction of large PDFs.
+
+    Returns:
+        str: Extracted text content.
+    """
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext == "pdf":
+        return extract_text_from_pdf(io.BytesIO(data), parallel=parallel)
+    elif ext == "docx":
+        return extract_text_from_docx(io.BytesIO(data))
+    else:
+        return ""
+
+
+# ── ZIP Ingestion ────────────────────────────────────────────────────────
+def read_zip_documents(stream, archive_name="upload.zip"):
+    """
+    Read PDF/DOCX members of a ZIP archive straight into memory.
+
+    Nothing is extracted to disk. Limits from Config protect against
+    oversized archives and ZIP bombs:
+      - ZIP_MAX_MEMBERS: maximum number of resume documents
+      - ZIP_MAX_UNCOMPRESSED_SIZE: maximum total uncompressed bytes
+
+    zipfile never returns more bytes than a member's declared size, so
+    checking the declared sizes before reading bounds memory usage.
+
+    Args:
+        stream: Seekable binary stream of the archive (e.g. FileStorage.stream).
+        archive_name (str): Name used in error messages.
+
+    Returns:
+        tuple: (documents, errors) where documents is a list of
+               (member_filename, bytes) and errors a list of messages.
+    """
+    documents = []
+    errors = []
+    total_size = 0
+
+    try:
+        with zipfile.ZipFile(stream, "r") as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                fname = os.path.basename(info.filename)
+                if fname.startswith("__") or fname.startswith("."):
+                    continue
+                fext = fname.rsplit(".", 1)[-1].lower() if "." in fname else ""
+                if fext not in ("pdf", "docx"):
+                    continue
+
+                if len(documents) >= Config.ZIP_MAX_MEMBERS:
+                    errors.append(
+                        f"'{archive_name}' has more than {Config.ZIP_MAX_MEMBERS} "
+                        f"resume files; the rest were skipped."
+                    )
+                    break
+                if total_size + info.file_size > Config.ZIP_MAX_UNCOMPRESSED_SIZE:
+                    errors.append(
+                        f"'{archive_name}' exceeds the uncompressed size limit; "
+                        f"'{fname}' and later files were skipped."
+                    )
+                    break
+
+                try:
+                    data = zf.read(info)
+                except Exception as e:
+                    errors.append(f"Could not read '{fname}' from '{archive_name}': {e}")
+                    continue
+                total_size += len(data)
+                documents.append((fname, data))
+    except zipfile.BadZipFile:
+        errors.append(f"'{archive_name}' is not a valid ZIP file.")
+
+    return documents, errors
+
+
+# ── Parallel Extraction ──────────────────────────────────────────────────
+# PyPDF2 / python-docx are pure Python and hold the GIL, so bulk uploads are
+# extracted in a process pool. The pool is created lazily and shared by all
+# requests; "spawn" avoids forking a parent that has model threads running.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_extraction_pool():
+    """Return the shared extraction process pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = Config.EXTRACTION_WORKERS or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _reset_extraction_pool():
+    """Discard a broken pool so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def extract_texts_parallel(sources, timeout=None):
+    """
+    Extract text from many documents using all CPU cores.
+
+    Results are returned in input order. Failures are isolated per file:
+    a crash, timeout or unreadable document only affects its own entry.
+
+      - At most one file per worker is in flight, so each file's timeout
+        runs from its submission, i.e. roughly from when it starts.
+      - If a worker crashes, the pool is replaced and the files that were
+        in flight are re-run one at a time: only the file that crashes
+        again is reported as failed, the others are extracted normally.
+
+    Note: a timed-out extraction cannot be interrupted inside its worker
+    process; the worker finishes it in the background and is then reused.
+
+    Args:
+        sources (list): Each item is either a file path (str) or an
+                        in-memory document as a (filename, bytes) tuple.
+        timeout (float): Per-file timeout in seconds
+                         (defaults to Config.EXTRACTION_TIMEOUT).
+
+    Returns:
+        list[tuple]: (text, error) per document; error is None on success.
+    """
+    if timeout is None:
+        timeout = Config.EXTRACTION_TIMEOUT
+
+    # Not worth starting workers for a single document
+    if len(sources) <= 1 or Config.EXTRACTION_WORKERS == 1:
+        return [_extract_safely(source) for source in sources]
+
+    workers = Config.EXTRACTION_WORKERS or os.cpu_count() or 1
+    results = [None] * len(sources)
+    queue = deque(range(len(sources)))
+    suspects = deque()   # in flight when a worker crashed: re-run alone
+    running = {}         # future -> (index, deadline)
+    stalled = set()      # timed-out futures still occupying a worker
+
+    while queue or suspects or running:
+        # A suspect runs alone, so a crash while it runs is its own
+        stalled = {future for future in stalled if not future.done()}
+        if suspects:
+            if not running:
+                _submit_extraction(sources, suspects.popleft(), timeout, running, results)
+        else:
+            capacity = max(workers - len(stalled), 1)
+            while queue and len(running) < capacity:
+                _submit_extraction(sources, queue.popleft(), timeout, running, results)
+        if not running:
+            continue
+
+        isolated = len(running) == 1
+        next_deadline = min(deadline for _, deadline in running.values())
+        done, _ = wait(
+            list(running),
+            timeout=max(next_deadline - time.monotonic(), 0),
+            return_when=FIRST_COMPLETED,
+        )
+
+        crashed = []
+        for future in done:
+            index, _ = running.pop(future)
+            name = _source_name(sources[index])
+            try:
+                results[index] = (future.result(), None)
+            except BrokenProcessPool:
+                crashed.append(index)
+            except Exception as e:
+                results[index] = ("", f"Text extraction failed for '{name}': {e}")
+
+        if crashed:
+            # Every in-flight task fails with the pool, not only the culprit
+            crashed.extend(index for index, _ in running.values())
+            running.clear()
+            stalled.clear()
+            _reset_extraction_pool()
+            if isolated:
+                index = crashed[0]
+                results[index] = (
+                    "", f"Text extraction worker crashed on '{_source_name(sources[index])}'."
+                )
+            else:
+                suspects.extend(sorted(crashed))
+            continue
+
+        now = time.monotonic()
+        for future, (index, deadline) in list(running.items()):
+            if deadline <= now:
+                del running[future]
+                if not future.cancel():
+                    stalled.add(future)
+                results[index] = (
+                    "", f"Text extraction timed out for '{_source_name(sources[index])}'."
+                )
+    return results
+
+
+def _submit_extraction(sources, index, timeout, running, results):
+    """
+    Submit one extraction to the shared pool, replacing the pool once if it
+    is already broken (e.g. by a crash in another request's task).
+    """
+    for _ in range(2):
+        try:
+            future = _get_extraction_pool().submit(_extract_source, sources[index])
+        except BrokenProcessPool:
+            _reset_extraction_pool()
+            continue
+        running[future] = (index, time.monotonic() + timeout)
+        return
+    results[index] = (
+        "", f"Text extraction pool unavailable for '{_source_name(sources[index])}'."
+    )
+
+
+def _extract_source(source, parallel=False):
+    """
+    Pool task: extract text from a path or a (filename, bytes) tuple.
+    Page-parallelism is off inside pool workers (they are the pool).
+    """
+    if isinstance(source, tuple):
+        filename, data = source
+        return extract_text_from_bytes(data, filename, parallel=parallel)
+    return extract_text(source, parallel=parallel)
+
+
+def _source_name(source):
+    """Display name of an extraction source for error messages."""
+    if isinstance(source, tuple):
+        return source[0]
+    return os.path.basename(source)
+
+
+def _extract_safely(source):
+    """Serial counterpart of a pool task: returns (text, error)."""
+    try:
+        return _extract_source(source, parallel=True), None
+    except Exception as e:
+        return "", f"Text extraction failed for '{_source_name(source)}': {e}"